@@ -1,29 +1,51 @@
 import logging
+from pathlib import Path
 
 import pydantic.v1.dataclasses
-from tickit.adapters.io import HttpIo, ZeroMqPushIo
+from tickit.adapters.io import HttpIo
 from tickit.core.adapter import AdapterContainer
 from tickit.core.components.component import Component, ComponentConfig
 from tickit.core.components.device_component import DeviceComponent
 
+from tickit_devices.eiger.data.capture import CaptureReader
 from tickit_devices.eiger.eiger import EigerDevice
-from tickit_devices.eiger.eiger_adapters import EigerRESTAdapter, EigerZMQAdapter
+from tickit_devices.eiger.eiger_adapters import (
+    EigerRESTAdapter,
+    EigerZMQAdapter,
+    EigerZMQIo,
+)
+from tickit_devices.eiger.eiger_presets import get_detector_model
 from tickit_devices.eiger.stream.stream_config import CBOR_STREAM, LEGACY_STREAM
 
 
 @pydantic.v1.dataclasses.dataclass
 class Eiger(ComponentConfig):
-    """Eiger simulation with HTTP adapter."""
+    """Eiger simulation with HTTP adapter.
+
+    Images are replayed from replay_file, a capture file, when given. The detector
+    runs speed_up times faster than simulation time. detector names the model
+    preset to simulate, e.g. "eiger2_x_4m", see eiger_presets.DETECTOR_MODELS.
+    """
 
     host: str = "0.0.0.0"
     port: int = 8081
     stream_host: str = "127.0.0.1"
     stream_legacy_port: int = 9999
     stream_cbor_port: int = 31001
+    replay_file: str | None = None
+    replay_loop: bool = True
+    speed_up: float = 1.0
+    detector: str | None = None
 
     def __call__(self) -> Component:  # noqa: D102
         logging.getLogger("aiohttp.access").setLevel(logging.WARNING)
-        device = EigerDevice()
+        replay = (
+            CaptureReader(Path(self.replay_file), self.replay_loop)
+            if self.replay_file
+            else None
+        )
+        model = get_detector_model(self.detector) if self.detector else None
+        device = EigerDevice(replay=replay, speed_up=self.speed_up, model=model)
         adapters = [
             AdapterContainer(
                 EigerRESTAdapter(device),
@@ -33,17 +55,25 @@ class Eiger(ComponentConfig):
                 ),
             ),
             AdapterContainer(
-                EigerZMQAdapter(device.streams[LEGACY_STREAM]),
-                ZeroMqPushIo(
+                EigerZMQAdapter(
+                    device.streams[LEGACY_STREAM], LEGACY_STREAM, device.metrics
+                ),
+                EigerZMQIo(
                     self.stream_host,
                     self.stream_legacy_port,
+                    LEGACY_STREAM,
+                    device.metrics,
                 ),
             ),
             AdapterContainer(
-                EigerZMQAdapter(device.streams[CBOR_STREAM]),
-                ZeroMqPushIo(
+                EigerZMQAdapter(
+                    device.streams[CBOR_STREAM], CBOR_STREAM, device.metrics
+                ),
+                EigerZMQIo(
                     self.stream_host,
                     self.stream_cbor_port,
+                    CBOR_STREAM,
+                    device.metrics,
                 ),
             ),
         ]
@@ -0,0 +1,325 @@
+"""Throughput benchmark of the Eiger simulation.
+
+Each case drives an EigerDevice and its EigerZMQAdapter headlessly, as fast as the
+simulation allows, and sends the stream to a ZeroMQ PULL consumer in the same
+process. The results are written as JSON so runs of different releases can be
+compared::
+
+    python -m tickit_devices.eiger.benchmark --frames 200 --output results.json
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import platform
+import sys
+import tempfile
+import threading
+from argparse import ArgumentParser
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Any
+
+import aiozmq
+import numpy as np
+import zmq
+from tickit.core.typedefs import SimTime
+
+from tickit_devices.eiger.data.capture import CaptureReader, CaptureWriter
+from tickit_devices.eiger.data.dummy_image import Image
+from tickit_devices.eiger.eiger import EigerDevice
+from tickit_devices.eiger.eiger_adapters import EigerZMQAdapter, EigerZMQIo
+from tickit_devices.eiger.eiger_presets import get_detector_model
+from tickit_devices.eiger.stream.stream_config import CBOR_STREAM, LEGACY_STREAM
+
+LOGGER = logging.getLogger(__name__)
+
+STREAM_FORMATS = [LEGACY_STREAM, CBOR_STREAM]
+HEADER_DETAILS = ["none", "basic", "all"]
+#: Detector model presets, None for the default simulated 16M detector
+DETECTORS = [None, "eiger2_x_1m"]
+#: Sources of the images, the captured compressed frame, frames summed from
+#: sub-exposures or frames replayed from a capture file
+IMAGE_SOURCES = ["dummy", "summed", "replay"]
+
+#: Time allowed for the stream to connect to the consumer before a run
+CONNECT_TIME_S = 0.1
+#: Time allowed for the consumer to receive the stream after the series ends
+RECEIVE_TIMEOUT_S = 60.0
+
+
+@dataclass(frozen=True)
+class BenchmarkCase:
+    """Configuration of a single benchmark run."""
+
+    stream_format: str
+    header_detail: str
+    detector: str | None
+    image_source: str
+    frames: int
+
+
+@dataclass
+class BenchmarkResult:
+    """Measured performance of a benchmark run."""
+
+    case: BenchmarkCase
+    messages: int
+    bytes_received: int
+    seconds: float
+    frames_per_second: float
+    megabytes_per_second: float
+    #: Percentiles of the time from a frame being queued to being received, in ms
+    latency_ms: dict[str, float]
+    #: Peak resident set size of the process so far, in MB, None if not measurable
+    peak_rss_mb: float | None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the result to a JSON serializable dictionary."""
+        result = asdict(self)
+        result.update(result.pop("case"))
+        return result
+
+
+class _Consumer(threading.Thread):
+    """Receives messages from a PUSH socket, timing each message."""
+
+    def __init__(self) -> None:
+        super().__init__(daemon=True)
+        self._socket: zmq.Socket[bytes] = zmq.Context.instance().socket(zmq.PULL)
+        self.port: int = self._socket.bind_to_random_port("tcp://127.0.0.1")
+        self.received_at: list[int] = []
+        self.bytes_received = 0
+        self._stopping = threading.Event()
+
+    def run(self) -> None:
+        poller = zmq.Poller()
+        poller.register(self._socket, zmq.POLLIN)
+        try:
+            while not self._stopping.is_set():
+                if poller.poll(timeout=10):
+                    parts = self._socket.recv_multipart(copy=False)
+                    self.received_at.append(perf_counter_ns())
+                    self.bytes_received += sum(len(part) for part in parts)
+        finally:
+            self._socket.close()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self.join()
+
+
+async def _connect_push_socket(host: str, port: int) -> aiozmq.ZmqStream:
+    return await aiozmq.create_zmq_stream(zmq.PUSH, connect=f"tcp://{host}:{port}")
+
+
+def _replay_file(device: EigerDevice, directory: Path) -> CaptureReader:
+    settings = device.settings
+    shape = (settings.x_pixels_in_detector, settings.y_pixels_in_detector)
+    path = directory / "replay.bin"
+    with CaptureWriter(path) as writer:
+        writer.write_image(Image.create_dummy_image(0, shape))
+    return CaptureReader(path)
+
+
+def _make_device(case: BenchmarkCase, directory: Path) -> EigerDevice:
+    model = get_detector_model(case.detector) if case.detector else None
+    device = EigerDevice(model=model)
+    if case.image_source == "replay":
+        device.replay = _replay_file(device, directory)
+    elif case.image_source == "summed":
+        device.settings["auto_summation"] = True
+        device.settings["nexpi"] = 2
+    device.settings["trigger_mode"] = "ints"
+    device.settings["nimages"] = case.frames
+    device.stream_config["format"] = case.stream_format
+    device.stream_config["header_detail"] = case.header_detail
+    return device
+
+
+async def run_case(case: BenchmarkCase) -> BenchmarkResult:
+    """Run a benchmark case.
+
+    Args:
+        case: The configuration of the run.
+
+    Returns:
+        BenchmarkResult: The measured performance.
+
+    Raises:
+        TimeoutError: If the consumer does not receive the whole stream.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        device = _make_device(case, Path(directory))
+        adapter = EigerZMQAdapter(
+            device.streams[case.stream_format], case.stream_format, device.metrics
+        )
+        consumer = _Consumer()
+        consumer.start()
+        io = EigerZMQIo(
+            "127.0.0.1",
+            consumer.port,
+            case.stream_format,
+            device.metrics,
+            socket_factory=_connect_push_socket,
+        )
+
+        async def raise_interrupt() -> None: ...
+
+        await io.setup(adapter, raise_interrupt)
+        # Give the socket time to connect so it is not included in the timings
+        await asyncio.sleep(CONNECT_TIME_S)
+        try:
+            queued_at = await _acquire(device, adapter)
+            deadline = perf_counter_ns() + int(RECEIVE_TIMEOUT_S * 1e9)
+            while len(consumer.received_at) < len(queued_at):
+                if perf_counter_ns() > deadline:
+                    raise TimeoutError(
+                        f"Received {len(consumer.received_at)} of {len(queued_at)} "
+                        "messages"
+                    )
+                await asyncio.sleep(0.001)
+        finally:
+            # The replay file is unmapped once the streams release its frames
+            await io.shutdown()
+            consumer.stop()
+
+    latencies = np.array(consumer.received_at) - np.array(queued_at)
+    seconds = (consumer.received_at[-1] - queued_at[0]) / 1e9
+    return BenchmarkResult(
+        case=case,
+        messages=len(queued_at),
+        bytes_received=consumer.bytes_received,
+        seconds=seconds,
+        frames_per_second=case.frames / seconds,
+        megabytes_per_second=consumer.bytes_received / seconds / 1e6,
+        latency_ms={
+            f"p{percentile}": float(np.percentile(latencies, percentile)) / 1e6
+            for percentile in (50, 90, 99, 100)
+        },
+        peak_rss_mb=_peak_rss_mb(),
+    )
+
+
+async def _acquire(device: EigerDevice, adapter: EigerZMQAdapter) -> list[int]:
+    """Run a series to completion, returning the times messages were queued."""
+    queued_at: list[int] = []
+
+    def flush() -> None:
+        depth = adapter.buffer_depth()
+        adapter.after_update()
+        now = perf_counter_ns()
+        queued_at.extend(now for _ in range(adapter.buffer_depth() - depth))
+
+    await device.initialize()
+    await device.arm()
+    await device.trigger()
+    time: SimTime | None = SimTime(0)
+    while time is not None:
+        time = device.update(time, {}).call_at
+        flush()
+        # Let the IO send the queued messages
+        await asyncio.sleep(0)
+    return queued_at
+
+
+def _peak_rss_mb() -> float | None:
+    # resource is only available on Unix, so is imported when the case is measured
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def benchmark_cases(
+    frames: int,
+    stream_formats: Sequence[str] = STREAM_FORMATS,
+    header_details: Sequence[str] = HEADER_DETAILS,
+    detectors: Sequence[str | None] = DETECTORS,
+    image_sources: Sequence[str] = IMAGE_SOURCES,
+) -> list[BenchmarkCase]:
+    """Get every combination of the benchmark parameters.
+
+    Args:
+        frames: The number of frames acquired in each case.
+        stream_formats: The stream formats to benchmark.
+        header_details: The header detail levels to benchmark.
+        detectors: The detector model presets to benchmark.
+        image_sources: The image sources to benchmark.
+
+    Returns:
+        list[BenchmarkCase]: The benchmark cases.
+    """
+    return [
+        BenchmarkCase(*parameters, frames=frames)
+        for parameters in itertools.product(
+            stream_formats, header_details, detectors, image_sources
+        )
+    ]
+
+
+def run_benchmarks(cases: Sequence[BenchmarkCase]) -> dict[str, Any]:
+    """Run benchmark cases one after another.
+
+    Args:
+        cases: The cases to run.
+
+    Returns:
+        dict[str, Any]: The results with a description of the environment.
+    """
+    from tickit_devices import __version__
+
+    results = []
+    for case in cases:
+        result = asyncio.run(run_case(case))
+        LOGGER.info(
+            f"{case}: {result.frames_per_second:.1f} frames/s, "
+            f"{result.megabytes_per_second:.1f} MB/s"
+        )
+        results.append(result.to_dict())
+    return {
+        "version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def main(args: Sequence[str] | None = None) -> None:
+    """Run the benchmark from the command line."""
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--format", nargs="+", default=STREAM_FORMATS)
+    parser.add_argument("--header-detail", nargs="+", default=HEADER_DETAILS)
+    parser.add_argument(
+        "--detector",
+        nargs="+",
+        default=DETECTORS,
+        type=lambda name: None if name == "default" else name,
+        help='Detector model presets, "default" for the simulated 16M detector',
+    )
+    parser.add_argument("--image-source", nargs="+", default=IMAGE_SOURCES)
+    parser.add_argument("--output", type=Path, default=Path("eiger_benchmark.json"))
+    parsed = parser.parse_args(args)
+
+    logging.basicConfig(level=logging.INFO)
+    cases = benchmark_cases(
+        parsed.frames,
+        parsed.format,
+        parsed.header_detail,
+        parsed.detector,
+        parsed.image_source,
+    )
+    results = run_benchmarks(cases)
+    parsed.output.write_text(json.dumps(results, indent=2))
+    LOGGER.info(f"Wrote {len(cases)} results to {parsed.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Process wide registry of immutable assets shared by Eiger instances.
+
+Large read-only data, such as the dummy frame, the Stream2 message templates and
+the zeroed header datasets, are created once per process and shared by every
+detector that uses them. Each asset is reference counted by the objects holding it
+and dropped once the last holder releases it or is garbage collected.
+
+Assets must be treated as immutable by their holders.
+"""
+
+import sys
+import weakref
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+import numpy as np
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class AssetUsage:
+    """Memory used by a shared asset."""
+
+    #: Approximate size of the asset in bytes
+    nbytes: int
+    #: Number of objects holding the asset, across all detectors
+    holders: int
+
+
+class AssetRegistry:
+    """Reference counted cache of immutable assets."""
+
+    def __init__(self) -> None:
+        """Create an empty registry."""
+        self._assets: dict[str, Any] = {}
+        self._sizes: dict[str, int] = {}
+        self._holders: dict[str, int] = {}
+        self._held: dict[int, set[str]] = {}
+
+    def acquire(self, holder: object, name: str, factory: Callable[[], T]) -> T:
+        """Get an asset, creating it if no other holder has done so.
+
+        Args:
+            holder: The object holding the asset, released when it is collected.
+            name: Unique name of the asset.
+            factory: Creates the asset if it is not in the registry.
+
+        Returns:
+            The shared asset.
+        """
+        if name not in self._assets:
+            asset = factory()
+            self._assets[name] = asset
+            self._sizes[name] = sizeof(asset)
+            self._holders[name] = 0
+
+        if id(holder) not in self._held:
+            self._held[id(holder)] = set()
+            weakref.finalize(holder, self._release_id, id(holder))
+        held = self._held[id(holder)]
+        if name not in held:
+            held.add(name)
+            self._holders[name] += 1
+        return self._assets[name]
+
+    def release(self, holder: object) -> None:
+        """Release all assets held by an object.
+
+        Args:
+            holder: The object holding the assets.
+        """
+        self._release_id(id(holder))
+
+    def usage(self, *holders: object) -> Mapping[str, AssetUsage]:
+        """Report the memory used by the assets held by some objects.
+
+        Args:
+            holders: The objects to report on, e.g. the streams of a detector.
+
+        Returns:
+            Mapping[str, AssetUsage]: The usage of each asset by name.
+        """
+        names = set().union(*(self._held.get(id(holder), ()) for holder in holders))
+        return {
+            name: AssetUsage(self._sizes[name], self._holders[name])
+            for name in sorted(names)
+        }
+
+    def _release_id(self, holder_id: int) -> None:
+        for name in self._held.pop(holder_id, ()):
+            self._holders[name] -= 1
+            if self._holders[name] == 0:
+                del self._assets[name], self._sizes[name], self._holders[name]
+
+
+def sizeof(asset: Any) -> int:
+    """Estimate the memory used by an asset, including its contents.
+
+    Args:
+        asset: The asset to measure.
+
+    Returns:
+        int: The approximate size in bytes.
+    """
+    seen: set[int] = set()
+
+    def _sizeof(obj: Any) -> int:
+        if id(obj) in seen:
+            return 0
+        seen.add(id(obj))
+        if isinstance(obj, np.ndarray):
+            return obj.nbytes
+        size = sys.getsizeof(obj)
+        if isinstance(obj, Mapping):
+            size += sum(_sizeof(k) + _sizeof(v) for k, v in obj.items())
+        elif isinstance(obj, list | tuple | set):
+            size += sum(_sizeof(item) for item in obj)
+        elif hasattr(obj, "value") and hasattr(obj, "tag"):
+            size += _sizeof(obj.value)
+        return size
+
+    return _sizeof(asset)
+
+
+#: The registry shared by all detectors in the process
+ASSETS = AssetRegistry()
@@ -0,0 +1,247 @@
+"""Capture files of detector frames, replayed through the simulated streams.
+
+A capture file holds the frames back to back, followed by an index of the frame
+offsets and a JSON description of the frames, so that frames can be served straight
+from a memory map of the file without loading it::
+
+    | MAGIC | frame 0 | ... | frame n-1 | offsets | metadata | trailer |
+
+The offsets are n + 1 little-endian uint64 values and the trailer gives the position
+of the offsets, the number of frames and the length of the metadata.
+"""
+
+import json
+import logging
+import mmap
+import struct
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+
+import cbor2
+import numpy as np
+import zmq
+
+from tickit_devices.eiger.data.dummy_image import Image
+
+LOGGER = logging.getLogger(__name__)
+
+MAGIC = b"TKEIGCAP"
+_TRAILER = struct.Struct("<QQQ8s")
+_OFFSET_DTYPE = np.dtype("<u8")
+
+_CBOR_HEADER = b"\xd9\xd9\xf7"
+_TYPED_ARRAY_DTYPES = {64: "uint8", 69: "uint16", 70: "uint32"}
+_COMPRESSION_TAG = 56500
+
+
+class CaptureWriter:
+    """Writes images to a capture file.
+
+    The first image written describes the dtype, encoding and shape of every frame
+    in the file.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Create a capture file, replacing any existing file.
+
+        Args:
+            path: Path of the capture file.
+        """
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        self._offsets = [len(MAGIC)]
+        self._metadata: dict[str, Any] | None = None
+
+    def write_image(self, image: Image) -> None:
+        """Append an image to the capture file.
+
+        Args:
+            image: The image to append.
+
+        Raises:
+            ValueError: If the image is not described by the file metadata.
+        """
+        metadata = {
+            "dtype": image.dtype,
+            "encoding": image.encoding,
+            "shape": list(image.shape),
+        }
+        if self._metadata is None:
+            self._metadata = metadata
+        elif metadata != self._metadata:
+            raise ValueError(f"Image {metadata} does not match {self._metadata}")
+
+        self._file.write(image.data)
+        self._offsets.append(self._offsets[-1] + len(image.data))
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def close(self) -> None:
+        """Write the index and close the file."""
+        if self._file.closed:
+            return
+        offsets_position = self._offsets[-1]
+        metadata = json.dumps(self._metadata or {}).encode()
+        self._file.write(np.array(self._offsets, dtype=_OFFSET_DTYPE).tobytes())
+        self._file.write(metadata)
+        self._file.write(
+            _TRAILER.pack(offsets_position, len(self), len(metadata), MAGIC)
+        )
+        self._file.close()
+
+    def __enter__(self) -> "CaptureWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+class CaptureReader:
+    """Serves the images of a capture file from a read-only memory map.
+
+    Image data are slices of the memory map, so frames are only paged in from the
+    file as they are sent.
+    """
+
+    def __init__(self, path: Path, loop: bool = True) -> None:
+        """Open a capture file.
+
+        Args:
+            path: Path of the capture file.
+            loop: Whether to start again from the first frame after the last one,
+                otherwise no images are served past the end of the file.
+
+        Raises:
+            ValueError: If the file is not a capture file.
+        """
+        self.path = path
+        self.loop = loop
+        with open(path, "rb") as capture_file:
+            self._map = mmap.mmap(capture_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+
+        if len(self._map) < len(MAGIC) + _TRAILER.size or (
+            self._view[: len(MAGIC)] != MAGIC
+        ):
+            self.close()
+            raise ValueError(f"{path} is not a capture file")
+        offsets_position, num_frames, metadata_length, _ = _TRAILER.unpack_from(
+            self._map, len(self._map) - _TRAILER.size
+        )
+        self._offsets = np.frombuffer(
+            self._map,
+            dtype=_OFFSET_DTYPE,
+            count=num_frames + 1,
+            offset=offsets_position,
+        )
+        metadata_position = offsets_position + self._offsets.nbytes
+        metadata = json.loads(
+            bytes(self._view[metadata_position : metadata_position + metadata_length])
+        )
+        self.dtype: str = metadata.get("dtype", "uint16")
+        self.encoding: str = metadata.get("encoding", "<")
+        self.shape: tuple[int, int] = tuple(metadata.get("shape", (0, 0)))
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def image(self, index: int) -> Image | None:
+        """Get an image from the capture file.
+
+        Args:
+            index: Index of the image in the acquisition.
+
+        Returns:
+            Image | None: The image wrapping a slice of the file, or None past the
+                end of the file when not looping.
+        """
+        if len(self) == 0 or (index >= len(self) and not self.loop):
+            return None
+        frame = index % len(self)
+        start, stop = int(self._offsets[frame]), int(self._offsets[frame + 1])
+        return Image(
+            index,
+            str(hash((str(self.path), frame))),
+            self.dtype,
+            self._view[start:stop],
+            self.encoding,
+            self.shape,
+        )
+
+    def close(self) -> None:
+        """Release the memory map, images served must no longer be in use."""
+        self._offsets = np.empty(0, dtype=_OFFSET_DTYPE)
+        self._view.release()
+        self._map.close()
+
+
+def record_stream(address: str, path: Path, num_frames: int) -> int:
+    """Record the images of a live legacy or stream2 stream to a capture file.
+
+    Only the first channel of stream2 images is recorded.
+
+    Args:
+        address: ZeroMQ address of the stream, e.g. "tcp://127.0.0.1:9999".
+        path: Path of the capture file.
+        num_frames: Number of images to record.
+
+    Returns:
+        int: The number of images recorded.
+    """
+    socket: zmq.Socket[bytes] = zmq.Context.instance().socket(zmq.PULL)
+    socket.connect(address)
+    try:
+        with CaptureWriter(path) as writer:
+            while len(writer) < num_frames:
+                for image in _parse_images(socket.recv_multipart(copy=True)):
+                    writer.write_image(image)
+                    if len(writer) == num_frames:
+                        break
+            LOGGER.info(f"Recorded {len(writer)} images from {address} to {path}")
+            return len(writer)
+    finally:
+        socket.close()
+
+
+def _parse_images(parts: list[bytes]) -> list[Image]:
+    images = []
+    for i, part in enumerate(parts):
+        if part.startswith(_CBOR_HEADER):
+            message = cbor2.loads(part)
+            if message.get("type") == "image":
+                images.append(_parse_stream2_image(message))
+        elif part.startswith(b"{") and b"dimage_d-1.0" in part[:256]:
+            header = json.loads(part)
+            images.append(
+                Image(
+                    len(images),
+                    "",
+                    header["type"],
+                    parts[i + 1],
+                    header["encoding"],
+                    tuple(header["shape"]),
+                )
+            )
+    return images
+
+
+def _parse_stream2_image(message: dict[str, Any]) -> Image:
+    channel = next(iter(message["data"].values()))
+    (y, x), typed_array = channel.value
+    dtype = _TYPED_ARRAY_DTYPES[typed_array.tag]
+    if (
+        isinstance(typed_array.value, cbor2.CBORTag)
+        and typed_array.value.tag == _COMPRESSION_TAG
+    ):
+        _, element_size, data = typed_array.value.value
+        encoding = f"bs{element_size * 8}-lz4<"
+    else:
+        data, encoding = typed_array.value, "<"
+    return Image(message["image_id"], "", dtype, data, encoding, (x, y))
@@ -2,49 +2,116 @@ from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
 
+import numpy as np
+
 
 @dataclass
 class Image:
-    """Dataclass to create a basic Image object."""
+    """Dataclass to create a basic Image object.
+
+    Start and stop times of the exposure are in ns since the start of the series.
+    """
 
     index: int
     hash: str
     dtype: str
-    data: bytes
+    data: bytes | memoryview
     encoding: str
     shape: tuple[int, int]
+    start_time: int = 0
+    stop_time: int = 0
 
     @classmethod
-    def create_dummy_image(cls, index: int, shape: tuple[int, int]) -> "Image":
+    def create_dummy_image(
+        cls,
+        index: int,
+        shape: tuple[int, int],
+        bit_depth: int = 16,
+        nexpi: int = 1,
+        blob: bytes | None = None,
+    ) -> "Image":
         """Returns an Image object wrapping the dummy blob using the metadata provided.
 
+        A single 16 bit exposure of a 16M detector uses the compressed blob captured
+        from a real detector, otherwise an uncompressed image summed from nexpi
+        synthetic sub-exposures is used.
+
         Args:
             index (int): The index of the Image in the current acquisition.
+            shape (tuple[int, int]): The (x, y) size of the image in pixels.
+            bit_depth (int): The bit depth of the image, 16 or 32.
+            nexpi (int): The number of sub-exposures summed into the image.
+            blob (bytes | None): The compressed blob, e.g. as held from the asset
+                registry, defaults to `dummy_image_blob`.
 
         Returns:
             Image: An Image object wrapping the dummy blob.
         """
-        data = dummy_image_blob()
+        dtype = f"uint{bit_depth}"
+        if bit_depth == 16 and nexpi == 1 and shape == DUMMY_IMAGE_SHAPE:
+            data = dummy_image_blob() if blob is None else blob
+            encoding = "bs16-lz4<"
+        else:
+            data = summed_image_blob(shape, dtype, nexpi)
+            encoding = "<"
         hsh = str(hash(data))
-        dtype = "uint16"
-        encoding = "bs16-lz4<"
         return Image(index, hsh, dtype, data, encoding, shape)
 
 
 DUMMY_IMAGE_BLOB_PATH: Path = Path(__file__).parent / "frame_sample"
+#: The (x, y) size of the dummy image blob
+DUMMY_IMAGE_SHAPE: tuple[int, int] = (4148, 4362)
+
+
+def read_dummy_image_blob() -> bytes:
+    """Load the raw bytes of a compressed image taken from the stream of a real Eiger
+    detector.
+
+    Returns:
+        A compressed image as a bytes object.
+    """
+    with DUMMY_IMAGE_BLOB_PATH.open("rb") as frame_file:
+        return frame_file.read()
 
 
 @lru_cache(maxsize=1)
 def dummy_image_blob() -> bytes:
-    """Load and cache the dummy image blob.
+    """Load and cache the dummy image blob, for images made outside of a detector.
 
-    Load the raw bytes of a compressed image
-    taken from the stream of a real Eiger detector.
-    This function is cached so there should be few
-    (ideally one) loads per runtime.
+    Detectors share the blob through the asset registry instead.
 
     Returns:
         A compressed image as a bytes object.
     """
-    with DUMMY_IMAGE_BLOB_PATH.open("rb") as frame_file:
-        return frame_file.read()
+    return read_dummy_image_blob()
+
+
+#: Upper bound of the counts in a single synthetic sub-exposure
+SUB_EXPOSURE_MAX_COUNTS = 16
+
+
+# A single image is cached, as an image of a 16M detector is 64MB at 32 bits
+@lru_cache(maxsize=1)
+def summed_image_blob(shape: tuple[int, int], dtype: str, nexpi: int) -> bytes:
+    """Generate and cache an uncompressed image summed from synthetic sub-exposures.
+
+    Each sub-exposure is a 16 bit frame of random counts which is accumulated in
+    place into the image, as the detector does when summing nexpi exposures.
+
+    Args:
+        shape: The (x, y) size of the image in pixels.
+        dtype: The numpy dtype of the summed image, "uint16" or "uint32".
+        nexpi: The number of sub-exposures to sum.
+
+    Returns:
+        The little-endian image as a bytes object.
+    """
+    x, y = shape
+    rng = np.random.default_rng(seed=0)
+    image = np.zeros((y, x), dtype=dtype)
+    for _ in range(nexpi):
+        sub_exposure = rng.integers(
+            SUB_EXPOSURE_MAX_COUNTS, size=(y, x), dtype=np.uint16
+        )
+        np.add(image, sub_exposure, out=image, casting="unsafe")
+    return image.astype(np.dtype(dtype).newbyteorder("<"), copy=False).tobytes()
@@ -1,13 +1,25 @@
 import asyncio
 import logging
-from collections.abc import Mapping
+from collections import deque
+from collections.abc import Mapping, Sequence
+from fractions import Fraction
 from queue import Queue
+from time import perf_counter_ns
+from typing import Any
 
 from tickit.core.device import Device, DeviceUpdate
 from tickit.core.typedefs import SimTime
 from typing_extensions import TypedDict
 
-from tickit_devices.eiger.data.dummy_image import Image
+from tickit_devices.eiger.data.assets import ASSETS, AssetUsage
+from tickit_devices.eiger.data.capture import CaptureReader
+from tickit_devices.eiger.data.dummy_image import (
+    DUMMY_IMAGE_SHAPE,
+    Image,
+    read_dummy_image_blob,
+)
+from tickit_devices.eiger.eiger_metrics import EigerMetrics
+from tickit_devices.eiger.eiger_presets import DetectorModel
 from tickit_devices.eiger.eiger_settings import EigerSettings
 from tickit_devices.eiger.filewriter.filewriter_config import FileWriterConfig
 from tickit_devices.eiger.filewriter.filewriter_status import FileWriterStatus
@@ -26,6 +38,16 @@ from .eiger_status import EigerStatus, State
 
 LOGGER = logging.getLogger("Eiger")
 
+#: Trigger modes in which the trigger input gates the exposure
+GATED_TRIGGER_MODES = ("exte", "extg")
+#: Most overdue frames acquired in one update when the simulation falls behind
+CATCH_UP_BATCH_FRAMES = 100
+
+
+def seconds_to_ns(seconds: float) -> int:
+    """Convert a time in seconds to the nearest integer nanosecond."""
+    return round(seconds * 1e9)
+
 
 class EigerDevice(Device):
     """Simulation logic for the Eiger detector.
@@ -39,6 +61,19 @@ class EigerDevice(Device):
     READY -> ACQUIRING
     ACQUIRING -> READY
     ACQUIRING -> IDLE
+
+    With a speed_up factor the detector runs faster than simulation time, frame
+    periods are shortened in simulation time while the frame timestamps stay in
+    detector time.
+
+    Frames are due at the start of the trigger plus a whole number of frame periods,
+    in integer nanoseconds, so late updates do not delay the frames that follow.
+    Overdue frames are acquired in batches of up to CATCH_UP_BATCH_FRAMES and the
+    lag is recorded in the metrics.
+
+    In the gated trigger modes the trigger input is treated as a gate: in EXTE mode
+    frames are taken while the gate is high and each gate is one trigger, in EXTG
+    mode each trigger takes nimages frames, exposing only while the gate is high.
     """
 
     settings: EigerSettings
@@ -59,24 +94,58 @@ class EigerDevice(Device):
         settings: EigerSettings | None = None,
         status: EigerStatus | None = None,
         stream: EigerStream | EigerStream2 | None = None,
+        replay: CaptureReader | None = None,
+        speed_up: float = 1.0,
+        model: DetectorModel | None = None,
     ) -> None:
         """Construct a new eiger.
 
         Args:
-            settings: Eiger settings. Defaults to None.
+            settings: Eiger settings. Defaults to None, for the default settings of
+                the detector model.
             status: Starting status. Defaults to None.
             stream: Data stream handler. Defaults to None.
+            replay: Capture file to take images from instead of the dummy image.
+                Defaults to None.
+            speed_up: Factor by which the detector runs faster than simulation time.
+                Defaults to 1.0.
+            model: Detector model preset giving the geometry and timing of the
+                detector. Defaults to None, for a simulated 16M detector.
+
+        Raises:
+            ValueError: If speed_up is not positive.
         """
-        self.settings = settings or EigerSettings()
+        if speed_up <= 0:
+            raise ValueError(f"speed_up must be positive, got {speed_up}")
+        self.model = model
+        self.settings = settings or (model.settings() if model else EigerSettings())
+        #: Snapshot of the settings taken when the current series was armed
+        self.series_settings = self.settings.snapshot()
         self.status = status or EigerStatus()
 
         self.stream_status: StreamStatus = StreamStatus()
         self.stream_config: StreamConfig = StreamConfig()
+        stream_period = SimTime(int(1e9))
         self.streams = {
-            LEGACY_STREAM: stream or EigerStream(callback_period=SimTime(int(1e9))),
-            CBOR_STREAM: stream or EigerStream2(callback_period=SimTime(int(1e9))),
+            LEGACY_STREAM: stream or EigerStream(callback_period=stream_period),
+            CBOR_STREAM: stream or EigerStream2(stream_period, model=model),
         }
         self.stream = self.streams[CBOR_STREAM]
+        self.replay = replay
+        shape = (
+            self.settings.x_pixels_in_detector,
+            self.settings.y_pixels_in_detector,
+        )
+        #: The compressed frame, shared with the other detectors of the process
+        self._frame_sample: bytes | None = None
+        if replay is None and shape == DUMMY_IMAGE_SHAPE:
+            self._frame_sample = ASSETS.acquire(
+                self, "frame_sample", read_dummy_image_blob
+            )
+        self.metrics = EigerMetrics()
+        self.metrics.asset_usage = self.memory_report
+        self.speed_up = speed_up
+        self._speed_up_ratio = Fraction(speed_up).as_integer_ratio()
 
         self.filewriter_status: FileWriterStatus = FileWriterStatus()
         self.filewriter_config: FileWriterConfig = FileWriterConfig()
@@ -92,6 +161,18 @@ class EigerDevice(Device):
         self._data_queue: Queue = Queue()
         self._series_id: int = 0
 
+        self._trigger_level: bool = False
+        self._gate_opened_at: SimTime | None = None
+        self._gated_time: int = 0
+
+        #: Queued triggers as runs of (frame period in ns, number of triggers)
+        self._trigger_queue: deque[tuple[int, int]] = deque()
+        self._frame_period: int = 0
+        self._trigger_start: SimTime | None = None
+        self._cancelling: bool = False
+        self._trigger_frames: int = 0
+        self._series_start: SimTime | None = None
+
         self._finished_trigger: asyncio.Event | None = None
 
     @property
@@ -105,6 +186,36 @@ class EigerDevice(Device):
 
         return self._finished_trigger
 
+    def memory_report(self) -> Mapping[str, AssetUsage]:
+        """Report the shared assets used by this detector and its streams.
+
+        Returns:
+            Mapping[str, AssetUsage]: The usage of each asset by name.
+        """
+        return ASSETS.usage(self, *self.streams.values())
+
+    def set_stream_config(self, key: str, value: Any) -> None:
+        """Set a stream configuration parameter.
+
+        Appendices are passed on to the streams so they are encoded once, rather
+        than every time they are sent.
+
+        Args:
+            key: Name of the stream configuration parameter.
+            value: New value of the parameter.
+
+        Raises:
+            InvalidValueError: If the value cannot be set on the parameter.
+        """
+        self.stream_config[key] = value
+
+        if key == "header_appendix":
+            for stream in self.streams.values():
+                stream.set_header_appendix(value)
+        elif key == "image_appendix":
+            for stream in self.streams.values():
+                stream.set_image_appendix(value)
+
     async def initialize(self) -> None:
         """Initialize the detector.
 
@@ -117,13 +228,18 @@ class EigerDevice(Device):
 
         Required for triggering.
         """
+        self.series_settings = self.settings.snapshot()
         self.stream = self.streams[self.stream_config.format]
         self._series_id += 1
         self.stream.begin_series(
-            self.settings, self._series_id, self.stream_config.header_detail
+            self.series_settings, self._series_id, self.stream_config.header_detail
         )
-        self._num_frames_left = self.settings.nimages
-        self._num_triggers_left = self.settings.ntrigger
+        self._num_frames_left = self.series_settings.nimages
+        self._num_triggers_left = self.series_settings.ntrigger
+        self._clear_trigger_queue()
+        self.status.triggers_completed = 0
+        self._series_start = None
+        self._cancelling = False
         self._set_state(State.READY)
 
     async def disarm(self) -> None:
@@ -131,23 +247,46 @@ class EigerDevice(Device):
 
         Intended for use when armed. See state diagram in class docstring.
         """
+        self._clear_trigger_queue()
+        self._cancelling = False
         self._set_state(State.IDLE)
         self.stream.end_series(self._series_id)
 
-    async def trigger(self) -> None:
+    async def trigger(
+        self, count: int = 1, count_times: Sequence[float] | None = None
+    ) -> None:
         """Trigger the detector.
 
-        If the detector is in INTS mode, it will begin acquiring frames the
-        next time update() is called. If it is in EXTS mode, this call will
-        be ignored and acquisition will start based on the parameter to
+        If the detector is in INTS or INTE mode, it will begin acquiring frames the
+        next time update() is called. If it is in EXTS, EXTE or EXTG mode, this
+        call will be ignored and acquisition will start based on the parameter to
         update().
-        INTE and EXTE mode are currently not supported.
+
+        Triggers are queued so a whole series can be requested at once, each trigger
+        starts as soon as the previous one has finished and finished_trigger is only
+        set once the queue is empty.
+
+        Args:
+            count: The number of triggers to queue in INTS mode.
+            count_times: The count time of each trigger to queue in INTE mode,
+                defaults to a single trigger with the configured count_time.
         """
         LOGGER.info("Trigger requested")
-        trigger_mode = self.settings.trigger_mode
+        settings = self.series_settings
+        trigger_mode = settings.trigger_mode
+
+        if (
+            self._is_in_state(State.READY) or self._is_in_state(State.ACQUIRE)
+        ) and trigger_mode in ("ints", "inte"):
+            if trigger_mode == "ints":
+                self._queue_triggers(seconds_to_ns(settings.frame_time), count)
+            else:
+                readout_time = settings.detector_readout_time
+                for count_time in count_times or [settings.count_time]:
+                    self._queue_triggers(seconds_to_ns(count_time + readout_time), 1)
 
-        if self._is_in_state(State.READY) and trigger_mode == "ints":
-            self._begin_acqusition_mode()
+            if self._is_in_state(State.READY) and self._trigger_queue:
+                self._begin_queued_trigger()
         else:
             LOGGER.info(
                 f"Ignoring trigger, state={self.get_state()},"
@@ -157,18 +296,32 @@ class EigerDevice(Device):
     async def cancel(self) -> None:
         """Cancel acquisition.
 
-        The detector will stop acquiring frames after the next full frame is taken,
-        it will then return to a READY state as though it has just been armed.
+        The detector will stop acquiring frames once the frame being exposed is
+        complete, it will then end the series and return to a READY state. Frames
+        already taken are still sent. As the series has ended, it must be armed again
+        before it is triggered.
         """
-        self._set_state(State.READY)
-        self.stream.end_series(self._series_id)
+        self._trigger_queue.clear()
+        self.status.triggers_queued = 0
+        if self._is_in_state(State.ACQUIRE):
+            self._cancelling = True
+            self._num_frames_left = 0
+        else:
+            self.finished_trigger.set()
+            self._num_triggers_left = 0
+            self._set_state(State.READY)
+            self.stream.end_series(self._series_id)
 
     async def abort(self) -> None:
         """Abort acquisition.
 
         The detector will immediately stop acquiring frames and disarm itself.
+        Frames which have not yet been sent are dropped.
         """
+        self._clear_trigger_queue()
+        self._cancelling = False
         self._set_state(State.IDLE)
+        self.stream.drop_pending()
         self.stream.end_series(self._series_id)
 
     def update(self, time: SimTime, inputs: Inputs) -> DeviceUpdate[Outputs]:
@@ -181,52 +334,245 @@ class EigerDevice(Device):
             time: The current simulation time (in nanoseconds).
             inputs: A mapping of device inputs and their values.
         """
+        start = perf_counter_ns()
+        try:
+            return self._update_acquisition(time, inputs)
+        finally:
+            self.metrics.update_duration.observe_since(start)
+
+    def _update_acquisition(
+        self, time: SimTime, inputs: Inputs
+    ) -> DeviceUpdate[Outputs]:
+        trigger = bool(inputs.get("trigger", False))
+        rising = trigger and not self._trigger_level
+        falling = self._trigger_level and not trigger
+        self._trigger_level = trigger
+
+        if self.series_settings.trigger_mode in GATED_TRIGGER_MODES:
+            return self._update_gated(time, rising, falling)
+
         if self._is_in_state(State.ACQUIRE):
+            if self._trigger_start is None:
+                self._trigger_start = time
             if self._num_frames_left > 0:
-                self._acquire_frame()
+                return self._acquire_due_frames(time)
 
-                return DeviceUpdate(
-                    self.Outputs(), SimTime(time + int(self.settings.frame_time * 1e9))
-                )
+            # The trigger ends when the exposure of its last frame is complete
+            end_at = self._frame_due(self._trigger_frames)
+            if time < end_at:
+                return DeviceUpdate(self.Outputs(), end_at)
             else:
-                self.finished_trigger.set()
+                self._end_trigger()
 
-                if self._num_triggers_left > 0:
-                    self._set_state(State.READY)
-                    self._num_frames_left = self.settings.nimages
-                else:
-                    LOGGER.debug("Ending Series...")
-                    self._set_state(State.IDLE)
-                    self.stream.end_series(self._series_id)
+                if self._is_in_state(State.READY) and self.status.triggers_queued:
+                    self._begin_queued_trigger()
+                    return DeviceUpdate(self.Outputs(), SimTime(time))
 
-        if inputs.get("trigger", False):
+        if trigger and self._num_triggers_left > 0:
             self._begin_acqusition_mode()
             # Should have another update immediately to begin acquisition
             return DeviceUpdate(self.Outputs(), SimTime(time))
 
         return DeviceUpdate(self.Outputs(), None)
 
-    def _begin_acqusition_mode(self) -> None:
+    def _acquire_due_frames(self, time: SimTime) -> DeviceUpdate[Outputs]:
+        """Acquire the frames of the current trigger that are due by the given time.
+
+        Returns:
+            DeviceUpdate: An update at the time the next frame is due, or straight
+                away if frames are still overdue after a batch.
+        """
+        lag = time - self._frame_due(self._trigger_frames)
+        if lag > 0:
+            self.metrics.frame_lag.observe(lag)
+            LOGGER.debug(f"Frames are {lag} ns behind schedule")
+
+        for _ in range(CATCH_UP_BATCH_FRAMES):
+            due = self._frame_due(self._trigger_frames)
+            if self._num_frames_left == 0 or due > time:
+                break
+            self._acquire_frame(due)
+        else:
+            # Let the rest of the simulation run before catching up further
+            return DeviceUpdate(self.Outputs(), time)
+
+        return DeviceUpdate(self.Outputs(), self._frame_due(self._trigger_frames))
+
+    def _frame_due(self, frame: int) -> SimTime:
+        """Get the simulation time at which a frame of the current trigger is due."""
+        assert self._trigger_start is not None
+        return SimTime(
+            self._trigger_start + self._sim_duration(frame * self._frame_period)
+        )
+
+    def _update_gated(
+        self, time: SimTime, rising: bool, falling: bool
+    ) -> DeviceUpdate[Outputs]:
+        """Acquire the frames exposed by the trigger gate up to the current time.
+
+        The exposure of the current trigger is the time the gate has spent open since
+        the trigger began, so the number of completed frames and the time at which the
+        next one completes both follow directly from the gate edges.
+        """
+        if rising:
+            if self._is_in_state(State.READY) and self._num_triggers_left > 0:
+                self._begin_acqusition_mode()
+                self._gated_time = 0
+            if self._is_in_state(State.ACQUIRE):
+                self._gate_opened_at = time
+
+        if not self._is_in_state(State.ACQUIRE):
+            return DeviceUpdate(self.Outputs(), None)
+
+        exposed = self._gated_time
+        if self._gate_opened_at is not None:
+            exposed += time - self._gate_opened_at
+        if falling:
+            self._gated_time = exposed
+            self._gate_opened_at = None
+
+        nimages = self.series_settings.nimages
+        # A frame time below 1ns, which is only set other than by a PUT, is 1ns
+        frame_period = max(seconds_to_ns(self.series_settings.frame_time), 1)
+        frames_due = min(self._detector_duration(exposed) // frame_period, nimages)
+        while nimages - self._num_frames_left < frames_due:
+            self._acquire_frame(time)
+
+        end_of_gate = falling and self.series_settings.trigger_mode == "exte"
+        if self._num_frames_left == 0 or end_of_gate:
+            self._gate_opened_at = None
+            self._end_trigger()
+            return DeviceUpdate(self.Outputs(), None)
+        elif self._gate_opened_at is None:
+            # Gate is closed, the trigger resumes on the next rising edge
+            return DeviceUpdate(self.Outputs(), None)
+
+        frames_taken = nimages - self._num_frames_left
+        next_frame_at = (
+            self._gate_opened_at
+            + self._sim_duration((frames_taken + 1) * frame_period, round_up=True)
+            - self._gated_time
+        )
+        return DeviceUpdate(self.Outputs(), SimTime(next_frame_at))
+
+    def _queue_triggers(self, frame_period: int, count: int) -> None:
+        available = self._num_triggers_left - self.status.triggers_queued
+        if count > available:
+            LOGGER.warning(
+                f"Only {available} of {count} requested triggers left in series"
+            )
+            count = available
+        if count <= 0:
+            return
+
+        if self._trigger_queue and self._trigger_queue[-1][0] == frame_period:
+            count += self._trigger_queue.pop()[1]
+        self._trigger_queue.append((frame_period, count))
+        self.status.triggers_queued = sum(n for _, n in self._trigger_queue)
+
+    def _begin_queued_trigger(self) -> None:
+        frame_period, count = self._trigger_queue.popleft()
+        if count > 1:
+            self._trigger_queue.appendleft((frame_period, count - 1))
+        self.status.triggers_queued -= 1
+        self._begin_acqusition_mode(frame_period)
+
+    def _clear_trigger_queue(self) -> None:
+        self._trigger_queue.clear()
+        self.status.triggers_queued = 0
+        # Release anything waiting on the queued triggers
+        self.finished_trigger.set()
+
+    def _end_trigger(self) -> None:
+        self.status.triggers_completed += 1
+        if not self.status.triggers_queued:
+            self.finished_trigger.set()
+
+        if self._cancelling:
+            LOGGER.debug("Acquisition cancelled, ending series...")
+            self._cancelling = False
+            self._set_state(State.READY)
+            self._num_frames_left = self.series_settings.nimages
+            self._num_triggers_left = 0
+            self.stream.end_series(self._series_id)
+        elif self._num_triggers_left > 0:
+            self._set_state(State.READY)
+            self._num_frames_left = self.series_settings.nimages
+        else:
+            LOGGER.debug("Ending Series...")
+            self._set_state(State.IDLE)
+            self.stream.end_series(self._series_id)
+
+    def _begin_acqusition_mode(self, frame_period: int | None = None) -> None:
+        self._frame_period = (
+            seconds_to_ns(self.series_settings.frame_time)
+            if frame_period is None
+            else frame_period
+        )
+        self._trigger_start = None
+        self._trigger_frames = 0
         self._num_triggers_left -= 1
         self._set_state(State.ACQUIRE)
         LOGGER.info("Now in acquiring mode")
         self.finished_trigger.clear()
 
-    def _acquire_frame(self) -> None:
+    def _acquire_frame(self, time: SimTime) -> None:
+        start = perf_counter_ns()
+        settings = self.series_settings
         frame_id = (
-            (self.settings.ntrigger - self._num_triggers_left) * self.settings.nimages
+            (settings.ntrigger - self._num_triggers_left) * settings.nimages
         ) - self._num_frames_left
         LOGGER.debug(f"Frame id {frame_id}")
 
-        shape = (
-            self.settings.x_pixels_in_detector,
-            self.settings.y_pixels_in_detector,
-        )
-        image = Image.create_dummy_image(frame_id, shape)
-        self.stream.insert_image(image, self._series_id)
+        if self.replay is None:
+            shape = (
+                settings.x_pixels_in_detector,
+                settings.y_pixels_in_detector,
+            )
+            image = Image.create_dummy_image(
+                frame_id,
+                shape,
+                settings.bit_depth_image,
+                settings.nexpi if settings.auto_summation else 1,
+                self._frame_sample,
+            )
+        else:
+            replayed = self.replay.image(frame_id)
+            if replayed is None:
+                LOGGER.info(f"End of replay {self.replay.path}, ending series")
+                self._num_frames_left = 0
+                self._num_triggers_left = 0
+                self._clear_trigger_queue()
+                return
+            image = replayed
+        if self._series_start is None:
+            self._series_start = time
+        image.start_time = self._detector_duration(time - self._series_start)
+        image.stop_time = image.start_time + seconds_to_ns(settings.count_time)
+        self.metrics.frames_generated += 1
+        self._trigger_frames += 1
+
+        if self.stream_config.mode == "enabled":
+            self.stream.insert_image(image, self._series_id)
+            self.metrics.frames_streamed[self.stream_config.format] += 1
+        else:
+            self.metrics.frames_dropped += 1
         self._num_frames_left -= 1
         LOGGER.debug(f"Frames left: {self._num_frames_left}")
         LOGGER.debug(f"Triggers left: {self._num_triggers_left}")
+        self.metrics.acquire_frame_duration.observe_since(start)
+
+    def _sim_duration(self, duration: int, round_up: bool = False) -> int:
+        """Convert a duration in detector time to simulation time, both in ns."""
+        numerator, denominator = self._speed_up_ratio
+        if round_up:
+            return -(-duration * denominator // numerator)
+        return duration * denominator // numerator
+
+    def _detector_duration(self, duration: int) -> int:
+        """Convert a duration in simulation time to detector time, both in ns."""
+        numerator, denominator = self._speed_up_ratio
+        return duration * numerator // denominator
 
     def get_state(self) -> State:
         """Get the eiger's current state
@@ -256,7 +602,7 @@ def get_changed_parameters(key: str) -> list[str]:
     """
     match key:
         case "auto_summation":
-            return ["auto_summation", "frame_count_time"]
+            return ["auto_summation", "bit_depth_image", "frame_count_time"]
         case "count_time" | "frame_time":
             return [
                 "bit_depth_image",
@@ -281,6 +627,8 @@ def get_changed_parameters(key: str) -> list[str]:
                 "threshold_energy",
                 "wavelength",
             ]
+        case "nexpi":
+            return ["bit_depth_image", "nexpi"]
         case "pixel_mask":
             return ["pixel_mask", "threshold/1/pixel_mask"]
         case "threshold/1/flatfield":
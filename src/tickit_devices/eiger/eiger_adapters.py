@@ -1,13 +1,25 @@
+import asyncio
 import logging
+from collections.abc import Callable, Iterable
+from functools import wraps
+from time import perf_counter_ns
+from typing import Any
 
 from aiohttp import web
 from apischema import serialize
 from tickit.adapters.http import HttpAdapter
+from tickit.adapters.io import ZeroMqPushIo
+from tickit.adapters.io.zeromq_push_io import SocketFactory, create_zmq_push_socket
 from tickit.adapters.specifications import HttpEndpoint
-from tickit.adapters.zmq import ZeroMqPushAdapter
+from tickit.adapters.zmq import ZeroMqMessage, ZeroMqPushAdapter
 
 from tickit_devices.eiger.eiger import EigerDevice, get_changed_parameters
-from tickit_devices.eiger.eiger_schema import SequenceComplete, construct_value
+from tickit_devices.eiger.eiger_metrics import CONTENT_TYPE, EigerMetrics
+from tickit_devices.eiger.eiger_schema import (
+    InvalidValueError,
+    SequenceComplete,
+    construct_value,
+)
 from tickit_devices.eiger.stream.eiger_stream import EigerStream
 from tickit_devices.eiger.stream.eiger_stream_2 import EigerStream2
 
@@ -22,6 +34,19 @@ def command_404(key: str) -> str:
     return f'error during request: path error: unknown path: "{key}"'
 
 
+def value_400(error: InvalidValueError) -> str:
+    return f"error during request: value error: {error}"
+
+
+def _positive(value: Any, integer: bool = False) -> bool:
+    """Whether a value from JSON is a positive number, and not a bool."""
+    if isinstance(value, bool):
+        return False
+    if integer:
+        return isinstance(value, int) and value > 0
+    return isinstance(value, int | float) and value > 0
+
+
 LOGGER = logging.getLogger("EigerAdapter")
 
 
@@ -33,6 +58,39 @@ class EigerRESTAdapter(HttpAdapter):
     def __init__(self, device: EigerDevice) -> None:
         self.device = device
 
+    def get_endpoints(self) -> Iterable[tuple[HttpEndpoint, Callable]]:
+        """Returns the defined endpoints, timing each request in the device metrics.
+
+        Yields:
+            tuple[HttpEndpoint, Callable]: Each endpoint and its timed handler.
+        """
+        for endpoint, func in super().get_endpoints():
+            histogram = self.device.metrics.route(f"{endpoint.method} {endpoint.path}")
+
+            @wraps(func)
+            async def timed(request: web.Request, func=func, histogram=histogram):
+                start = perf_counter_ns()
+                try:
+                    return await func(request)
+                finally:
+                    histogram.observe_since(start)
+
+            yield endpoint, timed
+
+    @HttpEndpoint.get("/metrics")
+    async def get_metrics(self, request: web.Request) -> web.Response:
+        """A HTTP Endpoint for the performance metrics of the simulation.
+
+        Args:
+            request (web.Request): The request object that takes the request method.
+
+        Returns:
+            web.Response: The metrics in the Prometheus text format.
+        """
+        return web.Response(
+            text=self.device.metrics.render(), content_type=CONTENT_TYPE
+        )
+
     @HttpEndpoint.get(f"/{DETECTOR_API}" + "/config/{parameter_name}")
     async def get_config(self, request: web.Request) -> web.Response:
         """A HTTP Endpoint for requesting configuration variables from the Eiger.
@@ -72,7 +130,11 @@ class EigerRESTAdapter(HttpAdapter):
 
             LOGGER.debug(f"Changing to {str(attr)} for {str(param)}")
 
-            self.device.settings[param] = attr
+            try:
+                self.device.settings[param] = attr
+            except InvalidValueError as e:
+                LOGGER.debug(f"Rejected {attr!r} for {param}: {e}")
+                return web.json_response(status=400, text=value_400(e))
 
             LOGGER.debug("Set " + str(param) + " to " + str(attr))
 
@@ -126,7 +188,11 @@ class EigerRESTAdapter(HttpAdapter):
         config = self.device.settings.threshold_config
         if threshold in config and hasattr(config[threshold], param):
             attr = response["value"]
-            config[threshold][param] = attr
+            try:
+                config[threshold][param] = attr
+            except InvalidValueError as e:
+                LOGGER.debug(f"Rejected {attr!r} for {param}: {e}")
+                return web.json_response(status=400, text=value_400(e))
 
             LOGGER.debug(f"Set threshold/{threshold}{str(param)} to {str(attr)}")
 
@@ -252,6 +318,11 @@ class EigerRESTAdapter(HttpAdapter):
     async def trigger_eiger(self, request: web.Request) -> web.Response:
         """A HTTP Endpoint for the 'trigger' command of the Eiger.
 
+        In "ints" mode a value queues that many triggers and in "inte" mode a value
+        gives the count time of a single trigger, or a list of count times queues a
+        trigger for each. The response is returned once all queued triggers are
+        complete.
+
         Args:
             request (web.Request): The request object that takes the request method.
 
@@ -259,13 +330,30 @@ class EigerRESTAdapter(HttpAdapter):
             web.Response: The response object returned given the result of the HTTP
                 request.
         """
+        count, count_times = 1, None
         if await request.text() and await request.json():
-            # Only expect a parameter in "inte" mode
-            if self.device.settings.trigger_mode != "inte":
-                return web.json_response(status=404, text=command_404("initialize"))
+            # Expect a number of triggers in "ints" mode or count times in "inte" mode
+            value = (await request.json())["value"]
+            trigger_mode = self.device.series_settings.trigger_mode
+            if trigger_mode == "ints":
+                if not _positive(value, integer=True):
+                    error = InvalidValueError(
+                        f"{value!r} is not a positive number of triggers"
+                    )
+                    return web.json_response(status=400, text=value_400(error))
+                count = value
+            elif trigger_mode == "inte":
+                count_times = value if isinstance(value, list) else [value]
+                if not count_times or not all(_positive(time) for time in count_times):
+                    error = InvalidValueError(
+                        f"{value!r} is not a positive count time or list of them"
+                    )
+                    return web.json_response(status=400, text=value_400(error))
+            else:
+                return web.json_response(status=404, text=command_404("trigger"))
 
         LOGGER.debug("Triggering Eiger")
-        await self.device.trigger()
+        await self.device.trigger(count, count_times)
 
         await self.interrupt()
         await self.device.finished_trigger.wait()
@@ -367,7 +455,11 @@ class EigerRESTAdapter(HttpAdapter):
 
             LOGGER.debug(f"Changing to {attr} for {param}")
 
-            self.device.stream_config[param] = attr
+            try:
+                self.device.set_stream_config(param, attr)
+            except InvalidValueError as e:
+                LOGGER.debug(f"Rejected {attr!r} for {param}: {e}")
+                return web.json_response(status=400, text=value_400(e))
 
             LOGGER.debug("Set " + str(param) + " to " + str(attr))
             return web.json_response([])
@@ -414,7 +506,11 @@ class EigerRESTAdapter(HttpAdapter):
 
             LOGGER.debug(f"Changing to {attr} for {param}")
 
-            self.device.monitor_config[param] = attr
+            try:
+                self.device.monitor_config[param] = attr
+            except InvalidValueError as e:
+                LOGGER.debug(f"Rejected {attr!r} for {param}: {e}")
+                return web.json_response(status=400, text=value_400(e))
 
             LOGGER.debug("Set " + str(param) + " to " + str(attr))
             return web.json_response([])
@@ -481,7 +577,11 @@ class EigerRESTAdapter(HttpAdapter):
 
             LOGGER.debug(f"Changing to {attr} for {param}")
 
-            self.device.filewriter_config[param] = attr
+            try:
+                self.device.filewriter_config[param] = attr
+            except InvalidValueError as e:
+                LOGGER.debug(f"Rejected {attr!r} for {param}: {e}")
+                return web.json_response(status=400, text=value_400(e))
 
             LOGGER.debug("Set " + str(param) + " to " + str(attr))
             return web.json_response([])
@@ -514,12 +614,75 @@ class EigerZMQAdapter(ZeroMqPushAdapter):
     """An Eiger adapter which parses the data to send along a ZeroMQStream."""
 
     device: EigerDevice
-
-    def __init__(self, stream: EigerStream | EigerStream2) -> None:
+    #: None is put on a dropped queue to wake a sender waiting on it
+    _message_queue: asyncio.Queue[ZeroMqMessage | None] | None
+
+    def __init__(
+        self,
+        stream: EigerStream | EigerStream2,
+        stream_format: str | None = None,
+        metrics: EigerMetrics | None = None,
+    ) -> None:
         super().__init__()
         self.stream = stream
+        self._generation = stream.generation
+        if metrics is not None and stream_format is not None:
+            metrics.stream_buffer_depth[stream_format] = self.buffer_depth
+
+    def buffer_depth(self) -> int:
+        """Get the number of messages waiting to be sent."""
+        return self._ensure_queue().qsize()
 
     def after_update(self) -> None:
         """Updates IOC values immediately following a device update."""
+        if self.stream.generation != self._generation:
+            self._drop_queued()
         if buffered_data := list(self.stream.consume_data()):
             self.add_message_to_stream(buffered_data)
+
+    async def next_message(self) -> ZeroMqMessage:
+        """Wait for the next message to send, skipping dropped messages."""
+        while True:
+            queue = self._ensure_queue()
+            message = await queue.get()
+            if queue is self._message_queue and message is not None:
+                return message
+
+    def _drop_queued(self) -> None:
+        """Drop the queued messages by replacing the queue."""
+        self._generation = self.stream.generation
+        if self._message_queue is not None:
+            dropped, self._message_queue = self._message_queue, asyncio.Queue()
+            LOGGER.debug(f"Dropped {dropped.qsize()} messages")
+            # Wake a sender waiting on the dropped queue so it moves to the new one
+            dropped.put_nowait(None)
+
+
+class EigerZMQIo(ZeroMqPushIo):
+    """A ZeroMQ push IO which sends buffers such as replayed frames without copying."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 5555,
+        stream_format: str | None = None,
+        metrics: EigerMetrics | None = None,
+        socket_factory: SocketFactory = create_zmq_push_socket,
+    ) -> None:
+        super().__init__(host, port, socket_factory)
+        self._stream_format = stream_format
+        self._metrics = metrics
+
+    def _serialize(self, message):
+        serialized = super()._serialize(message)
+        if self._metrics is not None and self._stream_format is not None:
+            self._metrics.bytes_streamed[self._stream_format] += sum(
+                part.nbytes if isinstance(part, memoryview) else len(part)
+                for part in serialized
+            )
+        return serialized
+
+    def _serialize_part(self, part):
+        if isinstance(part, memoryview | bytearray):
+            return part
+        return super()._serialize_part(part)
@@ -0,0 +1,172 @@
+"""Counters and latency histograms of the Eiger simulation, rendered for Prometheus.
+
+Metrics are only updated from the event loop, so plain integers are used without
+locking. Histogram buckets are allocated up front and durations are recorded in
+integer nanoseconds from time.perf_counter_ns.
+"""
+
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Mapping
+from time import perf_counter_ns
+
+from tickit_devices.eiger.data.assets import AssetUsage
+from tickit_devices.eiger.stream.stream_config import CBOR_STREAM, LEGACY_STREAM
+
+#: Upper bounds of the duration histogram buckets in nanoseconds, 10us to 1s
+DURATION_BUCKETS_NS: tuple[int, ...] = (
+    10_000,
+    50_000,
+    100_000,
+    500_000,
+    1_000_000,
+    5_000_000,
+    10_000_000,
+    50_000_000,
+    100_000_000,
+    500_000_000,
+    1_000_000_000,
+)
+
+CONTENT_TYPE = "text/plain"
+
+
+class Histogram:
+    """A histogram of durations with fixed buckets."""
+
+    def __init__(self, bounds_ns: tuple[int, ...] = DURATION_BUCKETS_NS) -> None:
+        """Create an empty histogram.
+
+        Args:
+            bounds_ns: Ascending upper bounds of the buckets in nanoseconds, an
+                overflow bucket is added above the last bound.
+        """
+        self.bounds_ns = bounds_ns
+        self.counts = [0] * (len(bounds_ns) + 1)
+        self.count = 0
+        self.sum_ns = 0
+
+    def observe(self, duration_ns: int) -> None:
+        """Record a duration.
+
+        Args:
+            duration_ns: The duration in nanoseconds.
+        """
+        self.counts[bisect_left(self.bounds_ns, duration_ns)] += 1
+        self.count += 1
+        self.sum_ns += duration_ns
+
+    def observe_since(self, start_ns: int) -> None:
+        """Record the duration since a time taken from time.perf_counter_ns.
+
+        Args:
+            start_ns: The start time in nanoseconds.
+        """
+        self.observe(perf_counter_ns() - start_ns)
+
+    def render(self, name: str, labels: str = "") -> Iterable[str]:
+        """Render the histogram as cumulative buckets in seconds.
+
+        Args:
+            name: The metric name.
+            labels: Labels of the histogram as 'key="value"' pairs joined by commas.
+
+        Yields:
+            str: Lines of the Prometheus text format.
+        """
+        prefix = f"{labels}," if labels else ""
+        cumulative = 0
+        for bound, count in zip(self.bounds_ns, self.counts, strict=False):
+            cumulative += count
+            yield f'{name}_bucket{{{prefix}le="{bound / 1e9:g}"}} {cumulative}'
+        yield f'{name}_bucket{{{prefix}le="+Inf"}} {self.count}'
+        suffix = f"{{{labels}}}" if labels else ""
+        yield f"{name}_sum{suffix} {self.sum_ns / 1e9}"
+        yield f"{name}_count{suffix} {self.count}"
+
+
+class EigerMetrics:
+    """Performance metrics of an Eiger simulation."""
+
+    def __init__(self) -> None:
+        """Create zeroed metrics."""
+        self.frames_generated = 0
+        self.frames_dropped = 0
+        self.frames_streamed = {LEGACY_STREAM: 0, CBOR_STREAM: 0}
+        self.bytes_streamed = {LEGACY_STREAM: 0, CBOR_STREAM: 0}
+        #: Callables giving the number of messages waiting to be sent per format
+        self.stream_buffer_depth: dict[str, Callable[[], int]] = {}
+        #: Callable giving the shared assets used by the detector
+        self.asset_usage: Callable[[], Mapping[str, AssetUsage]] | None = None
+
+        self.update_duration = Histogram()
+        self.acquire_frame_duration = Histogram()
+        #: How far behind schedule frames were acquired, in simulation time
+        self.frame_lag = Histogram()
+        self.request_duration: dict[str, Histogram] = {}
+
+    def route(self, route: str) -> Histogram:
+        """Get the latency histogram of a REST route, creating it if needed.
+
+        Args:
+            route: The method and path of the route.
+
+        Returns:
+            Histogram: The latency histogram of the route.
+        """
+        if route not in self.request_duration:
+            self.request_duration[route] = Histogram()
+        return self.request_duration[route]
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text format.
+
+        Returns:
+            str: The metrics.
+        """
+        lines = [
+            "# TYPE eiger_frames_generated_total counter",
+            f"eiger_frames_generated_total {self.frames_generated}",
+            "# TYPE eiger_frames_dropped_total counter",
+            f"eiger_frames_dropped_total {self.frames_dropped}",
+            "# TYPE eiger_frames_streamed_total counter",
+        ]
+        lines += [
+            f'eiger_frames_streamed_total{{format="{stream_format}"}} {count}'
+            for stream_format, count in self.frames_streamed.items()
+        ]
+        lines.append("# TYPE eiger_stream_bytes_total counter")
+        lines += [
+            f'eiger_stream_bytes_total{{format="{stream_format}"}} {count}'
+            for stream_format, count in self.bytes_streamed.items()
+        ]
+        lines.append("# TYPE eiger_stream_buffer_depth gauge")
+        lines += [
+            f'eiger_stream_buffer_depth{{format="{stream_format}"}} {depth()}'
+            for stream_format, depth in self.stream_buffer_depth.items()
+        ]
+        if self.asset_usage is not None:
+            usage = self.asset_usage()
+            lines.append("# TYPE eiger_asset_bytes gauge")
+            lines += [
+                f'eiger_asset_bytes{{asset="{name}"}} {asset.nbytes}'
+                for name, asset in usage.items()
+            ]
+            lines.append("# TYPE eiger_asset_holders gauge")
+            lines += [
+                f'eiger_asset_holders{{asset="{name}"}} {asset.holders}'
+                for name, asset in usage.items()
+            ]
+        lines.append("# TYPE eiger_update_duration_seconds histogram")
+        lines += self.update_duration.render("eiger_update_duration_seconds")
+        lines.append("# TYPE eiger_acquire_frame_duration_seconds histogram")
+        lines += self.acquire_frame_duration.render(
+            "eiger_acquire_frame_duration_seconds"
+        )
+        lines.append("# TYPE eiger_frame_lag_seconds histogram")
+        lines += self.frame_lag.render("eiger_frame_lag_seconds")
+        lines.append("# TYPE eiger_request_duration_seconds histogram")
+        for route, histogram in self.request_duration.items():
+            lines += histogram.render(
+                "eiger_request_duration_seconds", f'route="{route}"'
+            )
+        return "\n".join(lines) + "\n"
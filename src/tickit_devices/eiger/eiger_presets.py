@@ -0,0 +1,153 @@
+"""Presets of the Eiger detector models that can be simulated.
+
+A preset gives the geometry, timing and sensor of a model, which are used for the
+detector settings and the Stream2 start message. Frame buffers and message templates
+are sized from the geometry of the model.
+"""
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from tickit_devices.eiger.eiger_settings import EigerSettings
+
+#: Size of an Eiger pixel in metres
+PIXEL_SIZE = 75e-6
+
+
+@dataclass(frozen=True)
+class DetectorModel:
+    """Geometry, timing and sensor of an Eiger detector model."""
+
+    #: Name of the preset, e.g. "eiger2_x_16m"
+    name: str
+    #: Description reported by the detector
+    description: str
+    #: Number of pixels along x and y
+    x_pixels: int
+    y_pixels: int
+    #: Dead time between frames in seconds
+    readout_time: float
+    #: Maximum frame rate in Hz
+    max_frame_rate: float
+    #: Bit depth of a single readout of the counters
+    bit_depth_readout: int
+    sensor_material: str = "Si"
+    #: Thickness of the sensor in metres
+    sensor_thickness: float = 450e-6
+
+    @property
+    def min_frame_time(self) -> float:
+        """The shortest frame time the detector supports, in seconds."""
+        return 1 / self.max_frame_rate
+
+    def settings(self) -> EigerSettings:
+        """Create the default settings of the detector model.
+
+        Returns:
+            EigerSettings: Settings with the geometry and timing of the model.
+        """
+        settings = EigerSettings(
+            description=self.description,
+            x_pixels_in_detector=self.x_pixels,
+            y_pixels_in_detector=self.y_pixels,
+            x_pixel_size=PIXEL_SIZE,
+            y_pixel_size=PIXEL_SIZE,
+            detector_readout_time=self.readout_time,
+            bit_depth_readout=self.bit_depth_readout,
+            sensor_material=self.sensor_material,
+            sensor_thickness=self.sensor_thickness,
+        )
+        settings.min_frame_time = self.min_frame_time
+        settings.frame_time = max(
+            settings.count_time + self.readout_time, self.min_frame_time
+        )
+        return settings
+
+    def stream2_start_fields(self) -> Mapping[str, Any]:
+        """Get the fields of the Stream2 start message which describe the model.
+
+        Returns:
+            Mapping[str, Any]: The start message fields by name.
+        """
+        return {
+            "detector_description": self.description,
+            "image_size_x": self.x_pixels,
+            "image_size_y": self.y_pixels,
+            "pixel_size_x": PIXEL_SIZE,
+            "pixel_size_y": PIXEL_SIZE,
+            "sensor_material": self.sensor_material,
+            "sensor_thickness": self.sensor_thickness,
+        }
+
+
+#: Pixels along (x, y) of each module configuration
+_GEOMETRIES = {
+    "1m": (1028, 1062),
+    "4m": (2068, 2162),
+    "9m": (3108, 3262),
+    "16m": (4148, 4362),
+}
+_EIGER_X_FRAME_RATES = {"1m": 3000.0, "4m": 750.0, "9m": 238.0, "16m": 133.0}
+_EIGER2_X_FRAME_RATES = {"1m": 2250.0, "4m": 560.0, "9m": 238.0, "16m": 133.0}
+
+
+def _presets() -> dict[str, DetectorModel]:
+    models = []
+    for size, (x_pixels, y_pixels) in _GEOMETRIES.items():
+        models += [
+            DetectorModel(
+                name=f"eiger_x_{size}",
+                description=f"Dectris EIGER X {size.upper()}",
+                x_pixels=x_pixels,
+                y_pixels=y_pixels,
+                readout_time=3e-6,
+                max_frame_rate=_EIGER_X_FRAME_RATES[size],
+                bit_depth_readout=12,
+            ),
+            DetectorModel(
+                name=f"eiger2_x_{size}",
+                description=f"Dectris EIGER2 Si {size.upper()}",
+                x_pixels=x_pixels,
+                y_pixels=y_pixels,
+                readout_time=100e-9,
+                max_frame_rate=_EIGER2_X_FRAME_RATES[size],
+                bit_depth_readout=16,
+            ),
+            DetectorModel(
+                name=f"eiger2_x_cdte_{size}",
+                description=f"Dectris EIGER2 CdTe {size.upper()}",
+                x_pixels=x_pixels,
+                y_pixels=y_pixels,
+                readout_time=100e-9,
+                max_frame_rate=_EIGER2_X_FRAME_RATES[size],
+                bit_depth_readout=16,
+                sensor_material="CdTe",
+                sensor_thickness=750e-6,
+            ),
+        ]
+    return {model.name: model for model in models}
+
+
+#: Detector model presets by name
+DETECTOR_MODELS: Mapping[str, DetectorModel] = _presets()
+
+
+def get_detector_model(name: str) -> DetectorModel:
+    """Get a detector model preset by name.
+
+    Args:
+        name: The name of the preset, e.g. "eiger2_x_cdte_4m".
+
+    Returns:
+        DetectorModel: The preset.
+
+    Raises:
+        ValueError: If there is no preset with the name.
+    """
+    try:
+        return DETECTOR_MODELS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown detector model {name}, expected one of {list(DETECTOR_MODELS)}"
+        ) from None
@@ -1,6 +1,6 @@
 import logging
-from collections.abc import Mapping
-from dataclasses import dataclass, field
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field, fields
 from enum import Enum
 from functools import partial
 from typing import Any, Generic, TypeVar
@@ -115,6 +115,154 @@ ro_str_list: partial = partial(
 )
 
 
+class InvalidValueError(ValueError):
+    """Raised when a value cannot be set on a parameter."""
+
+
+Validator = Callable[[Any], Any]
+
+_VALIDATORS: dict[type, dict[str, Validator]] = {}
+
+
+def _to_float(value: Any) -> float:
+    if isinstance(value, bool) or not isinstance(value, int | float):
+        raise TypeError(value)
+    return float(value)
+
+
+def _to_int(value: Any) -> int:
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise TypeError(value)
+    return value
+
+
+def _to_uint(value: Any) -> int:
+    value = _to_int(value)
+    if value < 0:
+        raise ValueError(value)
+    return value
+
+
+def _of_type(type_: type) -> Callable[[Any], Any]:
+    def to_type(value: Any) -> Any:
+        if not isinstance(value, type_):
+            raise TypeError(value)
+        return value
+
+    return to_type
+
+
+def _to_list(to_item: Callable[[Any], Any]) -> Callable[[Any], list]:
+    def to_list(value: Any) -> list:
+        if not isinstance(value, list):
+            raise TypeError(value)
+        return [to_item(item) for item in value]
+
+    return to_list
+
+
+_CONVERTERS: dict[ValueType, Callable[[Any], Any]] = {
+    ValueType.FLOAT: _to_float,
+    ValueType.INT: _to_int,
+    ValueType.UINT: _to_uint,
+    ValueType.STRING: _of_type(str),
+    ValueType.STR_LIST: _to_list(_of_type(str)),
+    ValueType.BOOL: _of_type(bool),
+    ValueType.FLOAT_GRID: _to_list(_to_list(_to_float)),
+    ValueType.UINT_GRID: _to_list(_to_list(_to_uint)),
+}
+
+
+def compile_validator(name: str, metadata: Mapping[str, Any]) -> Validator:
+    """Create a function validating the values set on a field.
+
+    The validator converts a value to the value type of the field, e.g. an integral
+    float to an int, and checks it against the allowed values and limits of the
+    field.
+
+    Args:
+        name: The name of the field.
+        metadata: The metadata of the field.
+
+    Returns:
+        Validator: A function returning the converted value, or raising
+            InvalidValueError if the value cannot be set on the field.
+    """
+    if metadata.get("access_mode") in (None, AccessMode.READ_ONLY):
+
+        def read_only(value: Any) -> Any:
+            raise InvalidValueError(f'parameter "{name}" is read only')
+
+        return read_only
+
+    value_type = metadata["value_type"]
+    convert = _CONVERTERS.get(value_type)
+    allowed_values = frozenset(metadata.get("allowed_values", ()))
+    minimum = metadata.get("min")
+    maximum = metadata.get("max")
+
+    def validate(value: Any) -> Any:
+        if convert is not None:
+            try:
+                value = convert(value)
+            except (TypeError, ValueError):
+                raise InvalidValueError(
+                    f'{value!r} is not a valid {value_type.value} for "{name}"'
+                ) from None
+        if allowed_values and value not in allowed_values:
+            raise InvalidValueError(
+                f'{value!r} is not one of the allowed values of "{name}": '
+                f"{sorted(allowed_values)}"
+            )
+        if minimum is not None and value < minimum:
+            raise InvalidValueError(f'{value!r} is below the minimum of "{name}"')
+        if maximum is not None and value > maximum:
+            raise InvalidValueError(f'{value!r} is above the maximum of "{name}"')
+        return value
+
+    return validate
+
+
+def validated(cls: type[T]) -> type[T]:
+    """Class decorator compiling a validator for each field of a dataclass.
+
+    Values set through the class's __setitem__ are checked with validate.
+
+    Args:
+        cls: A dataclass with value_type and access_mode metadata on its fields.
+
+    Returns:
+        type: The same class.
+    """
+    _VALIDATORS[cls] = {
+        field_.name: compile_validator(field_.name, field_.metadata)
+        for field_ in fields(cls)  # type: ignore
+    }
+    return cls
+
+
+def validate(obj: Any, key: str, value: Any) -> Any:
+    """Validate a value being set on a field of a validated dataclass.
+
+    Args:
+        obj: The validated dataclass instance.
+        key: The name of the field.
+        value: The value to set.
+
+    Returns:
+        Any: The value converted to the value type of the field.
+
+    Raises:
+        InvalidValueError: If the value cannot be set on the field.
+    """
+    validator = _VALIDATORS[type(obj)].get(key)
+    if validator is None:
+        raise InvalidValueError(f'unknown parameter "{key}"')
+    return validator(value)
+
+
 @order(["access_mode", "allowed_values", "max", "min", "unit", "value", "value_type"])
 @with_fields_set
 @dataclass
@@ -1,10 +1,14 @@
+import copy
 import logging
+import math
 from collections.abc import Mapping
-from dataclasses import dataclass, field, fields
+from dataclasses import FrozenInstanceError, dataclass, field, fields
 from enum import Enum
+from types import MappingProxyType
 from typing import Any
 
 from .eiger_schema import (
+    InvalidValueError,
     ro_float,
     ro_str,
     ro_uint,
@@ -14,6 +18,8 @@ from .eiger_schema import (
     rw_str,
     rw_uint,
     rw_uint_grid,
+    validate,
+    validated,
 )
 
 LOGGER = logging.getLogger(__name__)
@@ -21,6 +27,8 @@ LOGGER = logging.getLogger(__name__)
 
 FRAME_WIDTH: int = 4148
 FRAME_HEIGHT: int = 4362
+#: Shortest count and frame time, the resolution of the simulation in seconds
+MIN_TIME: float = 1e-9
 
 
 def config_keys() -> list[str]:
@@ -129,8 +137,43 @@ class KAEnergy(Enum):
     Zn = 8638.86
 
 
+class VersionedConfig:
+    """Base of configurations which count their changes and can be frozen.
+
+    Every attribute assignment increments the version, so a consumer can tell
+    whether a configuration has changed since it last looked. A frozen copy shares
+    its values with the original, which is safe as values are replaced, not mutated,
+    when they are set.
+    """
+
+    _version = 0
+    _frozen = False
+
+    def __setattr__(self, name: str, value: Any) -> None:  # noqa: D105
+        if self._frozen:
+            raise FrozenInstanceError(f"cannot assign to {name}, config is frozen")
+        super().__setattr__(name, value)
+        self.__dict__["_version"] = self._version + 1
+
+    @property
+    def version(self) -> int:
+        """Counts the changes to the configuration."""
+        return self._version
+
+    def frozen_copy(self):
+        """Get an immutable copy of the configuration.
+
+        Returns:
+            A shallow copy which raises FrozenInstanceError when it is changed.
+        """
+        clone = copy.copy(self)
+        clone.__dict__["_frozen"] = True
+        return clone
+
+
+@validated
 @dataclass
-class Threshold:
+class Threshold(VersionedConfig):
     """Data container for a single threshold configuration."""
 
     energy: float = field(default=6729.0, metadata=rw_float())
@@ -146,11 +189,12 @@ class Threshold:
         raise ValueError(f"No field with name {key}")
 
     def __setitem__(self, key: str, value: Any) -> None:  # noqa: D105
-        self.__dict__[key] = value
+        setattr(self, key, validate(self, key, value))
 
 
+@validated
 @dataclass
-class ThresholdDifference:
+class ThresholdDifference(VersionedConfig):
     """Configuration for the threshold difference."""
 
     lower_threshold: int = field(default=1, metadata=ro_uint())
@@ -167,16 +211,21 @@ class ThresholdDifference:
         raise ValueError(f"No field with name {key}")
 
     def __setitem__(self, key: str, value: Any) -> None:  # noqa: D105
-        self.__dict__[key] = value
+        setattr(self, key, validate(self, key, value))
 
 
 def detector_translation() -> list[float]:
     return [0.0, 0.0, 0.0]
 
 
+@validated
 @dataclass
-class EigerSettings:
-    """A data container for Eiger device configuration."""
+class EigerSettings(VersionedConfig):
+    """A data container for Eiger device configuration.
+
+    A series is configured from a snapshot of the settings taken when the detector is
+    armed, so that changes made during the series do not affect it.
+    """
 
     auto_summation: bool = field(default=True, metadata=rw_bool())
     beam_center_x: float = field(default=0.0, metadata=rw_float())
@@ -188,7 +237,7 @@ class EigerSettings:
     compression: str = field(
         default="bslz4", metadata=rw_str(allowed_values=["lz4", "bslz4", "none"])
     )
-    count_time: float = field(default=0.1, metadata=rw_float())
+    count_time: float = field(default=0.1, metadata=rw_float(min=MIN_TIME))
     counting_mode: str = field(
         default="normal", metadata=rw_str(allowed_values=["normal", "retrigger"])
     )
@@ -219,7 +268,7 @@ class EigerSettings:
     )
     flatfield_correction_applied: bool = field(default=True, metadata=rw_bool())
     frame_count_time: float = field(default=0.01, metadata=ro_float())
-    frame_time: float = field(default=0.12, metadata=rw_float())
+    frame_time: float = field(default=0.12, metadata=rw_float(min=MIN_TIME))
     frame_period: float = field(default=0.12, metadata=rw_float())
     incident_energy: float = field(default=13458.0, metadata=rw_float())
     incident_particle_type: str = field(default="photons", metadata=ro_str())
@@ -269,10 +318,13 @@ class EigerSettings:
 
     keys: list[str] = field(default_factory=config_keys)
 
+    #: Shortest frame time supported by the detector model, in seconds
+    min_frame_time = 0.0
+
     def __post_init__(self):
         self._threshold_config = {
             "1": Threshold(),
-            "2": Threshold(energy=18841.0),
+            "2": Threshold(energy=18841.0, mode="disabled"),
             "difference": ThresholdDifference(),
         }
 
@@ -280,6 +332,40 @@ class EigerSettings:
     def threshold_config(self):
         return self._threshold_config
 
+    @property
+    def version(self) -> int:
+        """Counts the changes to the settings, including the threshold configs."""
+        return super().version + sum(
+            threshold.version for threshold in self._threshold_config.values()
+        )
+
+    def snapshot(self) -> "EigerSettings":
+        """Get an immutable snapshot of the current settings.
+
+        The snapshot shares its values with the settings and is reused until the
+        settings are changed.
+
+        Returns:
+            EigerSettings: A frozen copy of the settings.
+        """
+        version = self.version
+        cached_version, cached = self.__dict__.get("_snapshot", (None, None))
+        if cached is not None and cached_version == version:
+            return cached
+
+        snapshot = self.frozen_copy()
+        snapshot.__dict__.update(
+            _threshold_config=MappingProxyType(
+                {
+                    name: threshold.frozen_copy()
+                    for name, threshold in self._threshold_config.items()
+                }
+            ),
+            _snapshot=(None, None),
+        )
+        self.__dict__["_snapshot"] = (version, snapshot)
+        return snapshot
+
     def __getitem__(self, key: str) -> Any:  # noqa: D105
         for field_ in fields(self):
             if field_.name == key:
@@ -287,7 +373,12 @@ class EigerSettings:
         raise ValueError(f"No field with name {key}")
 
     def __setitem__(self, key: str, value: Any) -> None:  # noqa: D105
-        self.__dict__[key] = value
+        value = validate(self, key, value)
+        if key == "frame_time" and value < self.min_frame_time:
+            raise InvalidValueError(
+                f'{value!r} is below the minimum of "frame_time": {self.min_frame_time}'
+            )
+        setattr(self, key, value)
 
         self._check_dependencies(key, value)
 
@@ -314,7 +405,24 @@ class EigerSettings:
             self._calc_threshold_energy()
 
         elif key == "count_time":
-            self.frame_time = self.count_time + self.detector_readout_time
+            self.frame_time = max(
+                self.count_time + self.detector_readout_time, self.min_frame_time
+            )
+            self._calc_bit_depth()
+
+        elif key in ("auto_summation", "nexpi"):
+            self._calc_bit_depth()
+
+    def _calc_bit_depth(self):
+        # Summing sub-frames which could exceed the range of a 16 bit image produces
+        # 32 bit images, each sub-frame counting up to the depth of the readout
+        sub_frames = math.ceil(round(self.count_time / self.frame_count_time, 6))
+        sub_frame_max_counts = 2**self.bit_depth_readout - 1
+        summed_counts = self.nexpi * max(sub_frames, 1) * sub_frame_max_counts
+        if self.auto_summation and summed_counts > 2**16 - 1:
+            self.bit_depth_image = 32
+        else:
+            self.bit_depth_image = 16
 
     def _calc_threshold_energy(self):
         self.threshold_energy = 0.5 * self.photon_energy
@@ -325,5 +433,5 @@ class EigerSettings:
         return {
             fld.name: vars(self)[fld.name]
             for fld in fields(self)
-            if fld not in exclude_fields
+            if fld.name not in exclude_fields
         }
@@ -5,7 +5,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Any
 
-from .eiger_schema import ro_float, ro_str
+from .eiger_schema import ro_float, ro_str, ro_uint
 
 
 class State(Enum):
@@ -52,6 +52,9 @@ class EigerStatus:
     series_unique_id: str = field(
         default="01HBV3JPF9T4ZDPADX6EMK6XMZ", metadata=ro_str()
     )
+    # Simulator only, progress of a queued series of internal triggers
+    triggers_queued: int = field(default=0, metadata=ro_uint())
+    triggers_completed: int = field(default=0, metadata=ro_uint())
 
     keys: list[str] = field(default_factory=status_keys)
 
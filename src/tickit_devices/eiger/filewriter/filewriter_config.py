@@ -1,9 +1,16 @@
 from dataclasses import dataclass, field, fields
 from typing import Any
 
-from tickit_devices.eiger.eiger_schema import rw_bool, rw_int, rw_str
+from tickit_devices.eiger.eiger_schema import (
+    rw_bool,
+    rw_int,
+    rw_str,
+    validate,
+    validated,
+)
 
 
+@validated
 @dataclass
 class FileWriterConfig:
     """Eiger filewriter configuration taken from the API spec."""
@@ -23,4 +30,4 @@ class FileWriterConfig:
         raise ValueError(f"No field with name {key}")
 
     def __setitem__(self, key: str, value: Any) -> None:  # noqa: D105
-        self.__dict__[key] = value
+        self.__dict__[key] = validate(self, key, value)
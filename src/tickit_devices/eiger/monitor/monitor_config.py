@@ -1,13 +1,20 @@
 from dataclasses import dataclass, field, fields
 from typing import Any
 
-from tickit_devices.eiger.eiger_schema import rw_bool, rw_str, rw_uint
+from tickit_devices.eiger.eiger_schema import (
+    rw_bool,
+    rw_str,
+    rw_uint,
+    validate,
+    validated,
+)
 
 
 def monitor_config_keys() -> list[str]:
     return ["buffer_size", "discard_new", "mode"]
 
 
+@validated
 @dataclass
 class MonitorConfig:
     """Eiger monitor configuration taken from the API spec."""
@@ -27,4 +34,4 @@ class MonitorConfig:
         raise ValueError(f"No field with name {key}")
 
     def __setitem__(self, key: str, value: Any) -> None:  # noqa: D105
-        self.__dict__[key] = value
+        self.__dict__[key] = validate(self, key, value)
@@ -1,3 +1,4 @@
+import json
 import logging
 from collections.abc import Iterable, Mapping
 from queue import Queue
@@ -7,6 +8,7 @@ import numpy as np
 from pydantic.v1 import BaseModel
 from tickit.core.typedefs import SimTime
 
+from tickit_devices.eiger.data.assets import ASSETS
 from tickit_devices.eiger.data.dummy_image import Image
 from tickit_devices.eiger.data.schema import (
     AcquisitionDetailsHeader,
@@ -21,7 +23,7 @@ from tickit_devices.eiger.eiger_settings import EigerSettings
 LOGGER = logging.getLogger(__name__)
 
 
-_Message = BaseModel | Mapping[str, Any] | bytes
+_Message = BaseModel | Mapping[str, Any] | bytes | memoryview
 
 
 class EigerStream:
@@ -40,6 +42,27 @@ class EigerStream:
         self.callback_period = SimTime(callback_period)
 
         self._message_buffer = Queue()
+        #: Incremented when pending messages are dropped
+        self.generation = 0
+
+        self._header_appendix: bytes | None = None
+        self._image_appendix: bytes | None = None
+
+    def set_header_appendix(self, appendix: Any) -> None:
+        """Set the appendix sent after the series headers, an empty one is not sent.
+
+        Args:
+            appendix: The appendix, encoded once here rather than per series.
+        """
+        self._header_appendix = encode_appendix(appendix)
+
+    def set_image_appendix(self, appendix: Any) -> None:
+        """Set the appendix sent after every image, an empty one is not sent.
+
+        Args:
+            appendix: The appendix, encoded once here rather than per image.
+        """
+        self._image_appendix = encode_appendix(appendix)
 
     def begin_series(
         self, settings: EigerSettings, series_id: int, header_detail: str
@@ -60,7 +83,7 @@ class EigerStream:
 
         if header_detail != "none":
             config_header = settings.filtered(
-                ["flatfield", "pixelmask", "countrate_correction_table"]
+                ["flatfield", "pixel_mask", "countrate_correction_table"]
             )
             self._buffer(config_header)
 
@@ -74,7 +97,7 @@ class EigerStream:
                     type="float32",
                 )
                 self._buffer(flatfield_header)
-                self._buffer(np.zeros(shape=(y, x), dtype="float32").tobytes())
+                self._buffer(self._zeros((y, x), "float32"))
 
                 pixel_mask_header = AcquisitionDetailsHeader(
                     htype="dpixelmask-1.0",
@@ -82,7 +105,7 @@ class EigerStream:
                     type="uint32",
                 )
                 self._buffer(pixel_mask_header)
-                self._buffer(np.zeros(shape=(y, x), dtype="uint32").tobytes())
+                self._buffer(self._zeros((y, x), "uint32"))
 
                 countrate_table_header = AcquisitionDetailsHeader(
                     htype="dcountrate_table-1.0",
@@ -90,7 +113,10 @@ class EigerStream:
                     type="float32",
                 )
                 self._buffer(countrate_table_header)
-                self._buffer(np.zeros(shape=(1000, 2), dtype="float32").tobytes())
+                self._buffer(self._zeros((1000, 2), "float32"))
+
+        if self._header_appendix is not None:
+            self._buffer(self._header_appendix)
 
     def insert_image(self, image: Image, series_id: int) -> None:
         """Send headers and an data blob for a single image.
@@ -111,15 +137,17 @@ class EigerStream:
             type=image.dtype,
         )
         config_header = ImageConfigHeader(
-            real_time=0,
-            start_time=0,
-            stop_time=0,
+            real_time=image.stop_time - image.start_time,
+            start_time=image.start_time,
+            stop_time=image.stop_time,
         )
 
         self._buffer(header)
         self._buffer(characteristics_header)
         self._buffer(image.data)
         self._buffer(config_header)
+        if self._image_appendix is not None:
+            self._buffer(self._image_appendix)
 
     def end_series(self, series_id: int) -> None:
         """Send footer marking the end of an acquisition series.
@@ -130,6 +158,15 @@ class EigerStream:
         footer = AcquisitionSeriesFooter(series=series_id)
         self._buffer(footer)
 
+    def drop_pending(self) -> None:
+        """Drop the messages that have not yet been sent, without going through them.
+
+        The generation is incremented so that adapters drop the messages they have
+        queued for sending too.
+        """
+        self.generation += 1
+        self._message_buffer = Queue()
+
     def consume_data(self) -> Iterable[_Message]:
         """Consume all headers and data buffered by other methods.
 
@@ -141,3 +178,26 @@ class EigerStream:
 
     def _buffer(self, message: _Message) -> None:
         self._message_buffer.put_nowait(message)
+
+    def _zeros(self, shape: tuple[int, int], dtype: str) -> bytes:
+        return ASSETS.acquire(
+            self,
+            f"zeros/{dtype}/{shape[0]}x{shape[1]}",
+            lambda: np.zeros(shape=shape, dtype=dtype).tobytes(),
+        )
+
+
+def encode_appendix(appendix: Any) -> bytes | None:
+    """Encode an appendix as a message part, strings are sent as they are.
+
+    Args:
+        appendix: The appendix to encode, a string or JSON serializable value.
+
+    Returns:
+        bytes | None: The encoded appendix, or None if the appendix is empty.
+    """
+    if not appendix:
+        return None
+    elif isinstance(appendix, str):
+        return appendix.encode()
+    return json.dumps(appendix).encode()
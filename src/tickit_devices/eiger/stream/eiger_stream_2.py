@@ -1,6 +1,8 @@
 import base64
+import json
 import logging
-from collections.abc import Iterable
+from collections.abc import Iterable, Mapping
+from functools import partial
 from pathlib import Path
 from queue import Queue
 from typing import Any, TypedDict
@@ -9,7 +11,9 @@ import cbor2
 import numpy as np
 from tickit.core.typedefs import SimTime
 
-from tickit_devices.eiger.data.dummy_image import Image
+from tickit_devices.eiger.data.assets import ASSETS
+from tickit_devices.eiger.data.dummy_image import Image, summed_image_blob
+from tickit_devices.eiger.eiger_presets import DetectorModel
 from tickit_devices.eiger.eiger_settings import EigerSettings
 from tickit_devices.eiger.stream.stream2 import stream2_tag_decoder
 
@@ -44,12 +48,22 @@ STREAM_SETTINGS_MAP = {
 }
 START_ALL_FIELDS = ["flatfield", "pixel_mask", "countrate_correction_lookup_table"]
 GONIO_AXES = ["chi", "kappa", "omega", "phi", "two_theta"]
+# RFC 8746 typed array tags for little-endian unsigned integers
+TYPED_ARRAY_TAGS = {"uint8": 64, "uint16": 69, "uint32": 70}
+MULTI_DIMENSIONAL_ARRAY_TAG = 40
+COMPRESSION_TAG = 56500
+SELF_DESCRIBED_CBOR_HEADER = b"\xd9\xd9\xf7"
+DIFFERENCE_CHANNEL = "difference"
+# Times are sent as [numerator, denominator] in seconds
+NS_PER_SECOND = 1_000_000_000
 
 
-def _load_messages():
+def _load_messages(model: DetectorModel | None = None):
     start = image = end = None
     with open(DATA_PATH / "start.cbor", "rb") as f:
         start = cbor2.load(f, tag_hook=stream2_tag_decoder)
+    if model is not None:
+        start.update(model.stream2_start_fields())
 
     # Populate missing large datasets
     sensor_shape = (start["image_size_y"], start["image_size_x"])
@@ -82,13 +96,52 @@ class EigerStream2:
     class Outputs(TypedDict):
         """No outputs."""
 
-    def __init__(self, callback_period: int = int(1e9)) -> None:
-        """Eiger Stream2 constructor."""
+    def __init__(
+        self, callback_period: int = int(1e9), model: DetectorModel | None = None
+    ) -> None:
+        """Eiger Stream2 constructor.
+
+        Args:
+            callback_period: The period of the stream callback in ns.
+            model: The detector model described by the start message, defaults to
+                the model of the captured messages.
+        """
         self.callback_period = SimTime(callback_period)
 
         self._message_buffer = Queue()
+        #: Incremented when pending messages are dropped
+        self.generation = 0
 
-        self._start, self._image, self._end = _load_messages()
+        # Templates are shared by all streams of a model in the process, so only
+        # copies of them are modified
+        templates = "stream2_templates" + (f"_{model.name}" if model else "")
+        self._start, image, end = ASSETS.acquire(
+            self, templates, partial(_load_messages, model)
+        )
+        self._image, self._end = dict(image), dict(end)
+
+        self._channels: list[str] = ["threshold_1"]
+        self._encoded_data_key: tuple | None = None
+        self._encoded_data: bytes = b""
+
+        self._header_user_data: dict[str, bytes] = {}
+        self._image_user_data: dict[str, bytes] = {}
+
+    def set_header_appendix(self, appendix: Any) -> None:
+        """Set the user_data of the start message, an empty appendix is not sent.
+
+        Args:
+            appendix: The appendix, encoded once here rather than per series.
+        """
+        self._header_user_data = encode_user_data(appendix)
+
+    def set_image_appendix(self, appendix: Any) -> None:
+        """Set the user_data of every image message, an empty appendix is not sent.
+
+        Args:
+            appendix: The appendix, encoded once here rather than per image.
+        """
+        self._image_user_data = encode_user_data(appendix)
 
     def begin_series(
         self, settings: EigerSettings, series_id: int, header_detail: str
@@ -102,8 +155,8 @@ class EigerStream2:
             header_detail: Header detail for start message - 'none', 'basic' or 'all'
         """
         if header_detail == "all":
-            # Use loaded message in place
-            start = self._start
+            # Make a shallow copy so the channel maps of the loaded message are kept
+            start = dict(self._start)
         else:
             # Make a copy with "all" fields removed
             start = {k: v for k, v in self._start.items() if k not in START_ALL_FIELDS}
@@ -115,6 +168,7 @@ class EigerStream2:
         for stream_field, setting in STREAM_SETTINGS_MAP.items():
             if stream_field not in start:
                 start[stream_field] = getattr(settings, setting)
+        start["goniometer"] = dict(start["goniometer"])
         for axis in [a for a in GONIO_AXES if a not in start["goniometer"]]:
             # get default values for axes not in start message
             # TODO: Captured cbor start message should have all axes?
@@ -126,9 +180,17 @@ class EigerStream2:
                 getattr(settings, f"{axis}_increment")
             )
 
+        self._channels = enabled_channels(settings)
+        start["channels"] = self._channels
+        for channel_map in ["flatfield", "pixel_mask"]:
+            if channel_map in start:
+                value = self._start[channel_map]["threshold_1"]
+                start[channel_map] = dict.fromkeys(self._channels, value)
+
+        start["image_dtype"] = f"uint{settings.bit_depth_image}"
         start["series_id"] = series_id
 
-        self._buffer(cbor_dumps(start))
+        self._buffer(cbor_dumps_fragments(start, self._header_user_data))
 
     def insert_image(self, image: Image, series_id: int) -> None:
         """Send headers and an data blob for a single image.
@@ -139,8 +201,14 @@ class EigerStream2:
         """
         self._image["series_id"] = series_id
         self._image["image_id"] = image.index
+        self._image["start_time"] = [image.start_time, NS_PER_SECOND]
+        self._image["stop_time"] = [image.stop_time, NS_PER_SECOND]
+        self._image["real_time"] = [image.stop_time - image.start_time, NS_PER_SECOND]
 
-        self._buffer(cbor_dumps(self._image))
+        # The message is assembled from encoded fragments so the image data is only
+        # encoded when the frame template or the enabled channels change
+        encoded = {"data": self._encode_channels(image), **self._image_user_data}
+        self._buffer(cbor_dumps_fragments(self._image, encoded))
 
     def end_series(self, series_id: int) -> None:
         """Send footer marking the end of an acquisition series.
@@ -150,6 +218,18 @@ class EigerStream2:
         """
         self._end["series_id"] = series_id
         self._buffer(cbor_dumps(self._end))
+        # The key holds the data of the last image, which may be a view of a memory
+        # map that is closed once the series ends
+        self._encoded_data_key = None
+
+    def drop_pending(self) -> None:
+        """Drop the messages that have not yet been sent, without going through them.
+
+        The generation is incremented so that adapters drop the messages they have
+        queued for sending too.
+        """
+        self.generation += 1
+        self._message_buffer = Queue()
 
     def consume_data(self) -> Iterable[bytes]:
         """Consume all headers and data buffered by other methods.
@@ -164,6 +244,24 @@ class EigerStream2:
     def _buffer(self, message: bytes) -> None:
         self._message_buffer.put_nowait(message)
 
+    def _encode_channels(self, image: Image) -> bytes:
+        # Tuples compare items by identity first, so a repeated frame template is
+        # recognised without comparing its data
+        key = (image.data, image.dtype, image.shape, tuple(self._channels))
+        if key != self._encoded_data_key:
+            if self._channels == ["threshold_1"]:
+                data = {"threshold_1": encode_image_data(image)}
+            else:
+                data = {
+                    channel: encode_image_data(channel_image)
+                    for channel, channel_image in split_channels(
+                        image, self._channels
+                    ).items()
+                }
+            self._encoded_data = cbor2.dumps(data)
+            self._encoded_data_key = key
+        return self._encoded_data
+
 
 def cbor_dumps(message: dict[str, Any]) -> bytes:
     """Serialize dictionary to cbor, including headers.
@@ -173,3 +271,130 @@ def cbor_dumps(message: dict[str, Any]) -> bytes:
 
     """
     return cbor2.dumps(cbor2.CBORTag(55799, message))
+
+
+def encode_image_data(image: Image) -> cbor2.CBORTag:
+    """Encode image data as a multi-dimensional typed array.
+
+    Bitshuffle/LZ4 compressed data is wrapped in the compression tag, other data is
+    sent uncompressed.
+
+    Args:
+        image: The image to encode
+
+    """
+    # cbor2 only encodes bytes, so a memory mapped frame is copied here
+    data: bytes | cbor2.CBORTag = bytes(image.data)
+    if "lz4" in image.encoding:
+        element_size = int(image.dtype.removeprefix("uint")) // 8
+        data = cbor2.CBORTag(COMPRESSION_TAG, ["bslz4", element_size, data])
+    x, y = image.shape
+    return cbor2.CBORTag(
+        MULTI_DIMENSIONAL_ARRAY_TAG,
+        [[y, x], cbor2.CBORTag(TYPED_ARRAY_TAGS[image.dtype], data)],
+    )
+
+
+def enabled_channels(settings: EigerSettings) -> list[str]:
+    """Get the image channels produced by the enabled thresholds.
+
+    Args:
+        settings: Current detector configuration
+
+    """
+    channels = [
+        f"threshold_{threshold}"
+        for threshold in ("1", "2")
+        if settings.threshold_config[threshold].mode == "enabled"
+    ]
+    if settings.threshold_config["difference"].mode == "enabled":
+        channels.append(DIFFERENCE_CHANNEL)
+    return channels
+
+
+def split_channels(image: Image, channels: list[str]) -> dict[str, Image]:
+    """Derive an image for each channel from the counts above the lower threshold.
+
+    The upper threshold sees half of the counts of the lower threshold and the
+    difference channel is the lower minus the upper counts. Compressed images cannot
+    be decoded here, so synthetic counts of the same shape are used instead and
+    every channel is sent uncompressed.
+
+    Args:
+        image: The image of counts above the lower threshold
+        channels: The channels to produce
+
+    """
+    dtype = np.dtype(image.dtype).newbyteorder("<")
+    if "lz4" in image.encoding:
+        lower = np.frombuffer(summed_image_blob(image.shape, image.dtype, 1), dtype)
+    else:
+        lower = np.frombuffer(image.data, dtype)
+    upper = np.right_shift(lower, 1)
+    arrays = {
+        "threshold_1": lower,
+        "threshold_2": upper,
+        DIFFERENCE_CHANNEL: np.subtract(lower, upper),
+    }
+    return {
+        channel: Image(
+            image.index,
+            image.hash,
+            str(arrays[channel].dtype.name),
+            arrays[channel].tobytes(),
+            "<",
+            image.shape,
+        )
+        for channel in channels
+    }
+
+
+def cbor_dumps_fragments(
+    message: dict[str, Any], encoded: Mapping[str, bytes]
+) -> bytes:
+    """Serialize dictionary to cbor, including headers, with some values pre-encoded.
+
+    Args:
+        message: Message to be serialized
+        encoded: Encoded values, replacing or added to those in the message
+
+    """
+    keys = list(message) + [key for key in encoded if key not in message]
+    fragments = [SELF_DESCRIBED_CBOR_HEADER, cbor_map_header(len(keys))]
+    for key in keys:
+        fragments.append(cbor2.dumps(key))
+        fragments.append(encoded[key] if key in encoded else cbor2.dumps(message[key]))
+    return b"".join(fragments)
+
+
+def encode_user_data(appendix: Any) -> dict[str, bytes]:
+    """Encode an appendix as the cbor user_data field of a message.
+
+    Appendices given as JSON strings are sent as the equivalent cbor.
+
+    Args:
+        appendix: The appendix to encode
+
+    """
+    if not appendix:
+        return {}
+    if isinstance(appendix, str):
+        try:
+            appendix = json.loads(appendix)
+        except json.JSONDecodeError:
+            pass
+    return {"user_data": cbor2.dumps(appendix)}
+
+
+def cbor_map_header(length: int) -> bytes:
+    """Encode the header of a cbor map with the given number of entries.
+
+    Args:
+        length: Number of key/value pairs in the map
+
+    """
+    if length < 24:
+        return bytes([0xA0 + length])
+    elif length < 2**8:
+        return b"\xb8" + length.to_bytes(1, "big")
+    return b"\xb9" + length.to_bytes(2, "big")
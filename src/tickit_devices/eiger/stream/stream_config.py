@@ -1,7 +1,7 @@
 from dataclasses import dataclass, field, fields
 from typing import Any
 
-from tickit_devices.eiger.eiger_schema import rw_str
+from tickit_devices.eiger.eiger_schema import rw_str, validate, validated
 
 
 def stream_config_keys() -> list[str]:
@@ -12,6 +12,7 @@ LEGACY_STREAM = "legacy"
 CBOR_STREAM = "cbor"
 
 
+@validated
 @dataclass
 class StreamConfig:
     """Eiger stream configuration taken from the API spec."""
@@ -38,4 +39,4 @@ class StreamConfig:
         raise ValueError(f"No field with name {key}")
 
     def __setitem__(self, key: str, value: Any) -> None:  # noqa: D105
-        self.__dict__[key] = value
+        self.__dict__[key] = validate(self, key, value)
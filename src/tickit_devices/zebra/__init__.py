@@ -7,8 +7,13 @@ from tickit.core.components.component import ComponentConfig
 from tickit.core.components.system_component import SystemComponent
 from tickit.core.typedefs import ComponentID, ComponentPort, PortID
 
-from tickit_devices.zebra._common import param_types
-from tickit_devices.zebra.and_or_block import AndOrBlockConfig
+from tickit_devices.zebra._common import (
+    BlockConfig,
+    output_muxes,
+    param_types,
+    parse_blocks,
+)
+from tickit_devices.zebra.netlist import NetlistConfig
 from tickit_devices.zebra.zebra import ZebraAdapter
 
 
@@ -20,36 +25,87 @@ def _default() -> dict[str, int]:
 class Zebra(ComponentConfig):
     """
     Simulation of a Zebra device with a TCP server for reading/setting params/muxes
-    (see `ZebraAdapter` for what read/set is available); Block wiring is currently
-    invariant while Tickit is running, and only those blocks that are configured in
-    components are instantiated.
+    (see `ZebraAdapter` for what read/set is available); Block wiring is initially
+    set from the inputs of the components and may be changed by setting muxes while
+    Tickit is running. Only those blocks that are configured in components are
+    instantiated.
 
     Configuration that is currently passed down to Block behaviour from `params`:
     - For AND/OR gates N=1,2,3,4, the following (default 0) may be set
     to Σ2**M where M is each input (1,2,3,4) for which the behaviour is desired.
     {AND|OR}{N}_INV: Inverts input(s) M
     {AND|OR}{N}_ENA: Enables input(s) M
+    - For pulse generators N=1,2,3,4, in ticks of the 50MHz clock divided by
+    PULSE{N}_PRE, PULSE{N}_DLY is the delay from the edge of the input to the
+    pulse and PULSE{N}_WID its width. Bit 7+N of POLARITY triggers the pulse on
+    the falling, rather than the rising, edge.
+    - For dividers N=1,2,3,4, DIV{N}_DIVHI << 16 | DIV{N}_DIVLO is the divisor, bit
+    N-1 of DIV_FIRST passes the first pulse to OUTD rather than OUTN and bit 3+N of
+    POLARITY counts falling, rather than rising, edges.
+    - For gates N=1,2,3,4, bit N-1 of POLARITY sets and resets the gate on falling,
+    rather than rising, edges.
+    - For position compare, the PC_* registers (see `PositionCompareBlock`), which
+    compares the positions on the inputs ENC1-4 of the block named PC. The
+    positions, and the quadrature of IN5-8_ENCA etc., may be simulated by an
+    `Encoder`.
+
+    When compiled, the blocks are evaluated together as a single `Netlist` device,
+    rather than as a component each, so that a signal crossing several blocks does
+    not take a scheduler update per block. The outputs of the Mux registers OUT1_TTL
+    etc. are then always exposed.
     """
 
     name: ComponentID
     inputs: dict[PortID, ComponentPort]
     expose: dict[PortID, ComponentPort]
-    components: list[AndOrBlockConfig]
+    components: list[BlockConfig]
     host: str = "localhost"
     port: int = 7012
     params: dict[str, int] = Field(default_factory=dict)
+    compiled: bool = False
 
     @validator("params")
     def add_defaults(cls, v: dict[str, int]) -> dict[str, int]:  # noqa: N805
+        unknown = sorted(set(v) - set(param_types))
+        if unknown:
+            raise ValueError(
+                f"{unknown} are not Param registers, Mux registers are set by the "
+                "inputs of the components"
+            )
         return {**_default(), **v}
 
+    @validator("components", pre=True)
+    def parse_components(cls, v: list) -> list:  # noqa: N805
+        return parse_blocks(v)
+
     def __call__(self) -> SystemComponent:
-        return SystemComponent(
+        components: list[ComponentConfig] = list(self.components)
+        expose = self.expose
+        if self.compiled:
+            netlist = ComponentID("netlist")
+            components = [
+                NetlistConfig(
+                    name=netlist,
+                    inputs={
+                        port: ComponentPort(ComponentID("external"), port)
+                        for port in self.inputs
+                    },
+                    blocks=self.components,
+                    expose=self.expose,
+                )
+            ]
+            expose = {
+                port: ComponentPort(netlist, port)
+                for port in {*self.expose, *output_muxes}
+            }
+        adapter = ZebraAdapter(params=self.params)
+        adapter.system = SystemComponent(
             adapter=AdapterContainer(
-                adapter=ZebraAdapter(params=self.params),
+                adapter=adapter,
                 io=TcpIo(host=self.host, port=self.port),
             ),
-            components=self.components,
-            expose=self.expose,
+            components=components,
+            expose=expose,
             name=self.name,
         )
+        return adapter.system
@@ -1,13 +1,16 @@
 import re
 from abc import ABC, abstractmethod
-from collections.abc import Callable
+from array import array
+from collections import deque
+from collections.abc import Callable, Iterator, Mapping, MutableMapping
 from dataclasses import dataclass
 from typing import Any, Generic, TypeVar, get_type_hints
 
 import pydantic
+from pydantic.v1 import parse_obj_as
 from tickit.core.components.component import ComponentConfig
 from tickit.core.device import Device, DeviceUpdate
-from tickit.core.typedefs import SimTime
+from tickit.core.typedefs import ComponentID, ComponentPort, PortID, SimTime
 
 
 @dataclass
@@ -201,13 +204,134 @@ register_types: dict[str, Param | Mux] = {
     "SYS_STAT1HI": Param(0xF3, []),
     "SYS_STAT2LO": Param(0xF4, []),
     "SYS_STAT2HI": Param(0xF5, []),
-    "PC_NUM_CAPLO": Param(0xF6, []),
-    "PC_NUM_CAPHI": Param(0xF7, []),
+    "PC_NUM_CAPLO": Param(0xF6, ["PC"]),
+    "PC_NUM_CAPHI": Param(0xF7, ["PC"]),
 }
 
 register_names = {reg.reg: name for name, reg in register_types.items()}
 param_types = {name: t for name, t in register_types.items() if isinstance(t, Param)}
+#: Addresses of the Param registers, and the blocks which use each
+param_addresses = {name: t.reg for name, t in param_types.items()}
+param_blocks = {t.reg: t.blocks for t in param_types.values()}
 mux_types = {name: t for name, t in register_types.items() if isinstance(t, Mux)}
+#: Mux registers selecting the outputs of the Zebra
+output_muxes = [name for name, t in mux_types.items() if t.block is None]
+
+#: The number of registers addressed by the Zebra
+REGISTERS = 256
+
+
+class RegisterFile(MutableMapping[str, int]):
+    """
+    The 16 bit registers of the Zebra, stored in an array indexed by address, so
+    that reads and writes over TCP, and saving and restoring the registers, work on
+    the array rather than on names. As a mapping, it holds the Params by name, which
+    are resolved to their addresses once, for blocks to compute their state from.
+    """
+
+    def __init__(self, params: Mapping[str, int] | None = None) -> None:
+        self._words = array("H", bytes(2 * REGISTERS))
+        self.update(params or {})
+
+    def __getitem__(self, name: str) -> int:
+        return self._words[_param_address(name)]
+
+    def __setitem__(self, name: str, value: int) -> None:
+        self._words[_param_address(name)] = value
+
+    def __delitem__(self, name: str) -> None:
+        raise TypeError(f"Register {name} cannot be removed")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(param_addresses)
+
+    def __len__(self) -> int:
+        return len(param_addresses)
+
+    def read(self, address: int) -> int:
+        return self._words[address]
+
+    def write(self, address: int, value: int) -> None:
+        self._words[address] = value
+
+    def save(self) -> bytes:
+        """The values of all of the registers, to be restored by `restore`."""
+        return self._words.tobytes()
+
+    def restore(self, saved: bytes) -> None:
+        self._words[:] = array("H", saved)
+
+
+def _param_address(name: str) -> int:
+    try:
+        return param_addresses[name]
+    except KeyError:
+        raise KeyError(f"{name} is not a Param register of the Zebra") from None
+
+
+#: Signals of the system bus, indexed by the value of a Mux register selecting them
+system_bus = [
+    "DISCONNECT",
+    *(f"IN{n}_{kind}" for n, kind in ((1, "TTL"), (1, "NIM"), (1, "LVDS"))),
+    *(f"IN{n}_{kind}" for n, kind in ((2, "TTL"), (2, "NIM"), (2, "LVDS"))),
+    *(f"IN{n}_{kind}" for n, kind in ((3, "TTL"), (3, "OC"), (3, "LVDS"))),
+    *(f"IN{n}_{kind}" for n, kind in ((4, "TTL"), (4, "CMP"), (4, "PECL"))),
+    *(
+        f"IN{n}_{kind}"
+        for n in range(5, 9)
+        for kind in ("ENCA", "ENCB", "ENCZ", "CONN")
+    ),
+    "PC_ARM",
+    "PC_GATE",
+    "PC_PULSE",
+    *(f"AND{n}" for n in range(1, 5)),
+    *(f"OR{n}" for n in range(1, 5)),
+    *GATES,
+    *(f"{div}_OUTD" for div in DIVS),
+    *(f"{div}_OUTN" for div in DIVS),
+    *PULSES,
+    "QUAD_OUTA",
+    "QUAD_OUTB",
+    "CLOCK_1KHZ",
+    "CLOCK_1MHZ",
+    *(f"SOFT_IN{n}" for n in range(1, 5)),
+]
+
+
+def _bus_source(signal: str) -> ComponentPort | None:
+    """
+    The output driving a system bus signal: front panel inputs are inputs of the
+    Zebra, e.g. IN1_TTL is the external port IN1_TTL, other signals are outputs of
+    blocks, e.g. AND1 is AND1.OUT and DIV1_OUTD is DIV1.OUTD.
+    """
+    if signal == "DISCONNECT":
+        return None
+    if re.fullmatch(r"IN\d_\w+", signal):
+        return ComponentPort(ComponentID("external"), PortID(signal))
+    block, _, port = signal.partition("_")
+    return ComponentPort(ComponentID(block), PortID(port or "OUT"))
+
+
+bus_sources = {value: _bus_source(signal) for value, signal in enumerate(system_bus)}
+bus_values = {source: value for value, source in bus_sources.items() if source}
+#: Periods of the free running clocks of the system bus, square waves which rise at
+#: time 0
+clock_periods = {
+    ComponentPort(ComponentID("CLOCK"), PortID("1KHZ")): SimTime(1_000_000),
+    ComponentPort(ComponentID("CLOCK"), PortID("1MHZ")): SimTime(1_000),
+}
+
+
+def mux_sink(reg_name: str) -> ComponentPort:
+    """
+    The input selected by a Mux register: AND1_INP1 selects AND1.INP1, whilst the
+    output Muxes, e.g. OUT1_TTL, select outputs exposed by the Zebra.
+    """
+    block = mux_types[reg_name].block
+    if block is None:
+        return ComponentPort(ComponentID("expose"), PortID(reg_name))
+    return ComponentPort(ComponentID(block), PortID(reg_name.removeprefix(f"{block}_")))
+
 
 Inputs = TypeVar("Inputs")
 Outputs = TypeVar("Outputs")
@@ -222,7 +346,9 @@ class Block(Device, ABC, Generic[Inputs, Outputs]):
     """
     previous_outputs: Outputs
     next_outputs: Outputs | None = None
-    params: dict[str, int] | None = None
+    params: MutableMapping[str, int] | None = None
+    #: Outputs wired to an input or exposed, None if not known
+    observed: set[PortID] | None = None
 
     def update(self, time: SimTime, inputs: Inputs) -> DeviceUpdate[Outputs]:
         if self.next_outputs:
@@ -236,6 +362,13 @@ class Block(Device, ABC, Generic[Inputs, Outputs]):
     @abstractmethod
     def _get_next_outputs(self, inputs: Inputs) -> Outputs: ...
 
+    def params_changed(self) -> None:
+        """
+        Called when params are assigned or a register of the block is written, so
+        that state derived from the params can be computed once rather than on
+        every update.
+        """
+
     @property
     def num(self):
         match = re.search(r"\d*$", self.name)
@@ -245,9 +378,50 @@ class Block(Device, ABC, Generic[Inputs, Outputs]):
     def read_mux(self, register: str) -> int:
         return 0
 
+    def read_param(self, register: str) -> int | None:
+        """
+        The value of a register which the block sets itself, e.g. a count, or None to
+        read the value last written.
+        """
+        return None
+
     def set_mux(self, register: str, value: int) -> int:
         return 0
 
+    def set_train(self, port: PortID, period: SimTime | None) -> bool:
+        """Drives an input with a clock, which the block generates itself.
+
+        Args:
+            port: The input.
+            period: The period of the clock, None when the input is no longer driven
+                by a clock.
+
+        Returns:
+            bool: Whether the block can generate the clock on the input.
+        """
+        return False
+
+
+class EdgeBlock(Block[Inputs, Outputs]):
+    """
+    A block whose outputs depend on the edges of its inputs. Unlike Block, every
+    change of the inputs is evaluated, including those arriving whilst an earlier
+    change propagates, and the resulting outputs are queued to be emitted 20ns later.
+    """
+
+    def __init__(self, name: str, previous_outputs: Outputs):
+        super().__init__(name=name, previous_outputs=previous_outputs)
+        self._pending: deque[tuple[SimTime, Outputs]] = deque()
+
+    def update(self, time: SimTime, inputs: Inputs) -> DeviceUpdate[Outputs]:
+        pending = self._pending
+        outputs = self._get_next_outputs(inputs)
+        if outputs != (pending[-1][1] if pending else self.previous_outputs):
+            pending.append((SimTime(time + 20), outputs))
+        while pending and pending[0][0] <= time:
+            self.previous_outputs = pending.popleft()[1]
+        return DeviceUpdate(self.previous_outputs, pending[0][0] if pending else None)
+
 
 @pydantic.v1.dataclasses.dataclass
 class BlockConfig(ComponentConfig, ABC):
@@ -257,6 +431,17 @@ class BlockConfig(ComponentConfig, ABC):
         ...
 
 
+def parse_blocks(configs: list[Any]) -> list[Any]:
+    """
+    Parses the configs of blocks given by their type, e.g. when read from YAML, which
+    is only done for ComponentConfig rather than the abstract BlockConfig.
+    """
+    return [
+        parse_obj_as(ComponentConfig, config) if isinstance(config, dict) else config
+        for config in configs
+    ]
+
+
 def default_filler(typed_dict_type) -> Callable[[], Any]:
     def make_default():
         return {name: typ() for name, typ in get_type_hints(typed_dict_type).items()}
@@ -264,18 +449,25 @@ def default_filler(typed_dict_type) -> Callable[[], Any]:
     return make_default
 
 
-def extract_bit(registers: dict[str, int], key: str, shift: int) -> bool:
+def extract_bit(registers: Mapping[str, int], key: str, shift: int) -> bool:
     return bool((registers[key] >> shift) & 1)
 
 
-def clear_bit(registers: dict[str, int], key: str, shift: int):
+def clear_bit(registers: MutableMapping[str, int], key: str, shift: int):
     registers[key] &= ~(1 << shift)
 
 
-def set_bit(registers: dict[str, int], key: str, shift: int):
+def set_bit(registers: MutableMapping[str, int], key: str, shift: int):
     registers[key] |= 1 << shift
 
 
+def falling_edge(registers: Mapping[str, int], block: str) -> bool:
+    """Whether POLARITY selects the falling, rather than rising, edge of a block."""
+    return extract_bit(
+        registers, "POLARITY", param_types["POLARITY"].blocks.index(block)
+    )
+
+
 def rising(old: bool, new: bool) -> bool:
     return new and not old
 
@@ -0,0 +1,56 @@
+"""
+Rewiring of a running system.
+
+tickit has no API to change the wiring of a system once its scheduler is running, so
+this reaches into the scheduler for its EventRouter and edits the wiring and the
+trees of components the router caches as `cached_property`. This depends on the
+internals of tickit, which `tests/zebra/test_routing.py` checks for the installed
+version, and is kept here rather than spread through the adapter.
+"""
+
+from tickit.core.components.system_component import SystemComponent
+from tickit.core.management.event_router import EventRouter
+from tickit.core.typedefs import ComponentPort
+
+#: Cached properties of the router which are derived from its wiring, but are not
+#: edited by `move_edge`, so are computed again when next used
+_DERIVED = ("input_components", "output_components", "isolated_components")
+
+
+def running_router(system: SystemComponent | None) -> EventRouter | None:
+    """The router of the scheduler of a system, None until the system is running."""
+    scheduler = getattr(system, "scheduler", None)
+    ticker = getattr(scheduler, "ticker", None)
+    return None if ticker is None else ticker.event_router
+
+
+def move_edge(
+    router: EventRouter,
+    sink: ComponentPort,
+    old_source: ComponentPort | None,
+    source: ComponentPort | None,
+) -> None:
+    """
+    Updates an EventRouter for an input which moves from one output to another,
+    updating the cached component trees only for the components whose edges moved.
+    """
+    wiring = router.wiring
+    tree = router.component_tree
+    dependencies = router.inverse_component_tree[sink.component]
+    if old_source is not None:
+        wiring[old_source.component][old_source.port].discard(sink)
+        if not any(
+            port.component == sink.component
+            for ports in wiring[old_source.component].values()
+            for port in ports
+        ):
+            tree[old_source.component].discard(sink.component)
+            dependencies.discard(old_source.component)
+    if source is not None:
+        wiring[source.component][source.port].add(sink)
+        tree.setdefault(source.component, set()).add(sink.component)
+        router.inverse_component_tree.setdefault(source.component, set())
+        router.components.add(source.component)
+        dependencies.add(source.component)
+    for name in _DERIVED:
+        vars(router).pop(name, None)
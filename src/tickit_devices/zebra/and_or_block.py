@@ -1,11 +1,11 @@
-from functools import partial, reduce
-from operator import and_, or_
 from typing import TypedDict
 
 import pydantic.v1.dataclasses
 from tickit.core.components.device_component import DeviceComponent
 
-from tickit_devices.zebra._common import Block, BlockConfig, extract_bit
+from tickit_devices.zebra._common import Block, BlockConfig
+
+ALL_INPUTS = 0b1111
 
 
 class AndOrBlock(Block):
@@ -13,6 +13,9 @@ class AndOrBlock(Block):
     Represents an AND or OR gate with 4 inputs.
     If an input is not enabled, it will always be considered False,
     unless it is also inverted.
+
+    The {name}_ENA and {name}_INV registers are compiled into masks when they are
+    written, so an update packs the inputs into a nibble and compares it once.
     """
 
     class Inputs(TypedDict):
@@ -26,27 +29,28 @@ class AndOrBlock(Block):
 
     def __init__(self, name: str):
         super().__init__(name=name, previous_outputs=self.Outputs(OUT=False))
+        self._is_and = name.startswith("AND")
+        self._enabled: int | None = None
+        self._inverted = 0
 
-    def _get_input(self, inputs: dict[str, bool], i: int) -> bool:
+    def params_changed(self) -> None:
         if not self.params:
             raise ValueError
-        enabled = extract_bit(self.params, f"{self.name}_ENA", i)
-        inverted = extract_bit(self.params, f"{self.name}_INV", i)
-        return enabled & inputs.get(f"INP{i + 1}", False) ^ inverted
+        self._enabled = self.params[f"{self.name}_ENA"] & ALL_INPUTS
+        self._inverted = self.params[f"{self.name}_INV"] & ALL_INPUTS
 
     def _get_next_outputs(self, inputs: Inputs) -> Outputs:
-        op = and_ if self.name.startswith("AND") else or_
-        get_input = partial(
-            self._get_input,
-            {
-                k: v
-                for k, v in inputs.items()
-                if isinstance(k, str) and isinstance(v, bool)
-            },
+        if self._enabled is None:
+            self.params_changed()
+        get = inputs.get
+        high = (
+            bool(get("INP1"))
+            | bool(get("INP2")) << 1
+            | bool(get("INP3")) << 2
+            | bool(get("INP4")) << 3
         )
-        outputs = self.Outputs(OUT=reduce(op, map(get_input, range(4))))
-        self.last_input = inputs
-        return outputs
+        values = high & self._enabled ^ self._inverted  # type: ignore
+        return self.Outputs(OUT=values == ALL_INPUTS if self._is_and else values != 0)
 
 
 @pydantic.v1.dataclasses.dataclass
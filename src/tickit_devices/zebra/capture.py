@@ -0,0 +1,120 @@
+from collections.abc import Iterator, Sequence
+
+import numpy as np
+
+#: Values which may be captured, in the order of the bits of PC_BIT_CAP
+CAPTURE_FIELDS = (
+    "ENC1",
+    "ENC2",
+    "ENC3",
+    "ENC4",
+    "SYS1",
+    "SYS2",
+    "DIV1",
+    "DIV2",
+    "DIV3",
+    "DIV4",
+)
+#: Points sent in each frame of a download
+FRAME_POINTS = 4096
+#: The most points reserved when the buffer is emptied, beyond which it grows as
+#: points are captured
+MAX_RESERVED = 65536
+
+
+def capture_fields(bit_cap: int) -> tuple[str, ...]:
+    """The values captured for a value of PC_BIT_CAP."""
+    return tuple(field for i, field in enumerate(CAPTURE_FIELDS) if bit_cap >> i & 1)
+
+
+def record_dtype(fields: Sequence[str]) -> np.dtype:
+    """
+    The little endian layout of a point when downloaded: the timestamp as an unsigned
+    32 bit integer, then each value captured as a signed 32 bit integer.
+    """
+    return np.dtype([("TIME", "<u4"), *((field, "<i4") for field in fields)])
+
+
+class CaptureBuffer:
+    """
+    The timestamps and values captured at each pulse of position compare, kept as
+    a column per value. The columns are preallocated and doubled in size when full,
+    so capturing a point is a write to each column rather than an allocation.
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self.bit_cap = 0
+        self.fields: tuple[str, ...] = ()
+        self.count = 0
+        self._timestamps = np.zeros(capacity, dtype=np.uint32)
+        self._values = np.zeros((0, capacity), dtype=np.int32)
+
+    def reset(self, bit_cap: int, capacity: int | None = None) -> None:
+        """Empties the buffer to capture the fields enabled by bit_cap.
+
+        Args:
+            bit_cap: The value of PC_BIT_CAP.
+            capacity: The number of points expected, if known, of which at most
+                MAX_RESERVED are reserved.
+        """
+        capacity = max(min(capacity or 0, MAX_RESERVED), len(self._timestamps))
+        self.bit_cap = bit_cap
+        self.fields = capture_fields(bit_cap)
+        self.count = 0
+        self._timestamps = np.zeros(capacity, dtype=np.uint32)
+        self._values = np.zeros((len(self.fields), capacity), dtype=np.int32)
+
+    def append(self, timestamp: int, values: Sequence[int]) -> None:
+        """Captures a point, with a value for each of the fields."""
+        if self.count == len(self._timestamps):
+            self._grow()
+        self._timestamps[self.count] = timestamp & 0xFFFFFFFF
+        self._values[:, self.count] = values
+        self.count += 1
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._timestamps[: self.count]
+
+    def column(self, field: str) -> np.ndarray:
+        return self._values[self.fields.index(field), : self.count]
+
+    def records(self, start: int, stop: int) -> bytes:
+        """The points from start to stop, packed as `record_dtype` of the fields."""
+        stop = min(stop, self.count)
+        start = min(start, stop)
+        records = np.empty(stop - start, dtype=record_dtype(self.fields))
+        records["TIME"] = self._timestamps[start:stop]
+        for field, column in zip(self.fields, self._values, strict=True):
+            records[field] = column[start:stop]
+        return records.tobytes()
+
+    def _grow(self) -> None:
+        capacity = 2 * len(self._timestamps)
+        self._timestamps = np.resize(self._timestamps, capacity)
+        values = np.zeros((len(self.fields), capacity), dtype=np.int32)
+        values[:, : self.count] = self._values[:, : self.count]
+        self._values = values
+
+
+def encode_frames(buffer: CaptureBuffer, start: int, count: int) -> Iterator[bytes]:
+    """
+    Yields up to count points from start as frames of at most FRAME_POINTS, each a
+    header line of B then the index of its first point, its number of points and
+    PC_BIT_CAP in hexadecimal, followed by the points packed as `record_dtype`.
+    """
+    stop = min(start + count, buffer.count)
+    while True:
+        end = min(start + FRAME_POINTS, stop)
+        header = b"B%08X%04X%04X\n" % (start, max(end - start, 0), buffer.bit_cap)
+        yield header + buffer.records(start, end)
+        start = end
+        if start >= stop:
+            return
+
+
+def decode_frame(frame: bytes) -> tuple[int, np.ndarray]:
+    """The index of the first point and the points of a frame from `encode_frames`."""
+    header, _, payload = frame.partition(b"\n")
+    start, bit_cap = int(header[1:9], 16), int(header[13:17], 16)
+    return start, np.frombuffer(payload, dtype=record_dtype(capture_fields(bit_cap)))
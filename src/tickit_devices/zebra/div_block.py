@@ -0,0 +1,210 @@
+from dataclasses import dataclass
+from typing import TypedDict
+
+import pydantic.v1.dataclasses
+from tickit.core.components.device_component import DeviceComponent
+from tickit.core.device import DeviceUpdate
+from tickit.core.typedefs import PortID, SimTime
+
+from tickit_devices.zebra._common import (
+    BlockConfig,
+    EdgeBlock,
+    extract_bit,
+    falling_edge,
+)
+
+
+@dataclass
+class _Clock:
+    """A clock on the input of a block, whose pulses are counted once connected."""
+
+    period: int
+    #: Time after the rising edge at which pulses start
+    offset: int
+    #: When the clock was connected, the first pulse counted and the count before it
+    start: int
+    first: int
+    count: int
+
+    def pulse(self, time: int) -> int:
+        """The last pulse to start by time."""
+        return (time - self.offset) // self.period
+
+    def pulse_start(self, pulse: int) -> int:
+        return max(pulse * self.period + self.offset, self.start)
+
+    def active(self, time: int) -> bool:
+        return (time - self.offset) % self.period < self.period // 2
+
+    def level(self, time: int) -> bool:
+        return time % self.period < self.period // 2
+
+    def count_after(self, pulse: int, divisor: int) -> int:
+        return (self.count + max(pulse - self.first + 1, 0)) % divisor
+
+    def divided(self, pulse: int, divisor: int) -> bool:
+        return (self.count + pulse - self.first + 1) % divisor == 0
+
+
+class DivBlock(EdgeBlock):
+    """
+    Divides the pulses of INP by {name}_DIVHI << 16 | {name}_DIVLO: every Nth pulse
+    is passed to OUTD and the others to OUTN. The counter is reset when the divisor
+    or the bit of DIV_FIRST for the block are changed, such that the first pulse is
+    passed to OUTD if the bit is set, else to OUTN. Pulses start on the rising edge,
+    or falling if the bit of POLARITY for the block is set.
+
+    When INP is driven by a clock of the system bus, the block generates the clock
+    itself: the pulse and its output at any time follow from the number of periods
+    since the clock was connected, so the block is only updated when an observed
+    output changes, rather than on every edge of the clock.
+    """
+
+    class Inputs(TypedDict):
+        INP: bool
+
+    class Outputs(TypedDict):
+        OUTD: bool
+        OUTN: bool
+
+    def __init__(self, name: str):
+        super().__init__(
+            name=name, previous_outputs=self.Outputs(OUTD=False, OUTN=False)
+        )
+        self._divisor: int | None = None
+        self._first = False
+        self._falling = False
+        self._count = 0
+        self._input = False
+        self._high = False
+        self._divided = False
+        #: The period of the clock on INP, which is connected at the next update
+        self._period: SimTime | None = None
+        self._reconnect = False
+        self._clock: _Clock | None = None
+
+    def params_changed(self) -> None:
+        if not self.params:
+            raise ValueError
+        low, high = self.params[f"{self.name}_DIVLO"], self.params[f"{self.name}_DIVHI"]
+        divisor = max(high << 16 | low, 1)
+        first = extract_bit(self.params, "DIV_FIRST", self.num - 1)
+        falling = falling_edge(self.params, self.name)
+        # POLARITY and DIV_FIRST are shared with the other blocks, so the counter is
+        # only reset by a change of the divisor or bit of this block
+        reset = (divisor, first) != (self._divisor, self._first)
+        if self._clock is not None and (reset or falling != self._falling):
+            # A clock is counted again from the next update, from its new edge
+            self._reconnect = True
+            if reset:
+                self._clock = None
+        self._divisor, self._first, self._falling = divisor, first, falling
+        if reset:
+            self._count = divisor - 1 if first else 0
+
+    def set_train(self, port: PortID, period: SimTime | None) -> bool:
+        if port != "INP":
+            return False
+        self._period = period
+        self._reconnect = True
+        return True
+
+    def count(self, time: SimTime) -> int:
+        """The pulses counted since the last passed to OUTD, at a time."""
+        clock, divisor = self._clock, self._divisor
+        if clock is None or divisor is None:
+            return self._count
+        return clock.count_after(clock.pulse(time), divisor)
+
+    def update(self, time: SimTime, inputs: Inputs) -> DeviceUpdate[Outputs]:
+        if self._divisor is None:
+            self.params_changed()
+        if self._reconnect:
+            self._reconnect = False
+            if self._clock is not None:
+                self._disconnect(time)
+            if self._period is not None:
+                self._connect(time, self._period)
+        if self._clock is None:
+            return super().update(time, inputs)
+
+        outputs, call_at = self._clock_outputs(time, self._clock)
+        self.previous_outputs = outputs
+        return DeviceUpdate(outputs, call_at)
+
+    def _get_next_outputs(self, inputs: Inputs) -> Outputs:
+        level = bool(inputs.get("INP"))
+        if level != self._input:
+            self._input = level
+            self._high = level != self._falling
+            if self._high:
+                self._count += 1
+                self._divided = self._count >= self._divisor  # type: ignore
+                if self._divided:
+                    self._count = 0
+        return self.Outputs(
+            OUTD=self._high and self._divided, OUTN=self._high and not self._divided
+        )
+
+    def _connect(self, time: SimTime, period: SimTime) -> None:
+        """Counts the pulses of a clock from time, as though it were on INP."""
+        clock = _Clock(
+            period=period,
+            offset=period // 2 if self._falling else 0,
+            start=time,
+            first=0,
+            count=self._count,
+        )
+        pulse = clock.pulse(time)
+        # Connecting the clock gives an edge if it changes the level of INP
+        edge = clock.active(time) and clock.level(time) != self._input
+        clock.first = pulse if edge else pulse + 1
+        self._clock = clock
+        self._pending.clear()
+
+    def _disconnect(self, time: SimTime) -> None:
+        """Stops counting the pulses of the clock, keeping the count at time."""
+        clock, divisor = self._clock, self._divisor
+        assert clock is not None and divisor is not None
+        pulse = clock.pulse(time)
+        self._count = clock.count_after(pulse, divisor)
+        self._input = clock.level(time)
+        self._high = pulse >= clock.first and clock.active(time)
+        self._divided = self._high and clock.divided(pulse, divisor)
+        self._clock = None
+
+    def _clock_outputs(
+        self, time: SimTime, clock: _Clock
+    ) -> tuple[Outputs, SimTime | None]:
+        """
+        The outputs at a time, which follow the clock 20ns later, and when the next
+        observed output changes.
+        """
+        divisor = self._divisor
+        assert divisor is not None
+        seen = time - 20
+        pulse = clock.pulse(seen)
+        started = clock.pulse_start(pulse) <= seen
+        high = pulse >= clock.first and started and clock.active(seen)
+        divided = high and clock.divided(pulse, divisor)
+        outputs = self.Outputs(OUTD=divided, OUTN=high and not divided)
+
+        # The next pulse to start, and how many more until one is divided
+        end = pulse * clock.period + clock.offset + clock.period // 2
+        following = max(pulse + 1 if started else pulse, clock.first)
+        skip = -(clock.count + following - clock.first + 1) % divisor
+        changes = {
+            "OUTD": end if divided else clock.pulse_start(following + skip),
+            "OUTN": end if high and not divided else None,
+        }
+        if changes["OUTN"] is None and divisor > 1:
+            changes["OUTN"] = clock.pulse_start(following + (skip == 0))
+        observed = self.observed if self.observed is not None else changes
+        times = [t for port, t in changes.items() if port in observed and t is not None]
+        return outputs, SimTime(min(times) + 20) if times else None
+
+
+@pydantic.v1.dataclasses.dataclass
+class DivBlockConfig(BlockConfig):
+    def __call__(self) -> DeviceComponent:
+        return DeviceComponent(name=self.name, device=DivBlock(name=self.name))
@@ -0,0 +1,295 @@
+import math
+from bisect import bisect_right
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import TypedDict
+
+import pydantic.v1.dataclasses
+from tickit.core.components.component import Component, ComponentConfig
+from tickit.core.components.device_component import DeviceComponent
+from tickit.core.device import Device, DeviceUpdate
+from tickit.core.typedefs import SimTime
+
+#: Levels of A and B through a cycle of quadrature, by count modulo 4
+QUADRATURE = ((False, False), (True, False), (True, True), (False, True))
+
+
+@dataclass(frozen=True)
+class Segment:
+    """Motion with a constant acceleration, from time until the next segment.
+
+    Times are in ns, positions in counts, velocities in counts/ns and accelerations
+    in counts/ns².
+    """
+
+    time: float
+    position: float
+    velocity: float = 0.0
+    acceleration: float = 0.0
+
+    def position_at(self, time: float) -> float:
+        elapsed = time - self.time
+        return self.position + elapsed * (
+            self.velocity + elapsed * self.acceleration / 2
+        )
+
+    def reaches(self, position: float, after: float, rising: bool) -> float | None:
+        """
+        The first time from after at which the motion reaches position whilst rising
+        or falling, if ever.
+        """
+        a, v = self.acceleration / 2, self.velocity
+        c = self.position - position
+        if a == 0:
+            roots = [-c / v] if v else []
+        else:
+            discriminant = v * v - 4 * a * c
+            if discriminant < 0:
+                return None
+            # The form of the roots which does not lose precision when a is small
+            q = -(v + math.copysign(math.sqrt(discriminant), v)) / 2
+            roots = [q / a, c / q] if q else [0.0]
+        elapsed = after - self.time
+        return min(
+            (
+                self.time + root
+                for root in roots
+                if root >= elapsed
+                and ((v + 2 * a * root) or a) * (1 if rising else -1) > 0
+            ),
+            default=None,
+        )
+
+
+class MotionProfile:
+    """
+    The position of an axis as a function of time, made of segments of constant
+    acceleration, so that the position and the times at which it reaches a given
+    position are computed in closed form rather than by stepping through time.
+    """
+
+    def __init__(self, segments: Sequence[Segment]) -> None:
+        if not segments:
+            raise ValueError("A motion profile needs at least one segment")
+        self.segments = sorted(segments, key=lambda segment: segment.time)
+        self._starts = [segment.time for segment in self.segments]
+
+    @classmethod
+    def constant_velocity(
+        cls, velocity: float, start: float = 0.0, time: float = 0.0
+    ) -> "MotionProfile":
+        """Moves at velocity counts/ns from position start at time ns, forever."""
+        return cls([Segment(time, start, velocity)])
+
+    @classmethod
+    def trapezoid(
+        cls,
+        distance: float,
+        velocity: float,
+        acceleration: float = 0.0,
+        start: float = 0.0,
+        time: float = 0.0,
+    ) -> "MotionProfile":
+        """
+        Moves distance counts from position start at time ns, accelerating at
+        acceleration counts/ns² up to velocity counts/ns and decelerating to stop at
+        the end, without reaching velocity if the move is too short. An acceleration
+        of 0 changes velocity instantly.
+        """
+        if not velocity:
+            raise ValueError("A move needs a velocity")
+        direction = math.copysign(1, distance)
+        distance, velocity = abs(distance), abs(velocity)
+        if acceleration:
+            # Too short to reach velocity, so the profile is a triangle
+            velocity = min(velocity, math.sqrt(distance * acceleration))
+            ramp = velocity / acceleration
+        else:
+            ramp = 0.0
+        ramp_distance = velocity * ramp / 2
+        cruise = (distance - 2 * ramp_distance) / velocity
+        a, v = direction * acceleration, direction * velocity
+        return cls(
+            [
+                Segment(time, start, 0.0, a),
+                Segment(time + ramp, start + direction * ramp_distance, v),
+                Segment(
+                    time + ramp + cruise,
+                    start + direction * (distance - ramp_distance),
+                    v,
+                    -a,
+                ),
+                Segment(time + 2 * ramp + cruise, start + direction * distance),
+            ]
+        )
+
+    @classmethod
+    def waypoints(cls, points: Sequence[tuple[float, float]]) -> "MotionProfile":
+        """
+        Moves at constant velocity between each (time ns, position) of points, and
+        holds the first position before them and the last after them.
+        """
+        points = sorted(points)
+        segments = [
+            Segment(t0, p0, (p1 - p0) / (t1 - t0))
+            for (t0, p0), (t1, p1) in zip(points, points[1:], strict=False)
+            if t1 > t0
+        ]
+        return cls([Segment(*points[0]), *segments, Segment(*points[-1])])
+
+    def _index(self, time: float) -> int:
+        return max(bisect_right(self._starts, time) - 1, 0)
+
+    def position(self, time: float) -> float:
+        """The position at time, which is held before the first segment."""
+        segment = self.segments[self._index(time)]
+        return segment.position_at(max(time, segment.time))
+
+    def reaches(self, position: float, after: float, rising: bool) -> float | None:
+        """
+        The first time from after at which the axis reaches position whilst rising or
+        falling, if ever.
+        """
+        index = self._index(after)
+        for segment, end in zip(
+            self.segments[index:], [*self._starts[index + 1 :], math.inf], strict=True
+        ):
+            time = segment.reaches(position, max(after, segment.time), rising)
+            if time is not None and time < end:
+                return time
+        return None
+
+
+class EncoderDevice(Device):
+    """
+    An incremental encoder following a motion profile, giving its position in counts
+    and the A, B and Z signals of quadrature, with A leading B in the positive
+    direction and Z high for the count at each multiple of index.
+
+    Rather than sampling the profile, the device is called back at the time at
+    which the position next reaches a count which changes an output, computed
+    from the profile. Only the A and B of quadrature change with every count, so
+    when they are not needed, only the edges of Z and the steps of position_step
+    counts of the position are emitted.
+    """
+
+    class Inputs(TypedDict): ...
+
+    class Outputs(TypedDict):
+        POSITION: int
+        A: bool
+        B: bool
+        Z: bool
+
+    def __init__(
+        self,
+        profile: MotionProfile,
+        quadrature: bool = True,
+        position_step: int = 1,
+        index: int = 0,
+    ) -> None:
+        """An encoder following a motion profile.
+
+        Args:
+            profile: The motion of the axis, in counts.
+            quadrature: Whether each count changes A or B, otherwise they are left
+                low.
+            position_step: The counts between changes of the position, which is
+                rounded down to a multiple of them.
+            index: The counts between index pulses, 0 for none.
+        """
+        if position_step < 1 or index < 0:
+            raise ValueError(f"Invalid step {position_step} or index {index}")
+        self.profile = profile
+        self.quadrature = quadrature
+        self.position_step = position_step
+        self.index = index
+
+    def update(self, time: SimTime, inputs: Inputs) -> DeviceUpdate[Outputs]:
+        count = math.floor(self.profile.position(time))
+        position = count // self.position_step * self.position_step
+        a, b = QUADRATURE[count % 4] if self.quadrature else (False, False)
+        z = bool(self.index) and count % self.index == 0
+        outputs = self.Outputs(POSITION=position, A=a, B=b, Z=z)
+        return DeviceUpdate(outputs, self._next_change(time, count))
+
+    def _next_change(self, time: SimTime, count: int) -> SimTime | None:
+        """The first time after time at which the count changes an output."""
+        if self.quadrature:
+            above, below = count + 1, count
+        else:
+            step = self.position_step
+            above, below = (count // step + 1) * step, count // step * step
+            if self.index:
+                # Z rises at each multiple of index and falls a count later
+                base = count // self.index * self.index
+                edges = (base, base + 1, base + self.index)
+                above = min(above, *(edge for edge in edges if edge > count))
+                below = max(below, *(edge for edge in edges if edge <= count))
+        changes = []
+        if (rise := self.profile.reaches(above, time, rising=True)) is not None:
+            changes.append(math.ceil(rise))
+        if (fall := self.profile.reaches(below, time, rising=False)) is not None:
+            # The count falls once the position is below the count reached
+            changes.append(math.floor(fall) + 1)
+        if not changes:
+            return None
+        return SimTime(max(min(changes), time + 1))
+
+
+@pydantic.v1.dataclasses.dataclass
+class Encoder(ComponentConfig):
+    """
+    Simulation of an incremental encoder on an axis, whose POSITION may be wired to
+    the ENC inputs of position compare and whose A, B and Z to the encoder inputs
+    of a Zebra, e.g. IN5_ENCA (see `EncoderDevice`).
+
+    The axis moves from start, in counts, at start_time, in seconds, either through
+    the (seconds, counts) of waypoints if given, or by distance counts at velocity
+    counts/s, accelerating at acceleration counts/s² (0 for instantly), or forever
+    at velocity if no distance is given.
+    """
+
+    velocity: float = 0.0
+    acceleration: float = 0.0
+    distance: float | None = None
+    start: float = 0.0
+    start_time: float = 0.0
+    waypoints: list[tuple[float, float]] = field(default_factory=list)
+    quadrature: bool = True
+    position_step: int = 1
+    index: int = 0
+
+    def profile(self) -> MotionProfile:
+        time = self.start_time * 1e9
+        if self.waypoints:
+            return MotionProfile.waypoints(
+                [(seconds * 1e9, position) for seconds, position in self.waypoints]
+            )
+        velocity, acceleration = self.velocity / 1e9, self.acceleration / 1e18
+        if self.distance is None:
+            if not acceleration:
+                return MotionProfile.constant_velocity(velocity, self.start, time)
+            ramp = abs(velocity / acceleration)
+            return MotionProfile(
+                [
+                    Segment(
+                        time, self.start, 0.0, math.copysign(acceleration, velocity)
+                    ),
+                    Segment(time + ramp, self.start + velocity * ramp / 2, velocity),
+                ]
+            )
+        return MotionProfile.trapezoid(
+            self.distance, velocity, acceleration, self.start, time
+        )
+
+    def __call__(self) -> Component:  # noqa: D102
+        return DeviceComponent(
+            name=self.name,
+            device=EncoderDevice(
+                self.profile(),
+                quadrature=self.quadrature,
+                position_step=self.position_step,
+                index=self.index,
+            ),
+        )
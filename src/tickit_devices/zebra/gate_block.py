@@ -0,0 +1,52 @@
+from typing import TypedDict
+
+import pydantic.v1.dataclasses
+from tickit.core.components.device_component import DeviceComponent
+
+from tickit_devices.zebra._common import BlockConfig, EdgeBlock, falling_edge
+
+
+class GateBlock(EdgeBlock):
+    """
+    A set/reset latch: the output is set by an edge of INP1 and reset by an edge of
+    INP2, reset taking precedence if both arrive together. The edges are rising, or
+    falling if the bit of POLARITY for the block is set.
+    """
+
+    class Inputs(TypedDict):
+        INP1: bool
+        INP2: bool
+
+    class Outputs(TypedDict):
+        OUT: bool
+
+    def __init__(self, name: str):
+        super().__init__(name=name, previous_outputs=self.Outputs(OUT=False))
+        self._falling: bool | None = None
+        self._set = False
+        self._reset = False
+        self._out = False
+
+    def params_changed(self) -> None:
+        if not self.params:
+            raise ValueError
+        self._falling = falling_edge(self.params, self.name)
+
+    def _get_next_outputs(self, inputs: Inputs) -> Outputs:
+        if self._falling is None:
+            self.params_changed()
+        set_, reset = bool(inputs.get("INP1")), bool(inputs.get("INP2"))
+        set_edge = set_ != self._set and set_ != self._falling
+        reset_edge = reset != self._reset and reset != self._falling
+        self._set, self._reset = set_, reset
+        if reset_edge:
+            self._out = False
+        elif set_edge:
+            self._out = True
+        return self.Outputs(OUT=self._out)
+
+
+@pydantic.v1.dataclasses.dataclass
+class GateBlockConfig(BlockConfig):
+    def __call__(self) -> DeviceComponent:
+        return DeviceComponent(name=self.name, device=GateBlock(name=self.name))
@@ -0,0 +1,296 @@
+import heapq
+import logging
+from collections import defaultdict, deque
+from collections.abc import Iterable, MutableMapping
+from typing import Any
+
+import pydantic.v1.dataclasses
+from pydantic.v1 import validator
+from tickit.core.components.component import ComponentConfig
+from tickit.core.components.device_component import DeviceComponent
+from tickit.core.device import Device, DeviceUpdate
+from tickit.core.management.event_router import InverseWiring
+from tickit.core.typedefs import ComponentID, ComponentPort, PortID, SimTime
+
+from tickit_devices.zebra._common import (
+    Block,
+    BlockConfig,
+    output_muxes,
+    parse_blocks,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+EXTERNAL = ComponentID("external")
+EXPOSE = ComponentID("expose")
+
+#: The delay of a signal across each block, in ns
+BLOCK_DELAY = 20
+
+
+class Netlist(Device):
+    """
+    The blocks of a Zebra evaluated as one device, rather than as a component each.
+
+    Blocks are levelized, and are updated when an input changes or at the time they
+    asked to be called back, in order of time and then of their dependencies, so the
+    changes of their outputs are routed to the inputs of later blocks in the same
+    step. When updated at a time, the netlist computes the steps up to the longest
+    path delay through the blocks ahead of it, so the change of an input reaches the
+    exposed outputs in one update, at its time plus the delay of each block on the
+    path. The netlist is then only updated again when an exposed output changes, or
+    a block asked to be called back after those steps, e.g. at the end of a pulse.
+
+    A block computed ahead is not updated again at an earlier time, so an input
+    changing before the blocks it drives were computed reaches them when they were,
+    rather than when it would. Changes to params and wiring take effect from the
+    next update.
+    """
+
+    def __init__(
+        self,
+        blocks: dict[ComponentID, Block],
+        wiring: InverseWiring,
+    ) -> None:
+        """A netlist of blocks.
+
+        Args:
+            blocks: The blocks by name.
+            wiring: The sources of the inputs of the blocks and of the exposed
+                outputs, which are the inputs of "expose".
+
+        Raises:
+            ValueError: If the wiring between the blocks forms a loop.
+        """
+        self.blocks = blocks
+        self.wiring = wiring
+        self._ports = [
+            *wiring[EXPOSE],
+            *(port for port in output_muxes if port not in wiring[EXPOSE]),
+        ]
+        self._params: MutableMapping[str, int] | None = None
+        self._inputs: dict[ComponentID, dict[PortID, Any]] = {
+            name: {} for name in blocks
+        }
+        self._outputs: dict[ComponentID, dict[PortID, Any]] = {
+            name: {} for name in blocks
+        }
+        self._external: dict[PortID, Any] = {}
+        self._exposed: dict[PortID, Any] = dict.fromkeys(self._ports, False)
+        #: Changes of the exposed outputs computed ahead, by time and then in order
+        self._events: list[tuple[SimTime, int, PortID, Any]] = []
+        self._event_count = 0
+        #: The time each block was last updated, which it is not updated before
+        self._times: dict[ComponentID, SimTime] = {}
+        #: Times at which blocks are due, with a queue of them by time and rank,
+        #: whose entries are stale if the block has since become due at another time
+        self._wakeups: dict[ComponentID, SimTime] = {}
+        self._queue: list[tuple[SimTime, int, ComponentID]] = []
+        self._woken: set[ComponentID] = set(blocks)
+        self._params_changed: set[ComponentID] = set()
+        self._rewired: set[ComponentPort] = set()
+        self._levelize()
+
+    @property
+    def params(self) -> MutableMapping[str, int] | None:
+        return self._params
+
+    @params.setter
+    def params(self, params: MutableMapping[str, int]) -> None:
+        self._params = params
+        for block in self.blocks.values():
+            block.params = params
+
+    def params_changed(self, blocks: Iterable[ComponentID] | None = None) -> None:
+        """Updates blocks whose params have changed, from the next update.
+
+        Args:
+            blocks: The names of the blocks, None for all of them.
+        """
+        self._params_changed.update(self.blocks if blocks is None else blocks)
+
+    def wake(self, blocks: Iterable[ComponentID]) -> None:
+        """Updates blocks from the next update, though their params are unchanged.
+
+        Args:
+            blocks: The names of the blocks.
+        """
+        self._woken.update(blocks)
+
+    def rewire(self, sink: ComponentPort, source: ComponentPort | None) -> None:
+        """Connects an input of a block, or an exposed output, to a new source.
+
+        Args:
+            sink: The input of a block or port of "expose".
+            source: The output of a block or input of the Zebra, None to disconnect
+                the input.
+
+        Raises:
+            ValueError: If the new wiring forms a loop.
+        """
+        sources = self.wiring[sink.component]
+        old_source = sources.pop(sink.port, None)
+        if source is not None:
+            sources[sink.port] = source
+        try:
+            _levelize(self.blocks, self.wiring)
+        except ValueError:
+            sources.pop(sink.port, None)
+            if old_source is not None:
+                sources[sink.port] = old_source
+            raise
+        self._rewired.add(sink)
+
+    def update(self, time: SimTime, inputs: dict[PortID, Any]) -> DeviceUpdate:
+        # Blocks due before time were not affected by the inputs, which change at it
+        self._run(SimTime(time - 1))
+
+        if self._rewired:
+            self._levelize()
+            self._rewire(time)
+        for name in self._params_changed:
+            self.blocks[name].params_changed()
+        for name in self._params_changed | self._woken:
+            self._due(name, time)
+        self._params_changed.clear()
+        self._woken.clear()
+        for port, value in inputs.items():
+            if port in self._external and self._external[port] == value:
+                continue
+            self._external[port] = value
+            for sink in self._sinks[EXTERNAL][port]:
+                self._drive(sink, value, time)
+        self._run(SimTime(time + self._delay))
+
+        events = self._events
+        while events and events[0][0] <= time:
+            _, _, port, value = heapq.heappop(events)
+            self._exposed[port] = value
+        call_at = min(
+            (queue[0][0] for queue in (events, self._queue) if queue), default=None
+        )
+        return DeviceUpdate(dict(self._exposed), call_at)
+
+    def _run(self, until: SimTime) -> None:
+        """Updates the blocks due up to a time, in order of time and rank."""
+        queue, wakeups, times = self._queue, self._wakeups, self._times
+        while queue and queue[0][0] <= until:
+            time, _, name = heapq.heappop(queue)
+            if wakeups.get(name) != time:
+                continue
+            del wakeups[name]
+            times[name] = time
+            update = self.blocks[name].update(time, self._inputs[name])
+            if update.call_at is not None:
+                self._due(name, update.call_at)
+            outputs = self._outputs[name]
+            for port, value in update.outputs.items():
+                if port in outputs and outputs[port] == value:
+                    continue
+                outputs[port] = value
+                for sink in self._sinks[name][port]:
+                    self._drive(sink, value, time)
+
+    def _due(self, name: ComponentID, time: SimTime) -> None:
+        """Updates a block at a time, or when it was last updated if that is later."""
+        time = max(time, self._times.get(name, time))
+        if self._wakeups.get(name) != time:
+            self._wakeups[name] = time
+            heapq.heappush(self._queue, (time, self._rank[name], name))
+
+    def _drive(self, sink: ComponentPort, value: Any, time: SimTime) -> None:
+        """Sets an input of a block, or an exposed output, at a time."""
+        if sink.component == EXPOSE:
+            self._event_count += 1
+            heapq.heappush(self._events, (time, self._event_count, sink.port, value))
+        else:
+            self._inputs[sink.component][sink.port] = value
+            self._due(sink.component, time)
+
+    def _rewire(self, time: SimTime) -> None:
+        """Drives the rewired inputs from their new sources."""
+        ports = {sink.port for sink in self._rewired if sink.component == EXPOSE}
+        # Changes of exposed outputs from their old sources no longer happen
+        self._events = [event for event in self._events if event[2] not in ports]
+        heapq.heapify(self._events)
+        for sink in self._rewired:
+            source = self.wiring[sink.component].get(sink.port)
+            self._drive(sink, self._value(source), time)
+        self._rewired.clear()
+
+    def _value(self, source: ComponentPort | None) -> Any:
+        if source is None:
+            return False
+        if source.component == EXTERNAL:
+            return self._external.get(source.port, False)
+        return self._outputs[source.component].get(source.port, False)
+
+    def _levelize(self) -> None:
+        self._order, self._sinks = _levelize(self.blocks, self.wiring)
+        self._rank = {name: rank for rank, name in enumerate(self._order)}
+        # The longest path through the blocks, each of which delays a signal
+        depths: dict[ComponentID, int] = {}
+        for name in self._order:
+            depths[name] = 1 + max(
+                (
+                    depths[source.component]
+                    for source in self.wiring[name].values()
+                    if source.component in depths
+                ),
+                default=0,
+            )
+        self._delay = BLOCK_DELAY * max(depths.values(), default=0)
+
+
+def _levelize(
+    blocks: dict[ComponentID, Block], wiring: InverseWiring
+) -> tuple[list[ComponentID], dict[ComponentID, dict[PortID, list[ComponentPort]]]]:
+    """
+    Orders the blocks so that each comes after the blocks driving its inputs, and
+    maps the outputs of blocks and inputs of the Zebra to the inputs they drive.
+    """
+    sinks: dict[ComponentID, dict[PortID, list[ComponentPort]]] = defaultdict(
+        lambda: defaultdict(list)
+    )
+    dependencies: dict[ComponentID, set[ComponentID]] = {name: set() for name in blocks}
+    for name, sources in wiring.items():
+        for port, source in sources.items():
+            sinks[source.component][source.port].append(ComponentPort(name, port))
+            if name in blocks and source.component in blocks:
+                dependencies[name].add(source.component)
+
+    order = []
+    ready = deque(name for name, deps in dependencies.items() if not deps)
+    while ready:
+        name = ready.popleft()
+        order.append(name)
+        for sink in {
+            sink.component for ports in sinks[name].values() for sink in ports
+        }:
+            if sink in dependencies and name in dependencies[sink]:
+                dependencies[sink].discard(name)
+                if not dependencies[sink]:
+                    ready.append(sink)
+    if len(order) < len(blocks):
+        raise ValueError(
+            f"Blocks {sorted(set(blocks) - set(order))} are wired in a loop"
+        )
+    return order, sinks
+
+
+@pydantic.v1.dataclasses.dataclass
+class NetlistConfig(ComponentConfig):
+    """The blocks of a Zebra evaluated as a single Netlist device."""
+
+    blocks: list[BlockConfig]
+    expose: dict[PortID, ComponentPort]
+
+    @validator("blocks", pre=True)
+    def parse_block_configs(cls, v: list) -> list:  # noqa: N805
+        return parse_blocks(v)
+
+    def __call__(self) -> DeviceComponent:
+        blocks = {config.name: config().device for config in self.blocks}
+        wiring = InverseWiring.from_component_configs(self.blocks)
+        wiring[EXPOSE].update(self.expose)
+        return DeviceComponent(name=self.name, device=Netlist(blocks, wiring))
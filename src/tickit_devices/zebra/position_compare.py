@@ -0,0 +1,323 @@
+import math
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import TypedDict
+
+import pydantic.v1.dataclasses
+from tickit.core.components.device_component import DeviceComponent
+from tickit.core.device import DeviceUpdate
+from tickit.core.typedefs import SimTime
+
+from tickit_devices.zebra._common import Block, BlockConfig, EdgeBlock
+from tickit_devices.zebra.capture import CaptureBuffer
+from tickit_devices.zebra.div_block import DivBlock
+
+#: Values of PC_ARM_SEL
+ARM_SOFT, ARM_EXTERNAL = 0, 1
+#: Values of PC_GATE_SEL and PC_PULSE_SEL
+SOURCE_POSITION, SOURCE_TIME, SOURCE_EXTERNAL = 0, 1, 2
+#: Value of PC_ENC comparing the average of the encoders
+ENC_AVERAGE = 4
+
+
+def read_register(params: Mapping[str, int], name: str, signed: bool = False) -> int:
+    """The value of a 32 bit register, which is split into {name}LO and {name}HI."""
+    value = params[f"{name}HI"] << 16 | params[f"{name}LO"]
+    if signed and value & 1 << 31:
+        value -= 1 << 32
+    return value
+
+
+@dataclass
+class _Gates:
+    """
+    The edges of number gates of width, every step from start, alternately opening
+    and closing, in order. Edges are computed from their index, so that the number
+    of gates does not determine the memory used.
+    """
+
+    start: int
+    width: int
+    step: int
+    number: int
+    #: The number of edges crossed
+    passed: int = 0
+
+    def edge(self, index: int) -> int:
+        gate, closing = divmod(index, 2)
+        return self.start + gate * self.step + closing * self.width
+
+    def advance(self, coordinate: float) -> None:
+        crossed = self._reached(coordinate) + self._reached(coordinate - self.width)
+        # The gates only move forwards, so moving back does not close a gate
+        self.passed = max(self.passed, crossed)
+
+    def _reached(self, coordinate: float) -> int:
+        """The number of gates which open at or before coordinate."""
+        if coordinate < self.start:
+            return 0
+        if not self.step:
+            return self.number
+        return min(math.floor((coordinate - self.start) / self.step) + 1, self.number)
+
+    @property
+    def open(self) -> bool:
+        return self.passed % 2 == 1
+
+    @property
+    def done(self) -> bool:
+        return self.passed == 2 * self.number
+
+    def next_edge(self) -> int | None:
+        return None if self.done else self.edge(self.passed)
+
+
+class PositionCompareBlock(EdgeBlock):
+    """
+    Position compare: once armed, opens PC_GATE_NGATE gates of PC_GATE_WID, every
+    PC_GATE_STEP from PC_GATE_START, as the encoder selected by PC_ENC moves in the
+    direction of PC_DIR, and disarms after the last. Whilst a gate is open, pulses
+    of PC_PULSE_WID are produced every PC_PULSE_STEP from PC_PULSE_START after the
+    gate opened, at most PC_PULSE_MAX (if non-zero) per gate.
+
+    The gate and pulse are each counted in encoder positions, or in ticks of the
+    50MHz clock divided by PC_TSPRE, or follow PC_GATE_INP or PC_PULSE_INP, as
+    selected by PC_GATE_SEL and PC_PULSE_SEL. Arming is by writing PC_ARM, or by
+    the edges of PC_ARM_INP, as selected by PC_ARM_SEL, and disarming by writing
+    PC_DISARM or the falling edge of PC_ARM_INP.
+
+    The edges of the gates are computed from the settings latched when the block is
+    armed, so that each change of the position is mapped onto the gates by a
+    division and only the resulting edges of the outputs are emitted. Edges crossed
+    by one change of the position give a single change of the outputs. PC_PULSE_DLY
+    is not simulated.
+
+    At each pulse, the time since arming in ticks and the values enabled by
+    PC_BIT_CAP are captured into `capture`, which is emptied when armed. The values
+    are those of the inputs ENC1-4 and the counts of the dividers, SYS1-2 are
+    captured as 0.
+    """
+
+    class Inputs(TypedDict):
+        ENC1: int
+        ENC2: int
+        ENC3: int
+        ENC4: int
+        ARM_INP: bool
+        GATE_INP: bool
+        PULSE_INP: bool
+
+    class Outputs(TypedDict):
+        ARM: bool
+        GATE: bool
+        PULSE: bool
+
+    def __init__(self, name: str):
+        super().__init__(
+            name=name,
+            previous_outputs=self.Outputs(ARM=False, GATE=False, PULSE=False),
+        )
+        self._time = SimTime(0)
+        self._arm_input = False
+        self._soft_arm = False
+        self._soft_disarm = False
+        self._armed = False
+        self._arm_time = SimTime(0)
+        self._gates: _Gates | None = None
+        self._gate_open = False
+        #: Position, or time, from which the pulses of the open gate are counted
+        self._pulse_origin = 0.0
+        self._wakeup: SimTime | None = None
+        self._gates_opened = 0
+        self._external_pulse = False
+        self._external_pulses = 0
+        #: The gate and pulse within it of the pulse last seen, and last captured
+        self._pulse_id = (0, 0)
+        self._captured: tuple[int, int] | None = None
+        self.capture = CaptureBuffer()
+        #: The dividers of the Zebra, whose counts may be captured
+        self.dividers: dict[str, Block] = {}
+
+    def params_changed(self) -> None:
+        if not self.params:
+            raise ValueError
+        # PC_ARM and PC_DISARM are actions rather than settings
+        if self.params["PC_ARM"]:
+            self.params["PC_ARM"] = 0
+            self._soft_arm = True
+        if self.params["PC_DISARM"]:
+            self.params["PC_DISARM"] = 0
+            self._soft_disarm = True
+
+    def read_param(self, register: str) -> int | None:
+        if register == "PC_NUM_CAPLO":
+            return self.capture.count & 0xFFFF
+        if register == "PC_NUM_CAPHI":
+            return self.capture.count >> 16 & 0xFFFF
+        return None
+
+    def update(self, time: SimTime, inputs: Inputs) -> DeviceUpdate[Outputs]:
+        self._time = time
+        update = super().update(time, inputs)
+        if self._wakeup is not None and (
+            update.call_at is None or self._wakeup < update.call_at
+        ):
+            return DeviceUpdate(update.outputs, self._wakeup)
+        return update
+
+    def _get_next_outputs(self, inputs: Inputs) -> Outputs:
+        if self.params is None:
+            raise ValueError
+        time = self._time
+        self._wakeup = None
+        if self.params["PC_ARM_SEL"] == ARM_EXTERNAL:
+            level = bool(inputs.get("ARM_INP"))
+            if level != self._arm_input:
+                self._arm_input = level
+                self._soft_arm, self._soft_disarm = level, not level
+        if self._soft_disarm:
+            self._soft_disarm = False
+            self._armed = False
+        if self._soft_arm:
+            self._soft_arm = False
+            self._arm(time)
+        if not self._armed:
+            return self.Outputs(ARM=False, GATE=False, PULSE=False)
+
+        position = self._position(inputs)
+        gate = self._gate(time, position, inputs)
+        if not self._armed:
+            return self.Outputs(ARM=False, GATE=False, PULSE=False)
+        pulse = gate and self._pulse(time, position, inputs)
+        if pulse and self._captured != self._pulse_id:
+            self._captured = self._pulse_id
+            self._capture(time, inputs)
+        return self.Outputs(ARM=True, GATE=gate, PULSE=pulse)
+
+    def _arm(self, time: SimTime) -> None:
+        """Latches the settings of the gates and computes their edges."""
+        params = self.params
+        assert params is not None
+        self._armed = True
+        self._arm_time = time
+        self._gate_open = False
+        self._tick = 20 * max(params["PC_TSPRE"], 1)
+        self._gate_source = params["PC_GATE_SEL"]
+        self._pulse_source = params["PC_PULSE_SEL"]
+        self._direction = -1 if params["PC_DIR"] else 1
+        self._encoder = params["PC_ENC"]
+        self._pulse_start = read_register(params, "PC_PULSE_START")
+        self._pulse_width = read_register(params, "PC_PULSE_WID")
+        self._pulse_step = read_register(params, "PC_PULSE_STEP")
+        self._pulse_max = read_register(params, "PC_PULSE_MAX")
+        self._captured = None
+
+        start = read_register(params, "PC_GATE_START", signed=True)
+        width = read_register(params, "PC_GATE_WID")
+        step = read_register(params, "PC_GATE_STEP")
+        number = read_register(params, "PC_GATE_NGATE")
+        if self._gate_source == SOURCE_TIME:
+            start, width, step = (
+                start * self._tick,
+                width * self._tick,
+                step * self._tick,
+            )
+        else:
+            start *= self._direction
+        # Gates which would overlap the next are closed when it opens
+        width = min(width, step) if number > 1 else width
+        self._gates = _Gates(start, width, step, number)
+        expected = (
+            number * self._pulse_max if self._pulse_source != SOURCE_EXTERNAL else 0
+        )
+        self.capture.reset(params["PC_BIT_CAP"], capacity=expected or None)
+
+    def _position(self, inputs: Inputs) -> float:
+        """The position of the selected encoder, in the direction of the gates."""
+        get = inputs.get
+        if self._encoder == ENC_AVERAGE:
+            position = sum(get(f"ENC{n}", 0) for n in range(1, 5)) / 4  # type: ignore
+        else:
+            position = get(f"ENC{self._encoder + 1}", 0)  # type: ignore
+        return self._direction * position
+
+    def _gate(self, time: SimTime, position: float, inputs: Inputs) -> bool:
+        gates = self._gates
+        assert gates is not None
+        if self._gate_source == SOURCE_EXTERNAL:
+            is_open = bool(inputs.get("GATE_INP"))
+        else:
+            elapsed = time - self._arm_time
+            gates.advance(position if self._gate_source == SOURCE_POSITION else elapsed)
+            is_open = gates.open
+            if gates.done:
+                self._armed = False
+            elif self._gate_source == SOURCE_TIME:
+                self._wake(self._arm_time + gates.next_edge())  # type: ignore
+
+        if is_open and not self._gate_open:
+            self._gates_opened += 1
+            if self._pulse_source == SOURCE_TIME:
+                self._pulse_origin = time
+            elif self._gate_source == SOURCE_POSITION:
+                # Count from the position of the gate, rather than where it was seen
+                self._pulse_origin = float(gates.edge(gates.passed - 1))
+            else:
+                self._pulse_origin = position
+        self._gate_open = is_open
+        return is_open
+
+    def _pulse(self, time: SimTime, position: float, inputs: Inputs) -> bool:
+        if self._pulse_source == SOURCE_EXTERNAL:
+            high = bool(inputs.get("PULSE_INP"))
+            self._external_pulses += high and not self._external_pulse
+            self._external_pulse = high
+            self._pulse_id = (self._gates_opened, self._external_pulses)
+            return high
+        scale = self._tick if self._pulse_source == SOURCE_TIME else 1
+        start, width = self._pulse_start * scale, self._pulse_width * scale
+        step = self._pulse_step * scale
+        elapsed = (time if self._pulse_source == SOURCE_TIME else position) - (
+            self._pulse_origin
+        )
+        if elapsed < start or not step:
+            pulse, offset = 0, elapsed - start
+        else:
+            quotient, offset = divmod(elapsed - start, step)
+            pulse = int(quotient)
+        if self._pulse_max and pulse >= self._pulse_max:
+            return False
+        high = 0 <= offset < width
+        self._pulse_id = (self._gates_opened, pulse)
+
+        if self._pulse_source == SOURCE_TIME:
+            if offset < 0:
+                self._wake(SimTime(int(time - offset)))
+            elif high:
+                self._wake(SimTime(int(time + width - offset)))
+            elif step and not (self._pulse_max and pulse + 1 >= self._pulse_max):
+                self._wake(SimTime(int(time + step - offset)))
+        return high
+
+    def _capture(self, time: SimTime, inputs: Inputs) -> None:
+        values = []
+        for field in self.capture.fields:
+            if field.startswith("ENC"):
+                values.append(int(inputs.get(field, 0)))  # type: ignore
+            elif isinstance(divider := self.dividers.get(field), DivBlock):
+                values.append(divider.count(time))
+            else:
+                values.append(0)
+        self.capture.append((time - self._arm_time) // self._tick, values)
+
+    def _wake(self, time: SimTime) -> None:
+        if self._wakeup is None or time < self._wakeup:
+            self._wakeup = time
+
+
+@pydantic.v1.dataclasses.dataclass
+class PositionCompareBlockConfig(BlockConfig):
+    def __call__(self) -> DeviceComponent:
+        return DeviceComponent(
+            name=self.name, device=PositionCompareBlock(name=self.name)
+        )
@@ -0,0 +1,92 @@
+import logging
+from collections import deque
+from typing import TypedDict
+
+import pydantic.v1.dataclasses
+from tickit.core.components.device_component import DeviceComponent
+from tickit.core.device import DeviceUpdate
+from tickit.core.typedefs import SimTime
+
+from tickit_devices.zebra._common import Block, BlockConfig, falling_edge
+
+LOGGER = logging.getLogger(__name__)
+
+#: Pulses which may be pending at once, further edges are dropped
+MAX_QUEUED = 1024
+
+
+class PulseBlock(Block):
+    """
+    Produces a pulse of {name}_WID after a delay of {name}_DLY from each edge of
+    INP, both counted in ticks of the 50MHz clock divided by {name}_PRE. The edge is
+    rising, or falling if the bit of POLARITY for the block is set.
+
+    The edges of a pulse are computed when the edge of the input arrives, so the
+    block is only updated at those times rather than every tick. Edges arriving
+    whilst earlier pulses are pending are queued, each giving a pulse, unless its
+    pulse would start before the previous one ends, as a pulse cannot be retriggered.
+    """
+
+    class Inputs(TypedDict):
+        INP: bool
+
+    class Outputs(TypedDict):
+        OUT: bool
+
+    def __init__(self, name: str):
+        super().__init__(name=name, previous_outputs=self.Outputs(OUT=False))
+        self._delay: int | None = None
+        self._width = 0
+        self._falling = False
+        self._input = False
+        #: Start and end times of the pending pulses, in order
+        self._pulses: deque[tuple[SimTime, SimTime]] = deque()
+
+    def params_changed(self) -> None:
+        if not self.params:
+            raise ValueError
+        tick = 20 * max(self.params[f"{self.name}_PRE"], 1)
+        self._delay = self.params[f"{self.name}_DLY"] * tick
+        self._width = self.params[f"{self.name}_WID"] * tick
+        self._falling = falling_edge(self.params, self.name)
+
+    def update(self, time: SimTime, inputs: Inputs) -> DeviceUpdate[Outputs]:
+        if self._delay is None:
+            self.params_changed()
+        level = bool(inputs.get("INP"))
+        if level != self._input:
+            self._input = level
+            if level != self._falling:
+                self._trigger(time)
+
+        pulses = self._pulses
+        while pulses and pulses[0][1] <= time:
+            pulses.popleft()
+        high = bool(pulses) and pulses[0][0] <= time
+        self.previous_outputs = self.Outputs(OUT=high)
+        call_at = None
+        if pulses:
+            call_at = pulses[0][1] if high else pulses[0][0]
+        return DeviceUpdate(self.previous_outputs, call_at)
+
+    def _trigger(self, time: SimTime) -> None:
+        if not self._width:
+            return
+        # The pulse starts after the delay, as well as the 20ns across the block
+        start = SimTime(time + 20 + self._delay)  # type: ignore
+        if self._pulses and start < self._pulses[-1][1]:
+            LOGGER.debug(f"{self.name} retriggered at {time}, ignoring")
+        elif len(self._pulses) >= MAX_QUEUED:
+            LOGGER.warning(f"{self.name} has {MAX_QUEUED} pulses queued, dropping")
+        else:
+            self._pulses.append((start, SimTime(start + self._width)))
+
+    def _get_next_outputs(self, inputs: Inputs) -> Outputs:
+        # The output follows the pending pulses, see update
+        return self.previous_outputs
+
+
+@pydantic.v1.dataclasses.dataclass
+class PulseBlockConfig(BlockConfig):
+    def __call__(self) -> DeviceComponent:
+        return DeviceComponent(name=self.name, device=PulseBlock(name=self.name))
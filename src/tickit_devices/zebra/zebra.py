@@ -1,22 +1,44 @@
 import asyncio
+import logging
+from collections.abc import AsyncIterator, Iterable, Mapping
 
 from tickit.adapters.specifications import RegexCommand
 from tickit.adapters.system import BaseSystemSimulationAdapter
+from tickit.adapters.tcp import CommandAdapter
 from tickit.core.components.device_component import DeviceComponent
-from tickit.core.management.event_router import InverseWiring, Wiring
-from tickit.core.typedefs import ComponentID
+from tickit.core.components.system_component import SystemComponent
+from tickit.core.management.event_router import EventRouter, InverseWiring, Wiring
+from tickit.core.typedefs import ComponentID, ComponentPort
 
-from tickit_devices.zebra._common import param_types, register_names
+from tickit_devices.zebra._common import (
+    DIVS,
+    Block,
+    RegisterFile,
+    bus_sources,
+    bus_values,
+    clock_periods,
+    mux_sink,
+    mux_types,
+    param_blocks,
+    register_names,
+)
+from tickit_devices.zebra._routing import move_edge, running_router
+from tickit_devices.zebra.capture import encode_frames
+from tickit_devices.zebra.netlist import Netlist
+from tickit_devices.zebra.position_compare import PositionCompareBlock
 
+LOGGER = logging.getLogger(__name__)
 
-class ZebraAdapter(BaseSystemSimulationAdapter):
+
+class ZebraAdapter(BaseSystemSimulationAdapter, CommandAdapter):
     _components: dict[ComponentID, DeviceComponent]
-    params: dict[str, int]
+    _wiring: InverseWiring
+    _blocks: dict[ComponentID, Block]
+    _netlist: DeviceComponent | None
+    params: RegisterFile
     """
     Network adapter for a Zebra system simulation, which operates a TCP server for
     reading and setting configuration of blocks and internal wiring mapping.
-    N.B. Reading and setting internal wiring is not currently supported,and all
-    "mux" related queries will return as though successful but not operate.
 
     See documentation for the Zebra:
     `https://github.com/dls-controls/zebra/blob/master/documentation/TDI-CTRL-TNO-042-Zebra-Manual.pdf`
@@ -26,10 +48,26 @@ class ZebraAdapter(BaseSystemSimulationAdapter):
     to Σ2**M where M is each input (1,2,3,4) for which the behaviour is desired.
     {AND|OR}{N}_INV: Inverts input(s) M
     {AND|OR}{N}_ENA: Enables input(s) M
+    - Mux registers, e.g. AND1_INP1 or OUT1_TTL, may be set to the index of a
+    system bus signal (see `system_bus`) to rewire the input while running. Only
+    the edge of the input is changed, the system is not rebuilt. Signals driven by
+    blocks which are not configured in components, or which would form a loop,
+    leave the input disconnected. The clocks CLOCK_1KHZ and CLOCK_1MHZ are
+    generated by the blocks able to, e.g. DIV{N}_INP, and are otherwise
+    disconnected.
+    - Points captured by position compare may be downloaded in bulk with
+    B{start}{count}, in 8 hexadecimal digits each, which replies with frames of
+    binary points (see `encode_frames`), rather than a register read per value.
+    - Several registers may be written at once with M followed by each register and
+    value as for W, e.g. M540000550001, which interrupts each block affected once,
+    rather than a write and interrupt per register.
     """
 
-    def __init__(self, params: dict[str, int]):
-        self.params = params
+    #: The system component the adapter serves, whose scheduler routes the wiring
+    system: SystemComponent | None = None
+
+    def __init__(self, params: Mapping[str, int]):
+        self.params = RegisterFile(params)
 
     def setup_adapter(
         self,
@@ -42,41 +80,206 @@ class ZebraAdapter(BaseSystemSimulationAdapter):
         """
         for block in components.values():
             block.device.params = self.params
+            block.device.params_changed()
+        self._netlist = next(
+            (c for c in components.values() if isinstance(c.device, Netlist)), None
+        )
+        if self._netlist is not None:
+            # The blocks and their wiring are internal to the netlist
+            self._blocks = self._netlist.device.blocks
+            wiring = self._netlist.device.wiring
+        else:
+            self._blocks = {name: c.device for name, c in components.items()}
+        if isinstance(wiring, Wiring):
+            wiring = InverseWiring.from_wiring(wiring)
         super().setup_adapter(components, wiring)
+        self._observe(self._blocks)
+        pc = self._blocks.get(ComponentID("PC"))
+        if isinstance(pc, PositionCompareBlock):
+            pc.dividers = {
+                div: self._blocks[div] for div in DIVS if div in self._blocks
+            }
 
     @RegexCommand(rb"W([0-9A-F]{2})([0-9A-F]{4})\n", interrupt=True)
-    async def set_reg(self, reg: str, value: str) -> bytes:
-        reg_int, value_int = int(reg, base=16), int(value, base=16)
-        reg_name = register_names[reg_int]
-
-        if reg_name in self.params:
-            self.params[reg_name] = value_int
-
-            for block_name in param_types[reg_name].blocks:
-                await asyncio.create_task(
-                    self._components[block_name].raise_interrupt()
-                )
-
-        else:
-            self._set_mux(reg_name, value_int)
-
+    async def set_reg(self, reg: bytes, value: bytes) -> bytes:
+        reg_int = int(reg, base=16)
+        await self._notify(*self._write(reg_int, int(value, base=16)))
         return b"W%02XOK" % reg_int
 
+    @RegexCommand(rb"M((?:[0-9A-F]{6})+)\n", interrupt=True)
+    async def set_regs(self, writes: bytes) -> bytes:
+        """
+        Writes several registers, each as 2 hexadecimal digits of the register then 4
+        of the value, notifying each block affected once, after the last write.
+        """
+        interrupted: set[str] = set()
+        changed: set[str] = set()
+        for i in range(0, len(writes), 6):
+            blocks, params = self._write(
+                int(writes[i : i + 2], base=16), int(writes[i + 2 : i + 6], base=16)
+            )
+            interrupted.update(blocks)
+            changed.update(params)
+        await self._notify(interrupted, changed)
+        return b"M%02XOK" % (len(writes) // 6)
+
     @RegexCommand(rb"R([0-9A-F]{2})\n")
-    async def get_reg(self, reg: str) -> bytes:
+    async def get_reg(self, reg: bytes) -> bytes:
         reg_int = int(reg, base=16)
         reg_name = register_names[reg_int]
-        try:
-            value_int = self.params[reg_name]
-        except KeyError:
+        block_names = param_blocks.get(reg_int)
+        if block_names is None:
             value_int = self._read_mux(reg_name)
+        else:
+            value_int = self.params.read(reg_int)
+            for block_name in block_names:
+                block = self._blocks.get(ComponentID(block_name))
+                value = None if block is None else block.read_param(reg_name)
+                value_int = value_int if value is None else value
         return b"R%02X%04XOK" % (reg_int, value_int)
 
-    def _read_mux(self, reg_name: str) -> int:  # type: ignore
-        # TODO: Support reading Muxes: map internal wiring into Mux values
-        return 0
+    @RegexCommand(rb"B([0-9A-F]{8})([0-9A-F]{8})\n")
+    async def read_capture(self, start: bytes, count: bytes) -> AsyncIterator[bytes]:
+        """Downloads points captured by position compare, see `encode_frames`."""
+        pc = self._blocks.get(ComponentID("PC"))
+        if not isinstance(pc, PositionCompareBlock):
+            return _frames([b"B%08X00000000\n" % int(start, base=16)])
+        return _frames(encode_frames(pc.capture, int(start, 16), int(count, 16)))
+
+    def _write(self, reg_int: int, value_int: int) -> tuple[list[str], list[str]]:
+        """Writes a register.
+
+        Returns:
+            tuple[list[str], list[str]]: The blocks to interrupt, and those of them
+                whose params changed.
+        """
+        self.params.write(reg_int, value_int)
+        block_names = param_blocks.get(reg_int)
+        if block_names is not None:
+            return block_names, block_names
+        return self._set_mux(register_names[reg_int], value_int), []
+
+    async def _notify(self, block_names: Iterable[str], changed: Iterable[str]) -> None:
+        """
+        Tells blocks their params changed and interrupts them, each once, raising the
+        interrupts together so that they are handled in one tick of the scheduler.
+        """
+        block_names, changed = set(block_names), set(changed)
+        if self._netlist is not None:
+            # Only the blocks of the netlist whose params or wiring changed update
+            netlist = self._netlist.device
+            netlist.params_changed([name for name in changed if name in self._blocks])
+            netlist.wake([name for name in block_names if name in self._blocks])
+            await self._netlist.raise_interrupt()
+            return
+        components = [
+            component
+            for name in sorted(block_names)
+            if (component := self._components.get(ComponentID(name))) is not None
+        ]
+        for component in components:
+            if component.name in changed:
+                component.device.params_changed()
+        await asyncio.gather(*(component.raise_interrupt() for component in components))
+
+    def _read_mux(self, reg_name: str) -> int:
+        sink = mux_sink(reg_name)
+        source = self._wiring.get(sink.component, {}).get(sink.port)
+        if source in bus_values:
+            return bus_values[source]
+        # The input is disconnected, or wired in the config to an output which is
+        # not on the system bus
+        return self.params.read(mux_types[reg_name].reg)
+
+    def _set_mux(self, reg_name: str, value: int) -> list[str]:
+        """Rewires the input selected by a Mux register.
+
+        Returns:
+            list[str]: The blocks whose inputs, or outputs which are observed, changed.
+        """
+        if value not in bus_sources:
+            LOGGER.warning(f"{reg_name} set to {value}, which is not on the bus")
+        sink = mux_sink(reg_name)
+        if sink.component != "expose" and sink.component not in self._blocks:
+            return [sink.component]
+
+        source = bus_sources.get(value)
+        block = self._blocks.get(sink.component)
+        period = clock_periods.get(source) if source is not None else None
+        if block is not None and block.set_train(sink.port, period) and period:
+            # The block generates the clock on the input itself
+            source = None
+        elif source is not None and source.component not in {
+            *self._blocks,
+            ComponentID("external"),
+        }:
+            # Blocks which are not configured are not simulated, so the input is left
+            # disconnected
+            LOGGER.warning(f"{reg_name} set to {source}, which is not simulated")
+            source = None
+        elif source is not None and self._is_upstream(sink.component, source):
+            # Wirings in a loop, e.g. AND1_OUT->AND1_INP1, are valid on the Zebra, but
+            # neither the scheduler nor the netlist can order the updates of a loop
+            LOGGER.warning(f"{reg_name} set to {source}, which would form a loop")
+            source = None
+        old_source = self._wiring.get(sink.component, {}).get(sink.port)
+        self._rewire(sink, source)
+        drivers = {s.component for s in (old_source, source) if s is not None}
+        return [sink.component, *self._observe(drivers)]
+
+    def _rewire(self, sink: ComponentPort, source: ComponentPort | None) -> None:
+        """
+        Moves the edge into an input to a new output, in the inverse wiring and, once
+        the system is running, in the router of its scheduler, then gives the input
+        the current value of the new output.
+        """
+        if self._netlist is not None:
+            self._netlist.device.rewire(sink, source)
+            return
+
+        old_source = self._wiring[sink.component].pop(sink.port, None)
+        if source is not None:
+            self._wiring[sink.component][sink.port] = source
+
+        router = running_router(self.system)
+        if router is not None:
+            move_edge(router, sink, old_source, source)
+
+        component = self._components.get(sink.component)
+        if component is not None:
+            driver = None if source is None else self._components.get(source.component)
+            outputs = {} if driver is None else driver.last_outputs
+            value = outputs.get(source.port, False) if source is not None else False
+            component.device_inputs[sink.port] = value
+
+    def _observe(self, block_names: Iterable[str]) -> list[str]:
+        """
+        Tells blocks which of their outputs are wired to inputs or exposed, returning
+        the blocks for which that changed.
+        """
+        changed = []
+        for name in block_names:
+            block = self._blocks.get(ComponentID(name))
+            if block is None:
+                continue
+            observed = {
+                source.port
+                for sources in self._wiring.values()
+                for source in sources.values()
+                if source.component == name
+            }
+            if observed != block.observed:
+                block.observed = observed
+                changed.append(name)
+        return changed
+
+    def _is_upstream(self, component: ComponentID, source: ComponentPort) -> bool:
+        """Whether the output is driven, directly or not, by the component."""
+        router = None if self._netlist is not None else running_router(self.system)
+        router = router or EventRouter(self._wiring)
+        return source.component in router.dependants(component)
+
 
-    def _set_mux(self, reg_name: str, value: int) -> int:  # type: ignore
-        # TODO: Support setting Muxes: map Mux value into internal wiring
-        # TODO: Support cyclic wirings involving Zebra: AND1_OUT->AND1_INP1 is valid
-        return 0
+async def _frames(frames: Iterable[bytes]) -> AsyncIterator[bytes]:
+    for frame in frames:
+        yield frame
@@ -1,10 +1,11 @@
 import itertools
 from unittest.mock import ANY, MagicMock, Mock
 
+import numpy as np
 import pytest
 from tickit.core.typedefs import SimTime
 
-from tickit_devices.eiger.eiger import EigerDevice
+from tickit_devices.eiger.eiger import CATCH_UP_BATCH_FRAMES, EigerDevice
 from tickit_devices.eiger.eiger_status import State
 from tickit_devices.eiger.stream.eiger_stream import EigerStream
 
@@ -139,6 +140,86 @@ async def test_cancelled_eiger_starts_and_ends_series(
     mock_stream.end_series.assert_called_once_with(1)
 
 
+@pytest.mark.asyncio
+async def test_cancel_completes_frame_being_exposed(
+    eiger: EigerDevice, mock_stream: Mock
+):
+    frame_period = int(0.12 * 1e9)
+    await eiger.initialize()
+    eiger.settings.trigger_mode = "ints"
+    eiger.settings.nimages = 5
+    await eiger.arm()
+    await eiger.trigger()
+    eiger.update(SimTime(0), {})
+    eiger.update(SimTime(frame_period), {})
+
+    await eiger.cancel()
+    update = eiger.update(SimTime(frame_period + 10), {})
+    assert update.call_at == SimTime(2 * frame_period)
+    assert_in_state(eiger, State.ACQUIRE)
+    mock_stream.end_series.assert_not_called()
+
+    update = eiger.update(update.call_at, {})
+    assert update.call_at is None
+    assert_in_state(eiger, State.READY)
+    assert eiger.finished_trigger.is_set()
+    assert mock_stream.insert_image.call_count == 2
+    mock_stream.end_series.assert_called_once_with(1)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("acquiring", [False, True])
+async def test_trigger_after_cancel_needs_arm(
+    eiger: EigerDevice, mock_stream: Mock, acquiring: bool
+):
+    await eiger.initialize()
+    eiger.settings.trigger_mode = "ints"
+    eiger.settings.ntrigger = 3
+    await eiger.arm()
+    if acquiring:
+        await eiger.trigger()
+        eiger.update(SimTime(0), {})
+    await eiger.cancel()
+    eiger.update(SimTime(int(0.12 * 1e9)), {})
+    assert_in_state(eiger, State.READY)
+
+    await eiger.trigger()
+    eiger.update(SimTime(int(0.24 * 1e9)), {})
+
+    assert_in_state(eiger, State.READY)
+    assert mock_stream.insert_image.call_count == int(acquiring)
+    mock_stream.end_series.assert_called_once_with(1)
+
+    await eiger.arm()
+    await eiger.trigger()
+    assert_in_state(eiger, State.ACQUIRE)
+
+
+@pytest.mark.asyncio
+async def test_settings_changed_mid_series_apply_to_next_series(
+    eiger: EigerDevice, mock_stream: Mock
+):
+    await eiger.initialize()
+    eiger.settings.trigger_mode = "ints"
+    eiger.settings.nimages = 2
+    await eiger.arm()
+    await eiger.trigger()
+    eiger.update(SimTime(0), {})
+
+    eiger.settings["nimages"] = 5
+    eiger.settings["count_time"] = 0.5
+    update = eiger.update(SimTime(int(0.12 * 1e9)), {})
+    assert update.call_at == SimTime(int(0.24 * 1e9))
+    eiger.update(update.call_at, {})
+
+    assert mock_stream.insert_image.call_count == 2
+    assert_in_state(eiger, State.IDLE)
+
+    await eiger.arm()
+    assert eiger.series_settings.nimages == 5
+    mock_stream.begin_series.assert_called_with(eiger.series_settings, 2, "basic")
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
     "num_frames,num_series", list(itertools.product([0, 1, 2, 10], [1, 2, 3]))
@@ -156,12 +237,15 @@ async def test_acquire_frames_in_ints_mode(
         await eiger.arm()
         await eiger.trigger()
 
-        # Extra update cleans up state
+        # Each frame is due a whole number of frame periods after the trigger
+        time = SimTime(0)
         for i in range(num_frames):
-            update = eiger.update(SimTime(i), {})
-            assert update.call_at == SimTime(i + int(0.12 * 1e9))
+            update = eiger.update(time, {})
+            assert update.call_at == SimTime((i + 1) * int(0.12 * 1e9))
+            time = update.call_at
 
-        update = eiger.update(SimTime(0.0), {})
+        # Extra update at the end of the last exposure cleans up state
+        update = eiger.update(time, {})
         assert update.call_at is None
 
         mock_stream.begin_series.assert_called_with(eiger.settings, series, "basic")
@@ -195,12 +279,15 @@ async def test_acquire_frames_in_exts_mode(
         update = eiger.update(SimTime(0.0), {"trigger": True})
         assert update.call_at == 0.0
 
-        # Extra update cleans up state
+        # Each frame is due a whole number of frame periods after the trigger
+        time = SimTime(0)
         for i in range(num_frames):
-            update = eiger.update(SimTime(i), {})
-            assert update.call_at == SimTime(i + int(0.12 * 1e9))
+            update = eiger.update(time, {})
+            assert update.call_at == SimTime((i + 1) * int(0.12 * 1e9))
+            time = update.call_at
 
-        update = eiger.update(SimTime(0.0), {})
+        # Extra update at the end of the last exposure cleans up state
+        update = eiger.update(time, {})
         assert update.call_at is None
 
         mock_stream.begin_series.assert_called_with(eiger.settings, series, "basic")
@@ -239,5 +326,273 @@ async def test_abort_mid_acquisition(
         assert_in_state(eiger, State.IDLE)
 
 
+@pytest.mark.asyncio
+async def test_acquire_frames_in_exte_mode(eiger: EigerDevice, mock_stream: Mock):
+    frame_period = int(0.12 * 1e9)
+    await eiger.initialize()
+    eiger.settings.trigger_mode = "exte"
+    eiger.settings.nimages = 3
+    eiger.settings.ntrigger = 2
+    await eiger.arm()
+
+    # Gate opens, first frame completes one frame period later
+    update = eiger.update(SimTime(0), {"trigger": True})
+    assert update.call_at == SimTime(frame_period)
+    assert_in_state(eiger, State.ACQUIRE)
+
+    update = eiger.update(SimTime(frame_period), {"trigger": True})
+    assert update.call_at == SimTime(2 * frame_period)
+    assert mock_stream.insert_image.call_count == 1
+
+    # Gate closes part way through the second frame, which is still taken
+    update = eiger.update(SimTime(2 * frame_period + 10), {"trigger": False})
+    assert update.call_at is None
+    assert mock_stream.insert_image.call_count == 2
+    assert_in_state(eiger, State.READY)
+
+    # Second gate is the final trigger
+    eiger.update(SimTime(10 * frame_period), {"trigger": True})
+    update = eiger.update(SimTime(11 * frame_period), {"trigger": False})
+    assert update.call_at is None
+    assert mock_stream.insert_image.call_count == 3
+    mock_stream.end_series.assert_called_once_with(1)
+    assert_in_state(eiger, State.IDLE)
+
+
+@pytest.mark.asyncio
+async def test_acquire_frames_in_extg_mode(eiger: EigerDevice, mock_stream: Mock):
+    frame_period = int(0.12 * 1e9)
+    await eiger.initialize()
+    eiger.settings.trigger_mode = "extg"
+    eiger.settings.nimages = 3
+    eiger.settings.ntrigger = 1
+    await eiger.arm()
+
+    update = eiger.update(SimTime(0), {"trigger": True})
+    assert update.call_at == SimTime(frame_period)
+
+    # Gate closes with 200ms of exposure, exposure pauses until the next gate
+    update = eiger.update(SimTime(200_000_000), {"trigger": False})
+    assert update.call_at is None
+    assert mock_stream.insert_image.call_count == 1
+    assert_in_state(eiger, State.ACQUIRE)
+
+    # Gate reopens, the second frame needs another 40ms of exposure
+    update = eiger.update(SimTime(1_000_000_000), {"trigger": True})
+    assert update.call_at == SimTime(1_040_000_000)
+
+    update = eiger.update(SimTime(1_040_000_000), {"trigger": True})
+    assert update.call_at == SimTime(1_160_000_000)
+    assert mock_stream.insert_image.call_count == 2
+
+    update = eiger.update(SimTime(1_160_000_000), {"trigger": True})
+    assert update.call_at is None
+    assert mock_stream.insert_image.call_count == 3
+    mock_stream.end_series.assert_called_once_with(1)
+    assert_in_state(eiger, State.IDLE)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("trigger_mode", ["exte", "extg"])
+async def test_gated_frames_with_zero_frame_time(
+    eiger: EigerDevice, mock_stream: Mock, trigger_mode: str
+):
+    await eiger.initialize()
+    eiger.settings.trigger_mode = trigger_mode
+    eiger.settings.nimages = 3
+    eiger.settings.frame_time = 0.0
+    await eiger.arm()
+
+    update = eiger.update(SimTime(0), {"trigger": True})
+    assert update.call_at == SimTime(1)
+
+    update = eiger.update(SimTime(10), {"trigger": True})
+    assert update.call_at is None
+    assert mock_stream.insert_image.call_count == 3
+    assert_in_state(eiger, State.IDLE)
+
+
+@pytest.mark.asyncio
+async def test_trigger_in_extg_mode_is_ignored(eiger: EigerDevice):
+    await eiger.initialize()
+    eiger.settings.trigger_mode = "extg"
+    await eiger.arm()
+    await eiger.trigger()
+
+    assert_in_state(eiger, State.READY)
+
+
+@pytest.mark.asyncio
+async def test_batched_triggers_in_ints_mode(eiger: EigerDevice, mock_stream: Mock):
+    frame_period = int(0.12 * 1e9)
+    await eiger.initialize()
+    eiger.settings.trigger_mode = "ints"
+    eiger.settings.nimages = 2
+    eiger.settings.ntrigger = 5
+    await eiger.arm()
+
+    await eiger.trigger(count=10)
+    assert eiger.status.triggers_queued == 4
+    assert not eiger.finished_trigger.is_set()
+
+    time = SimTime(0)
+    update = eiger.update(time, {})
+    while update.call_at is not None:
+        assert update.call_at in (time, time + frame_period)
+        time = update.call_at
+        update = eiger.update(time, {})
+
+    assert time == SimTime(10 * frame_period)
+    assert eiger.status.triggers_completed == 5
+    assert eiger.status.triggers_queued == 0
+    assert eiger.finished_trigger.is_set()
+    assert mock_stream.insert_image.call_count == 10
+    mock_stream.end_series.assert_called_once_with(1)
+    assert_in_state(eiger, State.IDLE)
+
+
+@pytest.mark.asyncio
+async def test_count_times_in_inte_mode(eiger: EigerDevice, mock_stream: Mock):
+    await eiger.initialize()
+    eiger.settings.trigger_mode = "inte"
+    eiger.settings.nimages = 1
+    eiger.settings.ntrigger = 2
+    await eiger.arm()
+
+    await eiger.trigger(count_times=[0.5, 1.0])
+
+    update = eiger.update(SimTime(0), {})
+    assert update.call_at == SimTime(int((0.5 + 0.01) * 1e9))
+    update = eiger.update(update.call_at, {})
+    assert update.call_at == SimTime(int((0.5 + 0.01) * 1e9))
+    update = eiger.update(update.call_at, {})
+    assert update.call_at == SimTime(int((0.5 + 0.01) * 1e9) + int(1.01 * 1e9))
+    update = eiger.update(update.call_at, {})
+    assert update.call_at is None
+
+    assert mock_stream.insert_image.call_count == 2
+    assert eiger.status.triggers_completed == 2
+    assert_in_state(eiger, State.IDLE)
+
+
+@pytest.mark.asyncio
+async def test_abort_clears_queued_triggers(eiger: EigerDevice):
+    await eiger.initialize()
+    eiger.settings.trigger_mode = "ints"
+    eiger.settings.ntrigger = 5
+    await eiger.arm()
+    await eiger.trigger(count=5)
+
+    await eiger.abort()
+
+    assert eiger.status.triggers_queued == 0
+    assert eiger.finished_trigger.is_set()
+
+
+@pytest.mark.asyncio
+async def test_acquire_summed_32_bit_frames(eiger: EigerDevice, mock_stream: Mock):
+    await eiger.initialize()
+    eiger.settings.trigger_mode = "ints"
+    eiger.settings.x_pixels_in_detector = 8
+    eiger.settings.y_pixels_in_detector = 6
+    eiger.settings["nexpi"] = 4
+    await eiger.arm()
+    await eiger.trigger()
+
+    eiger.update(SimTime(0), {})
+
+    image = mock_stream.insert_image.call_args.args[0]
+    assert eiger.settings.bit_depth_image == 32
+    assert (image.dtype, image.encoding, image.shape) == ("uint32", "<", (8, 6))
+    pixels = np.frombuffer(image.data, dtype="<u4")
+    assert pixels.size == 8 * 6
+    assert pixels.max() < 4 * 16
+
+
+def test_set_stream_config_passes_appendices_to_streams(
+    eiger: EigerDevice, mock_stream: Mock
+):
+    eiger.set_stream_config("image_appendix", "metadata")
+    eiger.set_stream_config("header_appendix", "header")
+
+    assert eiger.stream_config.image_appendix == "metadata"
+    mock_stream.set_image_appendix.assert_called_with("metadata")
+    mock_stream.set_header_appendix.assert_called_with("header")
+
+
+@pytest.mark.asyncio
+async def test_speed_up_shortens_frame_period_but_not_timestamps(mock_stream: Mock):
+    eiger = EigerDevice(stream=mock_stream, speed_up=100.0)
+    await eiger.initialize()
+    eiger.settings.trigger_mode = "ints"
+    eiger.settings.nimages = 3
+    await eiger.arm()
+    await eiger.trigger()
+
+    time = SimTime(1000)
+    update = eiger.update(time, {})
+    while update.call_at is not None:
+        assert update.call_at - time in (0, int(0.12 * 1e9 / 100))
+        time = update.call_at
+        update = eiger.update(time, {})
+
+    images = [call.args[0] for call in mock_stream.insert_image.call_args_list]
+    assert [image.start_time for image in images] == [0, 120_000_000, 240_000_000]
+    assert images[0].stop_time == int(0.1 * 1e9)
+    assert eiger.finished_trigger.is_set()
+    assert_in_state(eiger, State.IDLE)
+
+
+def test_speed_up_must_be_positive():
+    with pytest.raises(ValueError):
+        EigerDevice(speed_up=0)
+
+
 def assert_in_state(eiger: EigerDevice, state: State) -> None:
     assert state is eiger.get_state()
+
+
+@pytest.mark.asyncio
+async def test_frames_are_paced_from_the_trigger_start(eiger: EigerDevice):
+    await eiger.initialize()
+    eiger.settings.trigger_mode = "ints"
+    eiger.settings.nimages = 100_000
+    eiger.settings["frame_time"] = 1 / 3
+    await eiger.arm()
+    await eiger.trigger()
+
+    # Updates which are always late do not delay the frames that follow
+    time = SimTime(0)
+    for _ in range(1000):
+        update = eiger.update(time, {})
+        time = SimTime(update.call_at + 7)
+
+    assert eiger.metrics.frames_generated == 1000
+    assert update.call_at == SimTime(1000 * 333_333_333)
+
+
+@pytest.mark.asyncio
+async def test_late_update_catches_up_in_batches(eiger: EigerDevice, mock_stream: Mock):
+    await eiger.initialize()
+    eiger.settings.trigger_mode = "ints"
+    eiger.settings.nimages = 250
+    await eiger.arm()
+    await eiger.trigger()
+    frame_period = int(0.12 * 1e9)
+    eiger.update(SimTime(0), {})
+
+    late = SimTime(1000 * frame_period)
+    update = eiger.update(late, {})
+    assert update.call_at == late
+    assert mock_stream.insert_image.call_count == 1 + CATCH_UP_BATCH_FRAMES
+    assert eiger.metrics.frame_lag.count == 1
+    assert eiger.metrics.frame_lag.sum_ns == late - frame_period
+
+    eiger.update(late, {})
+    update = eiger.update(late, {})
+    assert mock_stream.insert_image.call_count == 250
+    assert update.call_at == SimTime(250 * frame_period)
+    image_times = [
+        call.args[0].start_time for call in mock_stream.insert_image.call_args_list
+    ]
+    assert image_times == [i * frame_period for i in range(250)]
@@ -1,6 +1,10 @@
+import asyncio
+
 import pytest
 from pytest_mock import MockerFixture
+from tickit.core.typedefs import SimTime
 
+from tickit_devices.eiger.data.schema import AcquisitionSeriesFooter
 from tickit_devices.eiger.eiger import EigerDevice, get_changed_parameters
 from tickit_devices.eiger.eiger_adapters import EigerRESTAdapter, EigerZMQAdapter
 
@@ -23,6 +27,46 @@ def test_after_update(mocker: MockerFixture) -> None:
     add_mock.assert_not_called()
 
 
+@pytest.mark.asyncio
+async def test_abort_drops_queued_messages():
+    device = EigerDevice()
+    zmq_adapter = EigerZMQAdapter(device.streams["legacy"])
+    await device.initialize()
+    device.settings.trigger_mode = "ints"
+    device.settings.nimages = 10
+    await device.arm()
+    await device.trigger()
+    update = device.update(SimTime(0), {})
+    zmq_adapter.after_update()
+    for _ in range(3):
+        update = device.update(update.call_at, {})
+        zmq_adapter.after_update()
+    assert zmq_adapter.buffer_depth() == 4
+
+    await device.abort()
+    zmq_adapter.after_update()
+
+    assert zmq_adapter.buffer_depth() == 1
+    end_of_series = await zmq_adapter.next_message()
+    assert end_of_series == [AcquisitionSeriesFooter(series=1)]
+
+
+@pytest.mark.asyncio
+async def test_sender_waiting_on_dropped_queue_gets_new_messages(mocker):
+    stream = mocker.MagicMock()
+    stream.generation = 0
+    stream.consume_data.return_value = []
+    zmq_adapter = EigerZMQAdapter(stream)
+    waiting = asyncio.create_task(zmq_adapter.next_message())
+    await asyncio.sleep(0)
+
+    stream.generation = 1
+    stream.consume_data.return_value = [b"end"]
+    zmq_adapter.after_update()
+
+    assert await asyncio.wait_for(waiting, timeout=1) == [b"end"]
+
+
 @pytest.mark.asyncio
 async def test_rest_adapter_404(mocker: MockerFixture):
     eiger_adapter = EigerRESTAdapter(EigerDevice())
@@ -57,6 +101,35 @@ async def test_rest_adapter_404(mocker: MockerFixture):
     assert (await eiger_adapter.get_builder_status(request)).status == 404
 
 
+@pytest.mark.asyncio
+async def test_rest_adapter_400(mocker: MockerFixture):
+    device = EigerDevice()
+    eiger_adapter = EigerRESTAdapter(device)
+
+    request = mocker.MagicMock()
+    request.json = mocker.AsyncMock(return_value={"value": "bad"})
+
+    request.match_info = {"parameter_name": "trigger_mode"}
+    response = await eiger_adapter.put_config(request)
+    assert response.status == 400
+    assert response.text.startswith("error during request: value error: ")
+    assert device.settings.trigger_mode == "exts"
+
+    request.json = mocker.AsyncMock(return_value={"value": 0})
+    request.match_info = {"parameter_name": "frame_time"}
+    assert (await eiger_adapter.put_config(request)).status == 400
+    assert device.settings.frame_time == 0.12
+    request.json = mocker.AsyncMock(return_value={"value": "bad"})
+
+    request.match_info = {"parameter_name": "mode", "threshold": "1"}
+    assert (await eiger_adapter.put_threshold_config(request)).status == 400
+
+    request.match_info = {"param": "mode"}
+    assert (await eiger_adapter.put_stream_config(request)).status == 400
+    assert (await eiger_adapter.put_monitor_config(request)).status == 400
+    assert (await eiger_adapter.put_filewriter_config(request)).status == 400
+
+
 @pytest.mark.asyncio
 async def test_rest_adapter_command_404(mocker: MockerFixture):
     eiger_adapter = EigerRESTAdapter(EigerDevice())
@@ -84,6 +157,7 @@ async def test_detector_put_responses(mocker: MockerFixture):
         "flatfield",
         "incident_energy",
         "photon_energy",
+        "nexpi",
         "pixel_mask",
         "threshold/1/flatfield",
         "roi_mode",
@@ -112,6 +186,7 @@ async def test_detector_put_responses(mocker: MockerFixture):
     request.json = mocker.AsyncMock()
 
     request.match_info = {"parameter_name": "count_time", "value": 1.0}
+    request.json = mocker.AsyncMock(return_value={"value": 1.0})
     response = await eiger_adapter.put_config(request)
     assert response.body == (
         b'["bit_depth_image", "bit_depth_readout", "count_time",'
@@ -125,7 +200,90 @@ async def test_detector_put_responses(mocker: MockerFixture):
 
     # test threshold responses work
 
-    request.match_info = {"parameter_name": "mode", "threshold": "1", "value": 1}
-    request.json = mocker.AsyncMock(return_value={"value": 1})
+    request.match_info = {"parameter_name": "mode", "threshold": "1"}
+    request.json = mocker.AsyncMock(return_value={"value": "enabled"})
     response = await eiger_adapter.put_threshold_config(request)
     assert response.body == b'["threshold/1/mode", "threshold/difference/mode"]'
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "trigger_mode,value,expected_args",
+    [
+        ("ints", 100, (100, None)),
+        ("inte", 0.5, (1, [0.5])),
+        ("inte", [0.5, 1.0], (1, [0.5, 1.0])),
+    ],
+)
+async def test_trigger_with_value(
+    mocker: MockerFixture, trigger_mode: str, value, expected_args: tuple
+):
+    device = EigerDevice()
+    device.settings.trigger_mode = trigger_mode
+    device.series_settings = device.settings.snapshot()
+    trigger_mock = mocker.patch.object(device, "trigger")
+    device.finished_trigger.set()
+    eiger_adapter = EigerRESTAdapter(device)
+    eiger_adapter.interrupt = mocker.AsyncMock()
+
+    request = mocker.MagicMock()
+    request.text = mocker.AsyncMock(return_value="{}")
+    request.json = mocker.AsyncMock(return_value={"value": value})
+
+    assert (await eiger_adapter.trigger_eiger(request)).status == 200
+    trigger_mock.assert_called_once_with(*expected_args)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "trigger_mode,value",
+    [
+        ("ints", 0),
+        ("ints", -1),
+        ("ints", True),
+        ("ints", 1.5),
+        ("inte", True),
+        ("inte", 0),
+        ("inte", "0.5"),
+        ("inte", [0.5, "1.0"]),
+        ("inte", [0.5, None]),
+        ("inte", [0.5, -1.0]),
+        ("inte", []),
+    ],
+)
+async def test_trigger_rejects_invalid_value(
+    mocker: MockerFixture, trigger_mode: str, value
+):
+    device = EigerDevice()
+    device.settings.trigger_mode = trigger_mode
+    device.series_settings = device.settings.snapshot()
+    trigger_mock = mocker.patch.object(device, "trigger")
+    eiger_adapter = EigerRESTAdapter(device)
+
+    request = mocker.MagicMock()
+    request.text = mocker.AsyncMock(return_value="{}")
+    request.json = mocker.AsyncMock(return_value={"value": value})
+
+    response = await eiger_adapter.trigger_eiger(request)
+    assert response.status == 400
+    assert response.text.startswith("error during request: value error: ")
+    trigger_mock.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_trigger_value_read_for_armed_trigger_mode(mocker: MockerFixture):
+    device = EigerDevice()
+    device.settings.trigger_mode = "inte"
+    device.series_settings = device.settings.snapshot()
+    device.settings.trigger_mode = "ints"
+    trigger_mock = mocker.patch.object(device, "trigger")
+    device.finished_trigger.set()
+    eiger_adapter = EigerRESTAdapter(device)
+    eiger_adapter.interrupt = mocker.AsyncMock()
+
+    request = mocker.MagicMock()
+    request.text = mocker.AsyncMock(return_value="{}")
+    request.json = mocker.AsyncMock(return_value={"value": 0.5})
+
+    assert (await eiger_adapter.trigger_eiger(request)).status == 200
+    trigger_mock.assert_called_once_with(1, [0.5])
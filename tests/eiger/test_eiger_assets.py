@@ -0,0 +1,96 @@
+import gc
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from tickit.core.typedefs import SimTime
+
+from tickit_devices.eiger.data.assets import ASSETS, AssetRegistry, sizeof
+from tickit_devices.eiger.data.dummy_image import dummy_image_blob
+from tickit_devices.eiger.eiger import EigerDevice
+from tickit_devices.eiger.eiger_settings import EigerSettings
+from tickit_devices.eiger.stream.eiger_stream import EigerStream
+from tickit_devices.eiger.stream.eiger_stream_2 import EigerStream2
+
+
+class Holder:
+    pass
+
+
+def test_asset_created_once_and_reference_counted() -> None:
+    registry = AssetRegistry()
+    first, second = Holder(), Holder()
+    calls = []
+
+    def factory() -> bytes:
+        calls.append(1)
+        return b"asset"
+
+    assert registry.acquire(first, "asset", factory) == b"asset"
+    registry.acquire(first, "asset", factory)
+    registry.acquire(second, "asset", factory)
+
+    assert len(calls) == 1
+    assert registry.usage(first)["asset"].holders == 2
+
+    registry.release(first)
+    assert registry.usage(second)["asset"].holders == 1
+    del second
+    gc.collect()
+
+    registry.acquire(first, "asset", factory)
+    assert len(calls) == 2
+
+
+def test_sizeof_counts_contents() -> None:
+    assert sizeof(np.zeros(100, dtype="uint32")) == 400
+    assert sizeof({"a": b"x" * 1000}) > 1000
+
+
+def test_streams_share_templates_and_zero_buffers() -> None:
+    first, second = EigerStream2(), EigerStream2()
+    assert first._start is second._start
+    assert first._image is not second._image
+
+    settings = EigerSettings()
+    first.begin_series(settings, 1, "all")
+    second.begin_series(settings, 1, "basic")
+    first.begin_series(settings, 1, "all")
+    first_start, repeated_start = first.consume_data()
+    assert first_start == repeated_start
+
+    legacy = [EigerStream(), EigerStream()]
+    buffers = []
+    for stream in legacy:
+        stream.begin_series(settings, 1, "all")
+        buffers.append([m for m in stream.consume_data() if isinstance(m, bytes)])
+    assert all(a is b for a, b in zip(*buffers, strict=True))
+
+
+def test_device_memory_report() -> None:
+    eiger = EigerDevice()
+    EigerDevice()
+
+    report = eiger.memory_report()
+
+    assert report["frame_sample"].nbytes > 0
+    assert report["frame_sample"].holders >= 2
+    assert report["stream2_templates"].holders >= 2
+    assert 'eiger_asset_bytes{asset="frame_sample"}' in eiger.metrics.render()
+
+
+@pytest.mark.asyncio
+async def test_device_frames_served_from_registry() -> None:
+    stream = MagicMock(EigerStream2)
+    eiger = EigerDevice(stream=stream)
+    eiger.settings.trigger_mode = "ints"
+    await eiger.initialize()
+    await eiger.arm()
+    await eiger.trigger()
+
+    eiger.update(SimTime(0), {})
+    eiger.update(SimTime(int(0.12 * 1e9)), {})
+
+    (image, _), _ = stream.insert_image.call_args
+    assert image.data is ASSETS.acquire(eiger, "frame_sample", bytes)
+    assert image.data is not dummy_image_blob()
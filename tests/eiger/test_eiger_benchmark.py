@@ -0,0 +1,67 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from tickit_devices.eiger.benchmark import (
+    BenchmarkCase,
+    _peak_rss_mb,
+    benchmark_cases,
+    main,
+    run_case,
+)
+
+
+def test_benchmark_cases_cover_all_combinations() -> None:
+    cases = benchmark_cases(10, ["legacy", "cbor"], ["none", "all"], [None], ["dummy"])
+
+    assert len(cases) == 4
+    assert {case.stream_format for case in cases} == {"legacy", "cbor"}
+    assert all(case.frames == 10 for case in cases)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("stream_format", ["legacy", "cbor"])
+@pytest.mark.parametrize("image_source", ["dummy", "replay"])
+async def test_run_case_receives_every_message(
+    stream_format: str, image_source: str
+) -> None:
+    case = BenchmarkCase(stream_format, "basic", "eiger2_x_1m", image_source, 3)
+
+    result = await run_case(case)
+
+    # One message per frame, the first also carries the series headers, then the end
+    assert result.messages == 4
+    assert result.bytes_received > 3 * 1028 * 1062 * 2
+    assert result.frames_per_second > 0
+    assert set(result.latency_ms) == {"p50", "p90", "p99", "p100"}
+
+
+def test_main_writes_results(tmp_path: Path) -> None:
+    output = tmp_path / "results.json"
+
+    main(
+        [
+            "--frames=2",
+            "--format=cbor",
+            "--header-detail=none",
+            "--detector=default",
+            "--image-source=dummy",
+            f"--output={output}",
+        ]
+    )
+
+    results = json.loads(output.read_text())
+    assert len(results["results"]) == 1
+    assert results["results"][0]["detector"] is None
+    assert results["results"][0]["messages"] == 3
+
+
+def test_peak_rss_not_measured_without_resource(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # As on Windows, where the resource module does not exist
+    monkeypatch.setitem(sys.modules, "resource", None)
+
+    assert _peak_rss_mb() is None
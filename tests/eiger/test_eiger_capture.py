@@ -0,0 +1,149 @@
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+import zmq
+from tickit.core.typedefs import SimTime
+
+from tickit_devices.eiger.data.capture import (
+    CaptureReader,
+    CaptureWriter,
+    record_stream,
+)
+from tickit_devices.eiger.data.dummy_image import Image
+from tickit_devices.eiger.eiger import EigerDevice
+from tickit_devices.eiger.eiger_adapters import EigerZMQIo
+from tickit_devices.eiger.eiger_settings import EigerSettings
+from tickit_devices.eiger.eiger_status import State
+from tickit_devices.eiger.stream.eiger_stream import EigerStream
+from tickit_devices.eiger.stream.eiger_stream_2 import EigerStream2
+
+SHAPE = (4, 3)
+
+
+def make_images(count: int) -> list[Image]:
+    return [
+        Image(i, "", "uint16", bytes([i]) * (2 * SHAPE[0] * SHAPE[1]), "<", SHAPE)
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def capture_file(tmp_path: Path) -> Path:
+    path = tmp_path / "capture.bin"
+    with CaptureWriter(path) as writer:
+        for image in make_images(3):
+            writer.write_image(image)
+    return path
+
+
+def test_replay_serves_memory_mapped_frames(capture_file: Path) -> None:
+    reader = CaptureReader(capture_file)
+
+    assert len(reader) == 3
+    for index, expected in enumerate(make_images(3)):
+        image = reader.image(index)
+        assert image is not None
+        assert isinstance(image.data, memoryview)
+        assert image.data == expected.data
+        assert (image.dtype, image.encoding, image.shape) == ("uint16", "<", SHAPE)
+
+
+def test_replay_loops(capture_file: Path) -> None:
+    reader = CaptureReader(capture_file)
+
+    image = reader.image(4)
+    assert image is not None
+    assert image.index == 4
+    assert image.data == make_images(3)[1].data
+
+
+def test_replay_stops_at_end(capture_file: Path) -> None:
+    reader = CaptureReader(capture_file, loop=False)
+
+    assert reader.image(2) is not None
+    assert reader.image(3) is None
+
+
+def test_writer_rejects_mismatched_image(tmp_path: Path) -> None:
+    with CaptureWriter(tmp_path / "capture.bin") as writer:
+        writer.write_image(make_images(1)[0])
+        with pytest.raises(ValueError):
+            writer.write_image(Image(1, "", "uint32", b"", "<", SHAPE))
+
+
+def test_reader_rejects_other_files(tmp_path: Path) -> None:
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a capture file" * 4)
+
+    with pytest.raises(ValueError):
+        CaptureReader(path)
+
+
+@pytest.mark.asyncio
+async def test_device_replays_until_end_of_capture(capture_file: Path) -> None:
+    stream = MagicMock(EigerStream)
+    eiger = EigerDevice(stream=stream, replay=CaptureReader(capture_file, loop=False))
+    await eiger.initialize()
+    eiger.settings.trigger_mode = "ints"
+    eiger.settings.nimages = 5
+    await eiger.arm()
+    await eiger.trigger()
+
+    update = eiger.update(SimTime(0), {})
+    while update.call_at is not None:
+        update = eiger.update(update.call_at, {})
+
+    images = [call.args[0] for call in stream.insert_image.call_args_list]
+    assert [image.data for image in images] == [i.data for i in make_images(3)]
+    stream.end_series.assert_called_once_with(1)
+    assert eiger.get_state() is State.IDLE
+
+
+def test_reader_closed_after_stream2_series(capture_file: Path) -> None:
+    reader = CaptureReader(capture_file)
+    stream = EigerStream2()
+    stream.begin_series(EigerSettings(), 1, "basic")
+    image = reader.image(0)
+    assert image is not None
+    stream.insert_image(image, 1)
+    stream.end_series(1)
+    list(stream.consume_data())
+    del image
+
+    reader.close()
+
+
+def test_zmq_io_passes_buffers_through() -> None:
+    buffer = memoryview(b"frame")
+
+    assert EigerZMQIo()._serialize([buffer, {"a": 1}]) == [buffer, b'{"a": 1}']
+
+
+@pytest.mark.parametrize("stream_type", [EigerStream, EigerStream2])
+def test_record_stream(tmp_path: Path, stream_type: type) -> None:
+    stream = stream_type()
+    stream.begin_series(EigerSettings(), 1, "basic")
+    for made in make_images(2):
+        stream.insert_image(made, 1)
+    message = EigerZMQIo()._serialize(list(stream.consume_data()))
+
+    push: zmq.Socket[bytes] = zmq.Context.instance().socket(zmq.PUSH)
+    port = push.bind_to_random_port("tcp://127.0.0.1")
+    path = tmp_path / "recorded.bin"
+    recorder = threading.Thread(
+        target=record_stream, args=(f"tcp://127.0.0.1:{port}", path, 2)
+    )
+    recorder.start()
+    push.send_multipart(message)
+    recorder.join(timeout=10)
+    push.close()
+
+    reader = CaptureReader(path)
+    assert len(reader) == 2
+    for index, expected in enumerate(make_images(2)):
+        image = reader.image(index)
+        assert image is not None
+        assert image.data == expected.data
+        assert (image.dtype, image.shape) == ("uint16", SHAPE)
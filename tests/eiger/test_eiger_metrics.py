@@ -0,0 +1,84 @@
+from unittest.mock import MagicMock
+
+import pytest
+from pytest_mock import MockerFixture
+from tickit.core.typedefs import SimTime
+
+from tickit_devices.eiger.eiger import EigerDevice
+from tickit_devices.eiger.eiger_adapters import (
+    EigerRESTAdapter,
+    EigerZMQAdapter,
+    EigerZMQIo,
+)
+from tickit_devices.eiger.eiger_metrics import EigerMetrics, Histogram
+from tickit_devices.eiger.stream.eiger_stream import EigerStream
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    histogram = Histogram((10, 100))
+    for duration in (5, 10, 50, 500):
+        histogram.observe(duration)
+
+    assert histogram.counts == [2, 1, 1]
+    assert list(histogram.render("latency", 'route="a"')) == [
+        'latency_bucket{route="a",le="1e-08"} 2',
+        'latency_bucket{route="a",le="1e-07"} 3',
+        'latency_bucket{route="a",le="+Inf"} 4',
+        'latency_sum{route="a"} 5.65e-07',
+        'latency_count{route="a"} 4',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_device_counts_frames() -> None:
+    eiger = EigerDevice(stream=MagicMock(EigerStream))
+    await eiger.initialize()
+    eiger.settings.trigger_mode = "ints"
+    eiger.settings.nimages = 2
+    await eiger.arm()
+    await eiger.trigger()
+    update = eiger.update(SimTime(0), {})
+
+    eiger.stream_config.mode = "disabled"
+    eiger.update(update.call_at, {})
+
+    metrics = eiger.metrics
+    assert metrics.frames_generated == 2
+    assert metrics.frames_streamed == {"legacy": 1, "cbor": 0}
+    assert metrics.frames_dropped == 1
+    assert metrics.update_duration.count == 2
+    assert metrics.acquire_frame_duration.count == 2
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(mocker: MockerFixture) -> None:
+    device = EigerDevice()
+    adapter = EigerRESTAdapter(device)
+    EigerZMQAdapter(device.streams["legacy"], "legacy", device.metrics)
+    endpoints = {
+        f"{endpoint.method} {endpoint.path}": func
+        for endpoint, func in adapter.get_endpoints()
+    }
+
+    request = mocker.MagicMock()
+    request.match_info = {"status_param": "state"}
+    await endpoints["GET /detector/api/1.8.0/status/{status_param}"](request)
+    response = await endpoints["GET /metrics"](request)
+
+    assert response.content_type == "text/plain"
+    text = response.text
+    assert "eiger_frames_generated_total 0" in text
+    assert 'eiger_stream_buffer_depth{format="legacy"} 0' in text
+    assert (
+        'eiger_request_duration_seconds_count{route="GET '
+        '/detector/api/1.8.0/status/{status_param}"} 1'
+    ) in text
+
+
+def test_zmq_io_counts_bytes() -> None:
+    metrics = EigerMetrics()
+    io = EigerZMQIo(stream_format="cbor", metrics=metrics)
+
+    io._serialize([b"1234", memoryview(b"56"), {"a": 1}])
+
+    assert metrics.bytes_streamed["cbor"] == 4 + 2 + len(b'{"a": 1}')
@@ -0,0 +1,69 @@
+import base64
+from unittest.mock import MagicMock
+
+import cbor2
+import pytest
+from tickit.core.typedefs import SimTime
+
+from tickit_devices.eiger.eiger import EigerDevice
+from tickit_devices.eiger.eiger_presets import DETECTOR_MODELS, get_detector_model
+from tickit_devices.eiger.eiger_schema import InvalidValueError
+from tickit_devices.eiger.stream.eiger_stream import EigerStream
+from tickit_devices.eiger.stream.eiger_stream_2 import EigerStream2
+from tickit_devices.eiger.stream.stream2 import stream2_tag_decoder
+
+
+@pytest.mark.parametrize("name", list(DETECTOR_MODELS))
+def test_preset_settings(name: str) -> None:
+    model = get_detector_model(name)
+    settings = model.settings()
+
+    assert settings.x_pixels_in_detector == model.x_pixels
+    assert settings.y_pixels_in_detector == model.y_pixels
+    assert settings.detector_readout_time == model.readout_time
+    assert settings.bit_depth_readout == model.bit_depth_readout
+    assert settings.frame_time >= model.min_frame_time
+
+
+def test_unknown_preset() -> None:
+    with pytest.raises(ValueError):
+        get_detector_model("pilatus_6m")
+
+
+def test_frame_time_limited_by_max_frame_rate() -> None:
+    settings = get_detector_model("eiger2_x_16m").settings()
+
+    with pytest.raises(InvalidValueError):
+        settings["frame_time"] = 0.001
+    settings["frame_time"] = 0.01
+
+    settings["count_time"] = 0.0001
+    assert settings.frame_time == pytest.approx(1 / 133)
+
+
+@pytest.mark.asyncio
+async def test_device_acquires_frames_of_model_geometry() -> None:
+    stream = MagicMock(EigerStream)
+    model = get_detector_model("eiger2_x_cdte_1m")
+    eiger = EigerDevice(stream=stream, model=model)
+    await eiger.initialize()
+    eiger.settings.trigger_mode = "ints"
+    await eiger.arm()
+    await eiger.trigger()
+    eiger.update(SimTime(0), {})
+
+    image = stream.insert_image.call_args.args[0]
+    assert image.shape == (model.x_pixels, model.y_pixels)
+    assert len(image.data) == model.x_pixels * model.y_pixels * 2
+
+
+def test_stream2_start_message_describes_model() -> None:
+    model = get_detector_model("eiger2_x_cdte_4m")
+    stream = EigerStream2(model=model)
+    stream.begin_series(model.settings(), 1, "all")
+
+    start = cbor2.loads(next(iter(stream.consume_data())), tag_hook=stream2_tag_decoder)
+    for key, value in model.stream2_start_fields().items():
+        assert start[key] == value
+    flatfield = base64.b64decode(start["flatfield"]["threshold_1"])
+    assert len(flatfield) == model.x_pixels * model.y_pixels // 2
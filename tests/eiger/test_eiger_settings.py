@@ -1,5 +1,8 @@
+from dataclasses import FrozenInstanceError
+
 import pytest
 
+from tickit_devices.eiger.eiger_schema import InvalidValueError
 from tickit_devices.eiger.eiger_settings import EigerSettings, KAEnergy
 
 # # # # # EigerStatus Tests # # # # #
@@ -23,6 +26,36 @@ def test_eiger_settings_get_set(eiger_settings):
         eiger_settings["doesnt_exist"]
 
 
+@pytest.mark.parametrize(
+    "readout,auto_summation,nexpi,count_time,bit_depth",
+    [
+        (12, True, 1, 0.1, 16),
+        (12, True, 2, 0.1, 32),
+        (12, True, 2, 0.01, 16),
+        (12, True, 1, 0.5, 32),
+        (12, False, 2, 0.5, 16),
+        (16, True, 1, 0.01, 16),
+        (16, True, 1, 0.1, 32),
+        (16, True, 2, 0.01, 32),
+        (16, False, 2, 0.1, 16),
+    ],
+)
+def test_eiger_settings_bit_depth_follows_summation(
+    eiger_settings,
+    readout: int,
+    auto_summation: bool,
+    nexpi: int,
+    count_time: float,
+    bit_depth,
+):
+    eiger_settings.bit_depth_readout = readout
+    eiger_settings["auto_summation"] = auto_summation
+    eiger_settings["nexpi"] = nexpi
+    eiger_settings["count_time"] = count_time
+
+    assert eiger_settings.bit_depth_image == bit_depth
+
+
 def test_eiger_settings_get_element(eiger_settings):
     assert "Co" == eiger_settings.element
 
@@ -78,3 +111,87 @@ def test_eiger_settings_threshold_config(eiger_settings):
 
     with pytest.raises(ValueError):
         eiger_settings.threshold_config["difference"]["doesnt_exist"]
+
+
+@pytest.mark.parametrize(
+    "key,value,expected",
+    [
+        ("count_time", 1, 1.0),
+        ("nimages", 10.0, 10),
+        ("trigger_mode", "ints", "ints"),
+        ("pixel_mask", [[0, 1]], [[0, 1]]),
+    ],
+)
+def test_eiger_settings_converts_values(eiger_settings, key, value, expected):
+    eiger_settings[key] = value
+
+    assert eiger_settings[key]["value"] == expected
+    assert type(eiger_settings[key]["value"]) is type(expected)
+
+
+@pytest.mark.parametrize(
+    "key,value",
+    [
+        ("count_time", "0.1"),
+        ("count_time", True),
+        ("count_time", 0.0),
+        ("count_time", -0.1),
+        ("frame_time", 0.0),
+        ("nimages", -1),
+        ("nimages", 1.5),
+        ("trigger_mode", "bad"),
+        ("element", "Xx"),
+        ("trigger_start_delay", -1.0),
+        ("pixel_mask", [[-1]]),
+        ("x_pixel_size", 0.1),
+        ("keys", []),
+        ("doesnt_exist", 1),
+    ],
+)
+def test_eiger_settings_rejects_invalid_values(eiger_settings, key, value):
+    before = vars(eiger_settings).copy()
+
+    with pytest.raises(InvalidValueError):
+        eiger_settings[key] = value
+
+    assert vars(eiger_settings) == before
+
+
+def test_threshold_config_rejects_invalid_values(eiger_settings):
+    with pytest.raises(InvalidValueError):
+        eiger_settings.threshold_config["1"]["mode"] = 1
+    with pytest.raises(InvalidValueError):
+        eiger_settings.threshold_config["difference"]["upper_threshold"] = 3
+
+
+def test_eiger_settings_filtered_excludes_fields(eiger_settings):
+    filtered = eiger_settings.filtered(["flatfield", "pixel_mask"])
+
+    assert "flatfield" not in filtered
+    assert "pixel_mask" not in filtered
+    assert filtered["count_time"] == eiger_settings.count_time
+
+
+def test_snapshot_is_frozen_and_shares_values(eiger_settings):
+    snapshot = eiger_settings.snapshot()
+
+    assert snapshot == eiger_settings
+    assert snapshot.flatfield is eiger_settings.flatfield
+    with pytest.raises(FrozenInstanceError):
+        snapshot["count_time"] = 0.2
+    with pytest.raises(FrozenInstanceError):
+        snapshot.threshold_config["1"].energy = 1000.0
+
+
+def test_snapshot_is_reused_until_settings_change(eiger_settings):
+    snapshot = eiger_settings.snapshot()
+    assert eiger_settings.snapshot() is snapshot
+
+    version = eiger_settings.version
+    eiger_settings.threshold_config["1"]["energy"] = 6829
+    assert eiger_settings.version > version
+
+    new_snapshot = eiger_settings.snapshot()
+    assert new_snapshot is not snapshot
+    assert new_snapshot.threshold_config["1"].energy == 6829
+    assert snapshot.threshold_config["1"].energy == 6729
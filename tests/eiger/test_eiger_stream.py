@@ -33,7 +33,7 @@ MINIMAL_HEADER = [
 ]
 
 EIGER_SETTINGS_HEADER = EigerSettings().filtered(
-    ["flatfield", "pixelmask", "countrate_correction_table"]
+    ["flatfield", "pixel_mask", "countrate_correction_table"]
 )
 X_SIZE = EIGER_SETTINGS_HEADER["x_pixels_in_detector"]
 Y_SIZE = EIGER_SETTINGS_HEADER["y_pixels_in_detector"]
@@ -129,7 +129,19 @@ def test_data_buffered(stream: EigerStream) -> None:
         assert a == b
 
 
-def expected_image_blobs(image: Image) -> list[bytes | BaseModel]:
+def test_appendices_sent_with_headers_and_images(stream: EigerStream) -> None:
+    stream.set_header_appendix('{"scan": "grid"}')
+    stream.set_image_appendix({"point": 1})
+    stream.begin_series(EigerSettings(), TEST_SERIES_ID, "none")
+    image = Image.create_dummy_image(0, (X_SIZE, Y_SIZE))
+    stream.insert_image(image, TEST_SERIES_ID)
+    blobs = list(stream.consume_data())
+
+    assert blobs[1] == b'{"scan": "grid"}'
+    assert blobs[2:] == expected_image_blobs(image) + [b'{"point": 1}']
+
+
+def expected_image_blobs(image: Image) -> list[bytes | memoryview | BaseModel]:
     return [
         ImageHeader(
             frame=image.index,
@@ -144,8 +156,8 @@ def expected_image_blobs(image: Image) -> list[bytes | BaseModel]:
         ),
         image.data,
         ImageConfigHeader(
-            real_time=0,
-            start_time=0,
-            stop_time=0,
+            real_time=image.stop_time - image.start_time,
+            start_time=image.start_time,
+            stop_time=image.stop_time,
         ),
     ]
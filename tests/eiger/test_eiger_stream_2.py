@@ -2,6 +2,7 @@ import datetime
 from typing import Any
 
 import cbor2
+import numpy as np
 import pytest
 
 from tickit_devices.eiger.data.dummy_image import Image
@@ -23,7 +24,7 @@ def eiger() -> EigerDevice:
 TEST_SERIES_ID = 15614
 
 EIGER_SETTINGS_HEADER = EigerSettings().filtered(
-    ["flatfield", "pixelmask", "countrate_correction_table"]
+    ["flatfield", "pixel_mask", "countrate_correction_table"]
 )
 X_SIZE = EIGER_SETTINGS_HEADER["x_pixels_in_detector"]
 Y_SIZE = EIGER_SETTINGS_HEADER["y_pixels_in_detector"]
@@ -65,6 +66,7 @@ BASIC_START_MESSAGE: dict[str, Any] = {
         "omega": {"increment": 0.1, "start": 0.0},
         "phi": {"increment": 0.0, "start": 0.0},
     },
+    "image_dtype": "uint16",
     "image_size_x": 4148,
     "image_size_y": 4362,
     "incident_energy": 13500.299829398293,
@@ -90,7 +92,7 @@ IMAGE_MESSAGE = {
     "type": "image",
     "series_id": 15614,
     "series_unique_id": "01HBV3JPF9T4ZDPADX6EMK6XMZ",
-    "real_time": [215873, 50000000],
+    "real_time": [0, 1000000000],
     "series_date": datetime.datetime(
         2023,
         10,
@@ -101,8 +103,8 @@ IMAGE_MESSAGE = {
         434000,
         tzinfo=datetime.timezone(datetime.timedelta(seconds=7200)),
     ),
-    "start_time": [0, 50000000],
-    "stop_time": [215873, 50000000],
+    "start_time": [0, 1000000000],
+    "stop_time": [0, 1000000000],
 }
 
 
@@ -174,6 +176,98 @@ def test_insert_image_produces_correct_message(stream: EigerStream2) -> None:
         assert message == IMAGE_MESSAGE
 
 
+def test_insert_summed_image_encodes_uncompressed_uint32(stream: EigerStream2) -> None:
+    image = Image.create_dummy_image(0, (4, 3), bit_depth=32, nexpi=2)
+
+    stream.insert_image(image, TEST_SERIES_ID)
+    message = cbor2.loads(list(stream.consume_data())[0])
+
+    shape, typed_array = message["data"]["threshold_1"].value
+    assert shape == [3, 4]
+    assert typed_array.tag == 70
+    assert typed_array.value == image.data
+
+
+def test_begin_series_reports_image_dtype(stream: EigerStream2) -> None:
+    settings = EigerSettings()
+    settings["nexpi"] = 2
+
+    stream.begin_series(settings, TEST_SERIES_ID, "basic")
+
+    message = cbor2.loads(list(stream.consume_data())[0])
+    assert message["image_dtype"] == "uint32"
+
+
+def test_enabled_thresholds_produce_channels(stream: EigerStream2) -> None:
+    settings = EigerSettings()
+    settings.threshold_config["2"]["mode"] = "enabled"
+    settings.threshold_config["difference"]["mode"] = "enabled"
+    image = Image.create_dummy_image(0, (4, 3), bit_depth=32, nexpi=2)
+
+    stream.begin_series(settings, TEST_SERIES_ID, "all")
+    stream.insert_image(image, TEST_SERIES_ID)
+    start, message = (cbor2.loads(m) for m in stream.consume_data())
+
+    channels = ["threshold_1", "threshold_2", "difference"]
+    assert start["channels"] == channels
+    assert list(start["flatfield"]) == channels
+    assert list(message["data"]) == channels
+    lower, upper, difference = (
+        np.frombuffer(message["data"][channel].value[1].value, dtype="<u4")
+        for channel in channels
+    )
+    assert lower.tobytes() == image.data
+    assert (upper == lower // 2).all()
+    assert (difference == lower - upper).all()
+
+
+def test_compressed_image_channels_sent_uncompressed(stream: EigerStream2) -> None:
+    settings = EigerSettings()
+    settings.threshold_config["2"]["mode"] = "enabled"
+    image = Image.create_dummy_image(0, (X_SIZE, Y_SIZE))
+
+    stream.begin_series(settings, TEST_SERIES_ID, "basic")
+    stream.insert_image(image, TEST_SERIES_ID)
+    message = cbor2.loads(list(stream.consume_data())[1])
+
+    for channel in ["threshold_1", "threshold_2"]:
+        shape, typed_array = message["data"][channel].value
+        assert shape == [Y_SIZE, X_SIZE]
+        assert typed_array.tag == 69
+        assert len(typed_array.value) == X_SIZE * Y_SIZE * 2
+
+
+def test_compressed_32_bit_image_channels_match_shape(stream: EigerStream2) -> None:
+    settings = EigerSettings()
+    settings.threshold_config["2"]["mode"] = "enabled"
+    image = Image(0, "hash", "uint32", b"compressed", "bs32-lz4<", (4, 3))
+
+    stream.begin_series(settings, TEST_SERIES_ID, "basic")
+    stream.insert_image(image, TEST_SERIES_ID)
+    message = cbor2.loads(list(stream.consume_data())[1])
+
+    for channel in ["threshold_1", "threshold_2"]:
+        shape, typed_array = message["data"][channel].value
+        assert shape == [3, 4]
+        assert typed_array.tag == 70
+        assert len(typed_array.value) == 4 * 3 * 4
+
+
+def test_appendices_sent_as_user_data(stream: EigerStream2) -> None:
+    stream.set_header_appendix('{"scan": "grid", "points": [1, 2]}')
+    stream.set_image_appendix("not json")
+    stream.begin_series(EigerSettings(), TEST_SERIES_ID, "basic")
+    stream.insert_image(Image.create_dummy_image(0, (4, 3), 32), TEST_SERIES_ID)
+
+    start, image = (cbor2.loads(m) for m in stream.consume_data())
+    assert start["user_data"] == {"scan": "grid", "points": [1, 2]}
+    assert image["user_data"] == "not json"
+
+    stream.set_image_appendix("")
+    stream.insert_image(Image.create_dummy_image(1, (4, 3), 32), TEST_SERIES_ID)
+    assert "user_data" not in cbor2.loads(list(stream.consume_data())[0])
+
+
 def test_end_series_produces_correct_message(stream: EigerStream2) -> None:
     stream.end_series(TEST_SERIES_ID)
 
@@ -0,0 +1,16 @@
+from collections.abc import Awaitable, Callable
+
+import pytest
+
+from tickit_devices.zebra.zebra import ZebraAdapter
+
+
+@pytest.fixture
+def send() -> Callable[[ZebraAdapter, bytes], Awaitable[list[bytes]]]:
+    """Sends a message to a Zebra adapter, returning the replies."""
+
+    async def send(adapter: ZebraAdapter, message: bytes) -> list[bytes]:
+        replies, _ = await adapter.handle(message)
+        return [reply async for reply in replies]
+
+    return send
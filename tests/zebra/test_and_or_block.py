@@ -10,6 +10,13 @@ all_false = 0
 varying_values_of_true = {all_false, one_true, one_false, all_true}
 
 
+def settle(block: AndOrBlock, inputs: dict[str, bool]) -> AndOrBlock.Outputs:
+    """Update the block and return its outputs once they have propagated."""
+    update = block.update(SimTime(0), inputs)
+    assert update.call_at is not None
+    return block.update(update.call_at, inputs).outputs
+
+
 # # # # # AndOrBlock Tests # # # # #
 
 
@@ -20,8 +27,7 @@ def test_and_block_enabled_or_inverted(enabled: int, inverted: int):
     mux = {f"INP{i + 1}": True for i in range(4)}
     block = AndOrBlock(name=name)
     block.params = {f"{name}_ENA": enabled, f"{name}_INV": inverted}
-    out = block.update(SimTime(0), mux)
-    assert out.outputs == {
+    assert settle(block, mux) == {
         "OUT": enabled + inverted == all_true
     }  # All devices either enabled or inverted
 
@@ -33,8 +39,7 @@ def test_or_block_enabled_or_inverted(enabled: int, inverted: int):
     block = AndOrBlock(name=name)
     block.params = {f"{name}_ENA": enabled, f"{name}_INV": inverted}
     mux = {f"INP{i + 1}": True for i in range(4)}
-    out = block.update(SimTime(0), mux)
-    assert out.outputs == {
+    assert settle(block, mux) == {
         "OUT": enabled != inverted
     }  # At least one device exclusively enabled or inverted
 
@@ -45,8 +50,7 @@ def test_all_enabled_and_block_for_inputs(high: int):
     block = AndOrBlock(name=name)
     block.params = {f"{name}_ENA": all_true, f"{name}_INV": all_false}
     mux = {f"INP{i + 1}": bool(high & (1 << i)) for i in range(4)}
-    out = block.update(SimTime(0), mux)
-    assert out.outputs == {"OUT": high == all_true}  # All inputs high
+    assert settle(block, mux) == {"OUT": high == all_true}  # All inputs high
 
 
 @pytest.mark.parametrize("high", varying_values_of_true)
@@ -55,5 +59,17 @@ def test_all_enabled_or_block_for_inputs(high: int):
     block = AndOrBlock(name=name)
     block.params = {f"{name}_ENA": all_true, f"{name}_INV": all_false}
     mux = {f"INP{i + 1}": bool(high & (1 << i)) for i in range(4)}
-    out = block.update(SimTime(0), mux)
-    assert out.outputs == {"OUT": high != all_false}  # At least one input high
+    assert settle(block, mux) == {"OUT": high != all_false}  # At least one input high
+
+
+def test_masks_recompiled_when_params_change():
+    name = ComponentID("AND1")
+    block = AndOrBlock(name=name)
+    block.params = {f"{name}_ENA": all_true, f"{name}_INV": all_false}
+    mux = {"INP1": True, "INP2": True}
+    assert settle(block, mux) == {"OUT": False}
+
+    block.params[f"{name}_INV"] = 0b1100
+    block.params_changed()
+
+    assert settle(block, mux) == {"OUT": True}
@@ -0,0 +1,100 @@
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+from tickit.core.components.device_component import DeviceComponent
+from tickit.core.management.event_router import InverseWiring
+from tickit.core.typedefs import ComponentID
+
+from tickit_devices.zebra import _default
+from tickit_devices.zebra.capture import (
+    FRAME_POINTS,
+    MAX_RESERVED,
+    CaptureBuffer,
+    capture_fields,
+    decode_frame,
+    encode_frames,
+)
+from tickit_devices.zebra.position_compare import PositionCompareBlock
+from tickit_devices.zebra.zebra import ZebraAdapter
+
+ENC1_ENC3_DIV1 = 0b0001000101
+
+
+def filled(points: int, capacity: int = 1024) -> CaptureBuffer:
+    buffer = CaptureBuffer(capacity=capacity)
+    buffer.reset(ENC1_ENC3_DIV1)
+    for i in range(points):
+        buffer.append(i, [i, -i, 2 * i])
+    return buffer
+
+
+def test_capture_fields_from_bit_cap():
+    assert capture_fields(ENC1_ENC3_DIV1) == ("ENC1", "ENC3", "DIV1")
+
+
+def test_buffer_grows_keeping_points():
+    buffer = filled(100, capacity=8)
+
+    assert buffer.count == 100
+    assert buffer.timestamps.tolist() == list(range(100))
+    assert buffer.column("ENC3").tolist() == [-i for i in range(100)]
+
+
+def test_reset_empties_buffer():
+    buffer = filled(10)
+
+    buffer.reset(0b1, capacity=10_000)
+
+    assert buffer.count == 0
+    assert buffer.fields == ("ENC1",)
+    assert len(buffer.column("ENC1")) == 0
+
+
+def test_reservation_limited_then_grown():
+    buffer = CaptureBuffer(capacity=8)
+
+    buffer.reset(ENC1_ENC3_DIV1, capacity=0x100 * 0x10000 * 1000)
+    for i in range(MAX_RESERVED + 1):
+        buffer.append(i, [i, -i, 2 * i])
+
+    assert buffer.count == MAX_RESERVED + 1
+    assert buffer.column("DIV1")[-1] == 2 * MAX_RESERVED
+
+
+def test_points_downloaded_in_frames():
+    points = FRAME_POINTS * 2 + 10
+    buffer = filled(points)
+
+    frames = list(encode_frames(buffer, 5, points))
+
+    assert len(frames) == 3
+    starts, records = zip(*(decode_frame(frame) for frame in frames), strict=True)
+    assert starts == (5, 5 + FRAME_POINTS, 5 + 2 * FRAME_POINTS)
+    records = np.concatenate(records)
+    assert records["TIME"].tolist() == list(range(5, points))
+    assert records["ENC3"].tolist() == [-i for i in range(5, points)]
+    assert records["DIV1"].tolist() == [2 * i for i in range(5, points)]
+
+
+def test_download_beyond_points_gives_empty_frame():
+    frames = list(encode_frames(filled(3), 10, 5))
+
+    assert frames == [b"B0000000A0000%04X\n" % ENC1_ENC3_DIV1]
+
+
+@pytest.mark.asyncio
+async def test_adapter_downloads_captured_points(send):
+    pc = PositionCompareBlock(name="PC")
+    pc.capture = filled(10)
+    component = DeviceComponent(name=ComponentID("PC"), device=pc)
+    component.raise_interrupt = AsyncMock()  # type: ignore
+    adapter = ZebraAdapter(params=_default())
+    adapter.setup_adapter({ComponentID("PC"): component}, InverseWiring())
+
+    assert await send(adapter, b"RF6\n") == [b"RF6000AOK"]  # PC_NUM_CAPLO
+    frames = await send(adapter, b"B0000000200000100\n")
+
+    start, records = decode_frame(frames[0])
+    assert (start, len(records)) == (2, 8)
+    assert records["ENC1"].tolist() == list(range(2, 10))
@@ -0,0 +1,207 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from tickit.core.components.device_component import DeviceComponent
+from tickit.core.management.event_router import InverseWiring
+from tickit.core.typedefs import ComponentID, PortID, SimTime
+
+from tickit_devices.zebra import _default
+from tickit_devices.zebra._common import system_bus
+from tickit_devices.zebra.and_or_block import AndOrBlock
+from tickit_devices.zebra.div_block import DivBlock
+from tickit_devices.zebra.zebra import ZebraAdapter
+
+PERIOD = 1000
+
+
+def div_block(divisor: int, **params: int) -> DivBlock:
+    block = DivBlock(name="DIV1")
+    block.params = {**_default(), "DIV1_DIVLO": divisor, **params}
+    return block
+
+
+def clock(start: int, end: int) -> dict[int, bool]:
+    """The level at start and edges until end of a clock which rises at 0."""
+    edges = {t: t % PERIOD == 0 for t in range(0, end, PERIOD // 2) if start < t}
+    return {start: start % PERIOD < PERIOD // 2, **edges}
+
+
+def run(
+    block: DivBlock, start: int, end: int, edges: dict[int, bool] | None = None
+) -> tuple[list[tuple[int, dict]], int]:
+    """
+    Updates the block from start to end, at each edge of its input and each time
+    it asks to be called, returning the changes of its outputs and the updates.
+    """
+    edges = edges or {}
+    level = False
+    outputs = dict(block.previous_outputs)
+    changes, updates = [], 0
+    times = sorted(edges)
+    time: int | None = start
+    while time is not None and time < end:
+        while times and times[0] <= time:
+            level = edges[times.pop(0)]
+        update = block.update(SimTime(time), {"INP": level})
+        updates += 1
+        if update.outputs != outputs:
+            outputs = dict(update.outputs)
+            changes.append((time, outputs))
+        candidates = [t for t in (update.call_at, times[0] if times else None) if t]
+        time = min(candidates, default=None)
+    return changes, updates
+
+
+def test_every_nth_pulse_passed_to_outd():
+    block = div_block(3)
+
+    changes, _ = run(block, 0, 3 * PERIOD, clock(0, 3 * PERIOD))
+
+    assert changes == [
+        (20, {"OUTD": False, "OUTN": True}),
+        (520, {"OUTD": False, "OUTN": False}),
+        (1020, {"OUTD": False, "OUTN": True}),
+        (1520, {"OUTD": False, "OUTN": False}),
+        (2020, {"OUTD": True, "OUTN": False}),
+        (2520, {"OUTD": False, "OUTN": False}),
+    ]
+
+
+def test_first_pulse_passed_to_outd():
+    block = div_block(3, DIV_FIRST=0b0001)
+
+    changes, _ = run(block, 0, PERIOD, clock(0, PERIOD))
+
+    assert changes == [
+        (20, {"OUTD": True, "OUTN": False}),
+        (520, {"OUTD": False, "OUTN": False}),
+    ]
+
+
+@pytest.mark.parametrize("divisor", [1, 2, 3, 7])
+@pytest.mark.parametrize("first", [0, 1])
+@pytest.mark.parametrize("polarity", [0, 1 << 4])
+@pytest.mark.parametrize("start", [0, 300, 700])
+def test_clock_generated_by_block_matches_edges(
+    divisor: int, first: int, polarity: int, start: int
+):
+    params = {"DIV_FIRST": first, "POLARITY": polarity}
+    end = 20 * PERIOD
+    edges = run(div_block(divisor, **params), start, end, clock(start, end))
+
+    block = div_block(divisor, **params)
+    block.set_train(PortID("INP"), SimTime(PERIOD))
+    generated = run(block, start, end)
+
+    assert generated[0] == edges[0]
+
+
+def test_clock_generated_only_updated_for_observed_outputs():
+    block = div_block(1000)
+    block.observed = {PortID("OUTD")}
+    block.set_train(PortID("INP"), SimTime(PERIOD))
+
+    changes, updates = run(block, 0, 3000 * PERIOD)
+
+    assert [time for time, _ in changes] == [
+        999_000 + 20,
+        999_500 + 20,
+        1_999_000 + 20,
+        1_999_500 + 20,
+        2_999_000 + 20,
+        2_999_500 + 20,
+    ]
+    assert updates == 7
+
+
+def test_count_kept_when_clock_disconnected():
+    block = div_block(5)
+    block.set_train(PortID("INP"), SimTime(PERIOD))
+    run(block, 700, 3200)  # Pulses at 1000, 2000 and 3000
+
+    block.set_train(PortID("INP"), None)
+    changes, _ = run(block, 3200, 5000, {3300: True, 3400: False, 3500: True})
+
+    assert changes[-1] == (3520, {"OUTD": True, "OUTN": False})
+
+
+@pytest.mark.parametrize("clocked", [False, True])
+@pytest.mark.parametrize(
+    "params", [{"DIV_FIRST": 0b0010}, {"POLARITY": 0b0010 << 4}, {"DIV1_DIVLO": 3}]
+)
+def test_count_kept_when_params_written_unchanged_for_block(
+    clocked: bool, params: dict[str, int]
+):
+    block = div_block(3)
+    edges = clock(0, 5 * PERIOD)
+    if clocked:
+        block.set_train(PortID("INP"), SimTime(PERIOD))
+    run(block, 0, 1700, {t: v for t, v in edges.items() if t < 1700})
+
+    block.params = {**_default(), "DIV1_DIVLO": 3, **params}
+    block.params_changed()
+    changes, _ = run(block, 1700, 3000, {t: v for t, v in edges.items() if t >= 1700})
+
+    assert changes[0] == (2020, {"OUTD": True, "OUTN": False})
+
+
+@pytest.mark.parametrize("clocked", [False, True])
+@pytest.mark.parametrize("params", [{"DIV_FIRST": 0b0001}, {"DIV1_DIVLO": 4}])
+def test_count_reset_when_params_of_block_changed(
+    clocked: bool, params: dict[str, int]
+):
+    block = div_block(3)
+    edges = clock(0, 5 * PERIOD)
+    if clocked:
+        block.set_train(PortID("INP"), SimTime(PERIOD))
+    run(block, 0, 1700, {t: v for t, v in edges.items() if t < 1700})
+
+    block.params = {**_default(), "DIV1_DIVLO": 3, **params}
+    block.params_changed()
+    changes, _ = run(block, 1700, 3000, {t: v for t, v in edges.items() if t >= 1700})
+
+    first = params.get("DIV_FIRST", 0) == 1
+    assert changes[0] == (2020, {"OUTD": first, "OUTN": not first})
+
+
+def test_clock_follows_polarity_of_block():
+    block = div_block(1)
+    block.set_train(PortID("INP"), SimTime(PERIOD))
+    run(block, 0, 1700)
+
+    block.params = {**_default(), "DIV1_DIVLO": 1, "POLARITY": 0b0001 << 4}
+    block.params_changed()
+    changes, _ = run(block, 1700, 3000)
+
+    assert changes[0] == (2520, {"OUTD": True, "OUTN": False})
+
+
+@pytest.mark.asyncio
+async def test_adapter_gives_clock_to_block(send):
+    div1 = div_block(4)
+    components = {
+        ComponentID("DIV1"): DeviceComponent(name=ComponentID("DIV1"), device=div1),
+        ComponentID("OR1"): DeviceComponent(
+            name=ComponentID("OR1"), device=AndOrBlock(name="OR1")
+        ),
+    }
+    for component in components.values():
+        component.raise_interrupt = AsyncMock()  # type: ignore
+    adapter = ZebraAdapter(params=_default())
+    adapter.setup_adapter(
+        components,
+        InverseWiring({ComponentID("DIV1"): {}, ComponentID("OR1"): {}}),
+    )
+    assert div1.observed == set()
+
+    clock_1mhz = system_bus.index("CLOCK_1MHZ")
+    assert await send(adapter, b"W40%04X\n" % clock_1mhz) == [b"W40OK"]  # DIV1_INP
+
+    assert div1._period == PERIOD
+    assert adapter._wiring[ComponentID("DIV1")] == {}
+    assert await send(adapter, b"R40\n") == [b"R40%04XOK" % clock_1mhz]
+
+    await send(adapter, b"W20%04X\n" % system_bus.index("DIV1_OUTD"))  # OR1_INP1
+
+    assert div1.observed == {"OUTD"}
+    components[ComponentID("DIV1")].raise_interrupt.assert_awaited()
@@ -0,0 +1,151 @@
+import pytest
+from tickit.core.typedefs import ComponentID, SimTime
+
+from tickit_devices.zebra.encoder import (
+    Encoder,
+    EncoderDevice,
+    MotionProfile,
+    Segment,
+)
+
+
+def run(device: EncoderDevice, end: int) -> tuple[list[tuple[int, dict]], int]:
+    """
+    Updates the device from 0 until end, at each time it asks to be called,
+    returning the changes of its outputs and the updates.
+    """
+    changes: list[tuple[int, dict]] = []
+    updates = 0
+    time: int | None = 0
+    while time is not None and time < end:
+        update = device.update(SimTime(time), {})
+        updates += 1
+        if not changes or update.outputs != changes[-1][1]:
+            changes.append((time, dict(update.outputs)))
+        time = update.call_at
+    return changes, updates
+
+
+def test_quadrature_at_constant_velocity():
+    # A count every 100ns
+    device = EncoderDevice(MotionProfile.constant_velocity(0.01))
+
+    changes, updates = run(device, 1000)
+
+    assert [(time, outputs["A"], outputs["B"]) for time, outputs in changes] == [
+        (100 * count, count % 4 in (1, 2), count % 4 in (2, 3)) for count in range(10)
+    ]
+    assert [outputs["POSITION"] for _, outputs in changes] == list(range(10))
+    assert updates == 10
+
+
+def test_b_leads_a_in_negative_direction():
+    device = EncoderDevice(MotionProfile.constant_velocity(-0.01, start=0.5))
+
+    changes, _ = run(device, 400)
+
+    assert [(outputs["A"], outputs["B"]) for _, outputs in changes] == [
+        (False, False),
+        (False, True),
+        (True, True),
+        (True, False),
+        (False, False),
+    ]
+    assert [outputs["POSITION"] for _, outputs in changes] == [0, -1, -2, -3, -4]
+
+
+def test_trapezoid_stops_at_distance():
+    profile = MotionProfile.trapezoid(100, velocity=0.1, acceleration=1e-4)
+    device = EncoderDevice(profile)
+
+    changes, updates = run(device, 10_000)
+
+    assert changes[-1][1]["POSITION"] == 100
+    assert updates == 101
+    # Accelerates for 1000ns over 50 counts, so is then at the peak of a triangle
+    assert profile.position(1000) == pytest.approx(50)
+    assert profile.position(500) == pytest.approx(12.5)
+    assert device.update(SimTime(10_000), {}).call_at is None
+
+
+def test_trapezoid_cruises_between_ramps():
+    profile = MotionProfile.trapezoid(-300, velocity=0.1, acceleration=1e-4, start=10)
+
+    assert profile.position(1000) == pytest.approx(-40)
+    assert profile.position(2000) == pytest.approx(-140)
+    assert profile.position(1e6) == pytest.approx(-290)
+
+
+def test_waypoints_interpolated_and_held():
+    profile = MotionProfile.waypoints([(1000, 0), (2000, 50), (3000, 20)])
+
+    assert [profile.position(t) for t in (0, 1500, 2500, 5000)] == [0, 25, 35, 20]
+    assert profile.reaches(40, 0, rising=True) == 1800
+    assert profile.reaches(40, 0, rising=False) == pytest.approx(2333.33, abs=0.01)
+
+
+def test_reaches_from_rest_whilst_accelerating():
+    segment = Segment(0, 0, 0, -2e-6)  # Falls 1 count in 1000ns
+
+    assert segment.reaches(0, 0, rising=False) == 0
+    assert segment.reaches(-1, 0, rising=False) == pytest.approx(1000)
+    assert segment.reaches(1, 0, rising=True) is None
+
+
+def test_only_position_steps_emitted_without_quadrature():
+    device = EncoderDevice(
+        MotionProfile.constant_velocity(0.01), quadrature=False, position_step=100
+    )
+
+    changes, updates = run(device, 100_000)
+
+    assert [outputs["POSITION"] for _, outputs in changes] == list(range(0, 1000, 100))
+    assert updates == 10
+
+
+def test_index_pulses_without_quadrature():
+    device = EncoderDevice(
+        MotionProfile.constant_velocity(0.01, start=1),
+        quadrature=False,
+        position_step=1000,
+        index=250,
+    )
+
+    changes, updates = run(device, 100_000)
+
+    assert [(time, outputs["Z"]) for time, outputs in changes] == [
+        (0, False),
+        (24_900, True),
+        (25_000, False),
+        (49_900, True),
+        (50_000, False),
+        (74_900, True),
+        (75_000, False),
+        (99_900, True),
+    ]
+    assert updates == len(changes)
+
+
+@pytest.mark.parametrize(
+    "config, position",
+    [
+        ({"velocity": 1e9}, 1000),
+        ({"velocity": 1e9, "acceleration": 1e15}, 500),
+        ({"velocity": -1e9, "distance": -100, "start": 5}, -95),
+        ({"waypoints": [(0, 0), (2e-6, 4000)]}, 2000),
+    ],
+)
+def test_config_profile_in_seconds(config: dict, position: float):
+    encoder = Encoder(name=ComponentID("enc"), inputs={}, **config)
+
+    assert encoder.profile().position(1000) == pytest.approx(position)
+
+
+def test_config_creates_encoder():
+    encoder = Encoder(name=ComponentID("enc"), inputs={}, velocity=1e9, index=4)
+
+    device = encoder().device
+
+    assert isinstance(device, EncoderDevice)
+    assert device.index == 4
+    assert device.update(SimTime(1000), {}).outputs["POSITION"] == 1000
@@ -0,0 +1,57 @@
+from tickit.core.typedefs import SimTime
+
+from tickit_devices.zebra import _default
+from tickit_devices.zebra.gate_block import GateBlock
+
+
+def gate_block(**params: int) -> GateBlock:
+    block = GateBlock(name="GATE1")
+    block.params = {**_default(), **params}
+    return block
+
+
+def test_set_and_reset_after_delay():
+    block = gate_block()
+
+    update = block.update(SimTime(0), {"INP1": True, "INP2": False})
+    assert update.outputs == {"OUT": False}
+    assert update.call_at == 20
+    assert block.update(SimTime(20), {"INP1": True, "INP2": False}).outputs == {
+        "OUT": True
+    }
+    block.update(SimTime(40), {"INP1": False, "INP2": True})
+    assert block.update(SimTime(60), {"INP1": False, "INP2": True}).outputs == {
+        "OUT": False
+    }
+
+
+def test_edges_while_propagating_are_not_missed():
+    block = gate_block()
+
+    block.update(SimTime(0), {"INP1": True, "INP2": False})
+    update = block.update(SimTime(10), {"INP1": True, "INP2": True})
+    assert update.call_at == 20
+    update = block.update(SimTime(20), {"INP1": True, "INP2": True})
+    assert update.outputs == {"OUT": True}
+    assert update.call_at == 30
+    assert block.update(SimTime(30), {"INP1": True, "INP2": True}).outputs == {
+        "OUT": False
+    }
+
+
+def test_reset_takes_precedence():
+    block = gate_block()
+
+    block.update(SimTime(0), {"INP1": True, "INP2": True})
+    update = block.update(SimTime(20), {"INP1": True, "INP2": True})
+    assert update.outputs == {"OUT": False}
+    assert update.call_at is None
+
+
+def test_falling_edges_when_polarity_set():
+    block = gate_block(POLARITY=0b0001)
+
+    block.update(SimTime(0), {"INP1": True, "INP2": False})
+    assert block.update(SimTime(20), {"INP1": True}).outputs == {"OUT": False}
+    block.update(SimTime(40), {"INP1": False})
+    assert block.update(SimTime(60), {"INP1": False}).outputs == {"OUT": True}
@@ -0,0 +1,210 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from tickit.core.management.event_router import InverseWiring
+from tickit.core.typedefs import ComponentID, ComponentPort, PortID, SimTime
+
+from tickit_devices.zebra import Zebra, _default
+from tickit_devices.zebra.and_or_block import AndOrBlock, AndOrBlockConfig
+from tickit_devices.zebra.netlist import Netlist, NetlistConfig
+from tickit_devices.zebra.pulse_block import PulseBlockConfig
+from tickit_devices.zebra.zebra import ZebraAdapter
+
+
+def port(component: str, port: str) -> ComponentPort:
+    return ComponentPort(ComponentID(component), PortID(port))
+
+
+def chain() -> list[AndOrBlockConfig]:
+    """a -> AND1 -> OR1 -> OR2"""
+    return [
+        AndOrBlockConfig(
+            name=ComponentID("AND1"), inputs={PortID("INP1"): port("external", "a")}
+        ),
+        AndOrBlockConfig(
+            name=ComponentID("OR1"), inputs={PortID("INP1"): port("AND1", "OUT")}
+        ),
+        AndOrBlockConfig(
+            name=ComponentID("OR2"), inputs={PortID("INP1"): port("OR1", "OUT")}
+        ),
+    ]
+
+
+@pytest.fixture
+def params() -> dict[str, int]:
+    return {
+        **_default(),
+        "AND1_ENA": 0b0001,
+        "AND1_INV": 0b1110,
+        "OR1_ENA": 0b0001,
+        "OR2_ENA": 0b0001,
+    }
+
+
+@pytest.fixture
+def netlist(params: dict[str, int]) -> Netlist:
+    config = NetlistConfig(
+        name=ComponentID("netlist"),
+        inputs={PortID("a"): port("external", "a")},
+        blocks=chain(),
+        expose={
+            PortID("fast"): port("AND1", "OUT"),
+            PortID("slow"): port("OR2", "OUT"),
+        },
+    )
+    netlist = config().device
+    netlist.params = params
+    netlist.params_changed()
+    return netlist
+
+
+def outputs(netlist: Netlist, time: int, **inputs: bool) -> tuple[dict, int | None]:
+    update = netlist.update(SimTime(time), inputs)
+    exposed = {k: v for k, v in update.outputs.items() if k in ("fast", "slow")}
+    return exposed, update.call_at
+
+
+def test_outputs_change_after_delay_of_each_path(netlist: Netlist):
+    assert outputs(netlist, 0, a=False) == ({"fast": False, "slow": False}, None)
+
+    # The change is computed through every block in one update, so the netlist is
+    # only called back when an exposed output changes
+    assert outputs(netlist, 100, a=True) == ({"fast": False, "slow": False}, 120)
+    assert outputs(netlist, 120, a=True) == ({"fast": True, "slow": False}, 160)
+    assert outputs(netlist, 160, a=True) == ({"fast": True, "slow": True}, None)
+
+
+def test_input_changing_before_outputs_settle(netlist: Netlist):
+    outputs(netlist, 0, a=False)
+    outputs(netlist, 100, a=True)
+
+    # The pulse travels through each block in turn
+    assert outputs(netlist, 130, a=False) == ({"fast": True, "slow": False}, 150)
+    assert outputs(netlist, 150, a=False) == ({"fast": False, "slow": False}, 160)
+    assert outputs(netlist, 160, a=False) == ({"fast": False, "slow": True}, 190)
+    assert outputs(netlist, 190, a=False) == ({"fast": False, "slow": False}, None)
+
+
+def test_netlist_called_back_when_block_asks(params: dict[str, int]):
+    config = NetlistConfig(
+        name=ComponentID("netlist"),
+        inputs={PortID("a"): port("external", "a")},
+        blocks=[
+            PulseBlockConfig(
+                name=ComponentID("PULSE1"),
+                inputs={PortID("INP"): port("external", "a")},
+            )
+        ],
+        expose={PortID("fast"): port("PULSE1", "OUT")},
+    )
+    netlist = config().device
+    netlist.params = {**params, "PULSE1_DLY": 10, "PULSE1_WID": 5}
+    netlist.params_changed()
+    outputs(netlist, 0, a=False)
+
+    # The pulse starts after 20ns and a delay of 200ns, and lasts 100ns
+    assert outputs(netlist, 100, a=True) == ({"fast": False}, 320)
+    assert outputs(netlist, 320, a=True) == ({"fast": True}, 420)
+    assert outputs(netlist, 420, a=True) == ({"fast": False}, None)
+
+
+def test_outputs_of_muxes_are_exposed(netlist: Netlist):
+    exposed = netlist.update(SimTime(0), {"a": False}).outputs
+
+    assert exposed["OUT1_TTL"] is False
+    assert exposed["OUT8_CONN"] is False
+
+
+def test_loop_is_rejected(netlist: Netlist):
+    with pytest.raises(ValueError):
+        netlist.rewire(port("AND1", "INP2"), port("OR2", "OUT"))
+
+    assert PortID("INP2") not in netlist.wiring["AND1"]
+
+
+def test_blocks_wired_in_loop_are_rejected():
+    blocks = {ComponentID(name): AndOrBlock(name) for name in ("AND1", "OR1")}
+    wiring = InverseWiring(
+        {
+            ComponentID("AND1"): {PortID("INP1"): port("OR1", "OUT")},
+            ComponentID("OR1"): {PortID("INP1"): port("AND1", "OUT")},
+        }
+    )
+
+    with pytest.raises(ValueError, match="loop"):
+        Netlist(blocks, wiring)
+
+
+@pytest.fixture
+def adapter(netlist: Netlist, params: dict[str, int]) -> ZebraAdapter:
+    component = NetlistConfig(
+        name=ComponentID("netlist"), inputs={}, blocks=[], expose={}
+    )()
+    component.device = netlist
+    component.raise_interrupt = AsyncMock()  # type: ignore
+    adapter = ZebraAdapter(params=params)
+    adapter.setup_adapter({ComponentID("netlist"): component}, InverseWiring())
+    return adapter
+
+
+@pytest.mark.asyncio
+async def test_adapter_rewires_netlist(adapter: ZebraAdapter, netlist: Netlist, send):
+    outputs(netlist, 0, a=False)
+    outputs(netlist, 100, a=True)
+    outputs(netlist, 160, a=True)
+
+    # OUT1_TTL = AND1
+    assert await send(adapter, b"W600020\n") == [b"W60OK"]
+
+    assert await send(adapter, b"R60\n") == [b"R600020OK"]
+    assert netlist.update(SimTime(200), {"a": True}).outputs["OUT1_TTL"] is True
+
+
+@pytest.mark.asyncio
+async def test_adapter_changes_params_of_netlist(
+    adapter: ZebraAdapter, netlist: Netlist, send
+):
+    outputs(netlist, 0, a=False)
+    outputs(netlist, 100, a=True)
+    assert outputs(netlist, 160, a=True) == ({"fast": True, "slow": True}, None)
+
+    # Invert the input of OR2
+    assert await send(adapter, b"W190001\n") == [b"W19OK"]
+
+    assert outputs(netlist, 200, a=True) == ({"fast": True, "slow": True}, 220)
+    assert outputs(netlist, 220, a=True) == ({"fast": True, "slow": False}, None)
+
+
+def test_zebra_compiled_into_netlist():
+    zebra = Zebra(
+        name=ComponentID("zebra"),
+        inputs={PortID("a"): port("source", "value")},
+        expose={PortID("out"): port("OR2", "OUT")},
+        components=chain(),
+        params={},
+        compiled=True,
+    )()
+
+    (netlist,) = zebra.components
+    assert isinstance(netlist, NetlistConfig)
+    assert netlist.inputs == {"a": port("external", "a")}
+    assert zebra.expose["out"] == port("netlist", "out")
+    assert zebra.expose["OUT1_TTL"] == port("netlist", "OUT1_TTL")
+
+
+def test_zebra_components_parsed_by_type():
+    zebra = Zebra(
+        name=ComponentID("zebra"),
+        inputs={},
+        expose={},
+        components=[
+            {
+                "type": "tickit_devices.zebra.and_or_block.AndOrBlockConfig",
+                "name": "AND1",
+                "inputs": {},
+            }
+        ],
+        params={},
+    )
+
+    assert zebra.components == [AndOrBlockConfig(name=ComponentID("AND1"), inputs={})]
@@ -0,0 +1,292 @@
+import pytest
+from tickit.core.typedefs import PortID, SimTime
+
+from tickit_devices.zebra import _default
+from tickit_devices.zebra.div_block import DivBlock
+from tickit_devices.zebra.position_compare import PositionCompareBlock, read_register
+
+
+def registers(name: str, value: int) -> dict[str, int]:
+    value &= 0xFFFFFFFF
+    return {f"{name}LO": value & 0xFFFF, f"{name}HI": value >> 16}
+
+
+def pc_block(**params: int) -> PositionCompareBlock:
+    block = PositionCompareBlock(name="PC")
+    block.params = {
+        **_default(),
+        **registers("PC_GATE_START", params.pop("gate_start", 100)),
+        **registers("PC_GATE_WID", params.pop("gate_width", 50)),
+        **registers("PC_GATE_STEP", params.pop("gate_step", 100)),
+        **registers("PC_GATE_NGATE", params.pop("gates", 2)),
+        **registers("PC_PULSE_START", params.pop("pulse_start", 0)),
+        **registers("PC_PULSE_WID", params.pop("pulse_width", 5)),
+        **registers("PC_PULSE_STEP", params.pop("pulse_step", 10)),
+        **registers("PC_PULSE_MAX", params.pop("pulse_max", 0)),
+        **params,
+    }
+    return block
+
+
+def arm(block: PositionCompareBlock) -> None:
+    """Arms the block from its next update."""
+    assert block.params
+    block.params["PC_ARM"] = 1
+    block.params_changed()
+
+
+def run(
+    block: PositionCompareBlock, inputs: dict[int, dict], end: int
+) -> tuple[list[tuple[int, dict]], int]:
+    """
+    Updates the block with the inputs at each time given, and at each time it asks
+    to be called until end, returning the changes of its outputs and the updates.
+    """
+    current: dict = {}
+    outputs = dict(block.previous_outputs)
+    changes, updates = [], 0
+    times = sorted(inputs)
+    call_at: int | None = None
+    while times or (call_at is not None and call_at < end):
+        time = min(t for t in (times[0] if times else None, call_at) if t is not None)
+        if times and times[0] == time:
+            current = {**current, **inputs[times.pop(0)]}
+        update = block.update(SimTime(time), current)  # type: ignore
+        updates += 1
+        if update.outputs != outputs:
+            outputs = dict(update.outputs)
+            changes.append((time, outputs))
+        call_at = update.call_at
+    return changes, updates
+
+
+def edges(changes: list[tuple[int, dict]], port: str) -> list[tuple[int, bool]]:
+    """The changes of one output, from the changes of all outputs."""
+    result, level = [], False
+    for time, outputs in changes:
+        if outputs[port] != level:
+            level = outputs[port]
+            result.append((time, level))
+    return result
+
+
+def scan(start: int, end: int, step: int = 1) -> dict[int, dict]:
+    """An encoder moving a position every 1000ns, from start at time 0."""
+    return {
+        1000 * i: {"ENC1": position}
+        for i, position in enumerate(range(start, end, step))
+    }
+
+
+def test_read_register_signed():
+    params = registers("PC_GATE_START", -5)
+    assert read_register(params, "PC_GATE_START") == 0xFFFFFFFB
+    assert read_register(params, "PC_GATE_START", signed=True) == -5
+
+
+def test_gates_and_pulses_at_positions():
+    block = pc_block()
+    arm(block)
+
+    changes, _ = run(block, scan(0, 300), 400_000)
+
+    # Position p is reached at 1000 * p
+    assert edges(changes, "ARM") == [(20, True), (250_020, False)]
+    assert edges(changes, "GATE") == [
+        (100_020, True),
+        (150_020, False),
+        (200_020, True),
+        (250_020, False),
+    ]
+    pulses = edges(changes, "PULSE")
+    assert [time for time, high in pulses if high] == [
+        1000 * position + 20
+        for position in (100, 110, 120, 130, 140, 200, 210, 220, 230, 240)
+    ]
+    assert pulses[1] == (105_020, False)
+
+
+def test_pulses_limited_per_gate():
+    block = pc_block(pulse_max=2)
+    arm(block)
+
+    changes, _ = run(block, scan(0, 300), 400_000)
+
+    assert len([high for _, high in edges(changes, "PULSE") if high]) == 4
+
+
+def test_gates_for_largest_number_of_gates():
+    block = pc_block(gates=0xFFFFFFFF)
+    arm(block)
+
+    changes, _ = run(block, scan(0, 300), 400_000)
+
+    assert edges(changes, "GATE")[:4] == [
+        (100_020, True),
+        (150_020, False),
+        (200_020, True),
+        (250_020, False),
+    ]
+    assert edges(changes, "ARM") == [(20, True)]
+
+
+def test_gates_in_negative_direction():
+    block = pc_block(gate_start=-100, PC_DIR=1)
+    arm(block)
+
+    changes, _ = run(block, scan(0, -300, -1), 400_000)
+
+    assert edges(changes, "GATE")[:2] == [(100_020, True), (150_020, False)]
+
+
+def test_moving_back_does_not_close_gate():
+    block = pc_block()
+    arm(block)
+
+    changes, _ = run(
+        block,
+        {0: {"ENC1": 0}, 1000: {"ENC1": 125}, 2000: {"ENC1": 90}, 3000: {"ENC1": 151}},
+        10_000,
+    )
+
+    assert edges(changes, "GATE") == [(1020, True), (3020, False)]
+
+
+def test_crossing_gates_at_once_gives_single_change():
+    block = pc_block(gates=3)
+    arm(block)
+
+    changes, _ = run(block, {0: {"ENC1": 0}, 1000: {"ENC1": 225}}, 10_000)
+
+    assert changes == [
+        (20, {"ARM": True, "GATE": False, "PULSE": False}),
+        (1020, {"ARM": True, "GATE": True, "PULSE": False}),
+    ]
+
+
+def test_gates_and_pulses_in_time_only_update_at_edges():
+    block = pc_block(
+        gate_start=0,
+        gate_width=100,
+        gate_step=200,
+        gates=2,
+        pulse_width=10,
+        pulse_step=40,
+        PC_GATE_SEL=1,
+        PC_PULSE_SEL=1,
+        PC_TSPRE=50,  # 1us
+    )
+    arm(block)
+
+    changes, updates = run(block, {1_000: {}}, 1_000_000)
+
+    assert edges(changes, "GATE") == [
+        (1_020, True),
+        (101_020, False),
+        (201_020, True),
+        (301_020, False),
+    ]
+    assert [time for time, high in edges(changes, "PULSE") if high] == [
+        1_020,
+        41_020,
+        81_020,
+        201_020,
+        241_020,
+        281_020,
+    ]
+    # Once at each edge, then again when the change of the outputs is emitted
+    assert updates == len(changes) + len({time - 20 for time, _ in changes})
+
+
+def test_external_arm_and_gate():
+    block = pc_block(PC_ARM_SEL=1, PC_GATE_SEL=2, PC_PULSE_SEL=2)
+
+    changes, _ = run(
+        block,
+        {
+            0: {"ARM_INP": True},
+            100: {"GATE_INP": True},
+            200: {"PULSE_INP": True},
+            300: {"ARM_INP": False},
+        },
+        1000,
+    )
+
+    assert changes == [
+        (20, {"ARM": True, "GATE": False, "PULSE": False}),
+        (120, {"ARM": True, "GATE": True, "PULSE": False}),
+        (220, {"ARM": True, "GATE": True, "PULSE": True}),
+        (320, {"ARM": False, "GATE": False, "PULSE": False}),
+    ]
+
+
+@pytest.mark.parametrize("register", ["PC_ARM", "PC_DISARM"])
+def test_arm_and_disarm_registers_are_actions(register: str):
+    block = pc_block()
+    assert block.params
+    block.params[register] = 1
+
+    block.params_changed()
+
+    assert block.params[register] == 0
+
+
+def test_disarm_closes_gate():
+    block = pc_block()
+    arm(block)
+    run(block, {0: {"ENC1": 0}, 1000: {"ENC1": 125}}, 2000)
+    assert block.params
+    block.params["PC_DISARM"] = 1
+    block.params_changed()
+
+    changes, _ = run(block, {3000: {"ENC1": 121}}, 10_000)
+
+    assert changes == [(3020, {"ARM": False, "GATE": False, "PULSE": False})]
+
+
+def test_values_captured_at_each_pulse():
+    block = pc_block(gate_start=10, gate_width=20, gates=1, PC_BIT_CAP=0b11)
+    arm(block)
+
+    run(block, {1000 * p: {"ENC1": p, "ENC2": -p} for p in range(40)}, 100_000)
+
+    assert block.capture.fields == ("ENC1", "ENC2")
+    assert block.capture.column("ENC1").tolist() == [10, 20]
+    assert block.capture.column("ENC2").tolist() == [-10, -20]
+    assert block.capture.timestamps.tolist() == [10_000 // 20, 20_000 // 20]
+    assert block.read_param("PC_NUM_CAPLO") == 2
+    assert block.read_param("PC_NUM_CAPHI") == 0
+
+
+def test_each_pulse_captured_once_when_crossed_at_once():
+    block = pc_block(gate_start=0, gate_width=100, gates=1, PC_BIT_CAP=0b1)
+    arm(block)
+
+    # Pulses 0-5 and 10-15 are both high, but are different pulses
+    run(block, {0: {"ENC1": 2}, 1000: {"ENC1": 3}, 2000: {"ENC1": 12}}, 10_000)
+
+    assert block.capture.column("ENC1").tolist() == [2, 12]
+
+
+def test_divider_counts_captured():
+    block = pc_block(gate_start=10, gate_width=20, gates=1, PC_BIT_CAP=1 << 6)
+    divider = DivBlock(name="DIV1")
+    divider.params = {**_default(), "DIV1_DIVLO": 1000}
+    divider.set_train(PortID("INP"), SimTime(1000))
+    divider.update(SimTime(0), {"INP": False})
+    block.dividers = {"DIV1": divider}
+    arm(block)
+
+    run(block, {1000 * p: {"ENC1": p} for p in range(40)}, 100_000)
+
+    # The clock is counted from its first rising edge at 0
+    assert block.capture.column("DIV1").tolist() == [11, 21]
+
+
+def test_capture_reserved_within_bound_for_many_pulses():
+    block = pc_block(gates=0x100 << 16, pulse_max=1000, PC_BIT_CAP=0b1)
+    arm(block)
+
+    run(block, scan(0, 120), 200_000)
+
+    assert block.capture.column("ENC1").tolist() == [100, 110]
@@ -0,0 +1,115 @@
+import pytest
+from tickit.core.management.event_router import InverseWiring
+from tickit.core.typedefs import ComponentID, ComponentPort, PortID, SimTime
+
+from tickit_devices.zebra import _default
+from tickit_devices.zebra.netlist import Netlist
+from tickit_devices.zebra.pulse_block import PulseBlock
+
+
+def pulse_block(**params: int) -> PulseBlock:
+    block = PulseBlock(name="PULSE1")
+    block.params = {**_default(), "PULSE1_PRE": 1, **params}
+    return block
+
+
+def run(block: PulseBlock, edges: dict[int, bool]) -> list[tuple[int, bool]]:
+    """
+    Updates the block at each change of its input and each time it asks to be
+    called, returning the times at which its output changes.
+    """
+    changes = []
+    level, out = False, False
+    times = sorted(edges)
+    call_at: int | None = None
+    while times or call_at is not None:
+        time = min(t for t in (times[0] if times else None, call_at) if t is not None)
+        if times and times[0] == time:
+            level = edges[times.pop(0)]
+        update = block.update(SimTime(time), {"INP": level})
+        if update.outputs["OUT"] != out:
+            out = update.outputs["OUT"]
+            changes.append((time, out))
+        call_at = update.call_at
+    return changes
+
+
+def test_pulse_after_delay():
+    block = pulse_block(PULSE1_DLY=5, PULSE1_WID=10)
+
+    update = block.update(SimTime(0), {"INP": True})
+    assert update.outputs == {"OUT": False}
+    assert update.call_at == 120
+    update = block.update(SimTime(120), {"INP": True})
+    assert update.outputs == {"OUT": True}
+    assert update.call_at == 320
+    update = block.update(SimTime(320), {"INP": True})
+    assert update.outputs == {"OUT": False}
+    assert update.call_at is None
+
+
+def test_delay_and_width_scaled_by_prescaler():
+    block = pulse_block(PULSE1_DLY=2, PULSE1_WID=3, PULSE1_PRE=5)
+
+    assert run(block, {0: True}) == [(220, True), (520, False)]
+
+
+def test_retrigger_during_pulse_ignored():
+    block = pulse_block(PULSE1_DLY=5, PULSE1_WID=10)
+
+    assert run(block, {0: True, 20: False, 40: True, 60: False}) == [
+        (120, True),
+        (320, False),
+    ]
+
+
+def test_edges_during_delay_queue_pulses():
+    block = pulse_block(PULSE1_DLY=50, PULSE1_WID=5)
+
+    edges = {0: True, 100: False, 200: True, 300: False, 400: True}
+    assert run(block, edges) == [
+        (1020, True),
+        (1120, False),
+        (1220, True),
+        (1320, False),
+        (1420, True),
+        (1520, False),
+    ]
+
+
+def test_falling_edge_when_polarity_set():
+    block = pulse_block(PULSE1_DLY=1, PULSE1_WID=1, POLARITY=1 << 8)
+
+    assert run(block, {0: True, 100: False}) == [(140, True), (160, False)]
+
+
+def test_no_pulse_without_width():
+    block = pulse_block(PULSE1_DLY=1, PULSE1_WID=0)
+
+    assert run(block, {0: True}) == []
+
+
+@pytest.mark.parametrize("width", [10, 1000])
+def test_netlist_only_woken_at_edges(width: int):
+    block = pulse_block(PULSE1_DLY=0, PULSE1_WID=width)
+    netlist = Netlist(
+        {ComponentID("PULSE1"): block},
+        InverseWiring(
+            {
+                ComponentID("PULSE1"): {
+                    PortID("INP"): ComponentPort(ComponentID("external"), PortID("a"))
+                },
+                ComponentID("expose"): {
+                    PortID("OUT1_TTL"): ComponentPort(
+                        ComponentID("PULSE1"), PortID("OUT")
+                    )
+                },
+            }
+        ),
+    )
+
+    assert netlist.update(SimTime(0), {"a": True}).call_at == 20
+    assert netlist.update(SimTime(20), {"a": True}).call_at == 20 + width * 20
+    update = netlist.update(SimTime(20 + width * 20), {"a": True})
+    assert update.outputs["OUT1_TTL"] is False
+    assert update.call_at is None
@@ -0,0 +1,126 @@
+import asyncio
+from collections.abc import Iterator
+
+import pytest
+from tickit.core.management.event_router import EventRouter, InverseWiring
+from tickit.core.state_interfaces.internal import InternalStateServer
+from tickit.core.state_interfaces.state_interface import get_interface
+from tickit.core.typedefs import ComponentID, ComponentPort, PortID
+
+from tickit_devices.zebra import Zebra
+from tickit_devices.zebra._routing import move_edge, running_router
+from tickit_devices.zebra.and_or_block import AndOrBlockConfig
+
+
+def port(component: str, port: str) -> ComponentPort:
+    return ComponentPort(ComponentID(component), PortID(port))
+
+
+def wiring(**inputs: dict[str, ComponentPort]) -> InverseWiring:
+    return InverseWiring(
+        {
+            ComponentID(name): {PortID(p): source for p, source in ports.items()}
+            for name, ports in inputs.items()
+        }
+    )
+
+
+def cached(router: EventRouter) -> dict:
+    """The cached properties of a router, leaving out those without edges."""
+    return {
+        "wiring": {
+            k: {p: sinks for p, sinks in v.items() if sinks}
+            for k, v in router.wiring.items()
+            if any(v.values())
+        },
+        "components": router.components,
+        "input_components": router.input_components,
+        "output_components": router.output_components,
+        "component_tree": {k: v for k, v in router.component_tree.items() if v},
+        "inverse_component_tree": {
+            k: v for k, v in router.inverse_component_tree.items() if v
+        },
+    }
+
+
+@pytest.mark.parametrize(
+    "old_source,source",
+    [
+        (port("external", "IN1_TTL"), port("OR1", "OUT")),
+        (port("external", "IN1_TTL"), None),
+        (None, port("OR1", "OUT")),
+        (port("external", "IN1_TTL"), port("external", "IN2_TTL")),
+    ],
+)
+def test_move_edge_matches_router_of_new_wiring(
+    old_source: ComponentPort | None, source: ComponentPort | None
+):
+    # The cached properties of the router of the installed tickit are edited in
+    # place, so must stay consistent with a router built for the new wiring
+    sink = port("AND1", "INP1")
+    inputs = {"INP2": port("external", "IN2_TTL")}
+    before = {"INP1": old_source} if old_source else {}
+    after = {"INP1": source} if source else {}
+    router = EventRouter(wiring(AND1={**before, **inputs}, OR1={}))
+    cached(router)
+
+    move_edge(router, sink, old_source, source)
+
+    expected = EventRouter(wiring(AND1={**after, **inputs}, OR1={}))
+    assert cached(router) == cached(expected)
+    assert router.dependants(ComponentID("OR1")) == expected.dependants(
+        ComponentID("OR1")
+    )
+
+
+def test_no_running_router_before_system_runs():
+    assert running_router(None) is None
+
+
+@pytest.fixture
+def internal_server() -> Iterator[InternalStateServer]:
+    """
+    The internal state server, unsubscribing the consumers added by the test, which
+    would otherwise receive the messages of systems in later tests, e.g. on the topic
+    of the exposed outputs which every system shares.
+    """
+    server = InternalStateServer()
+    subscribers = {
+        topic: set(consumers) for topic, consumers in server._subscribers.items()
+    }
+    yield server
+    for topic, consumers in server._subscribers.items():
+        consumers.intersection_update(subscribers.get(topic, set()))
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("internal_server")
+async def test_running_router_routes_system():
+    system = Zebra(
+        name=ComponentID("zebra"),
+        inputs={},
+        expose={PortID("OUT1_TTL"): port("AND1", "OUT")},
+        components=[
+            AndOrBlockConfig(
+                name=ComponentID("AND1"), inputs={PortID("INP1"): port("OR1", "OUT")}
+            ),
+            AndOrBlockConfig(name=ComponentID("OR1"), inputs={}),
+        ],
+        params={},
+        port=7023,
+    )()
+    assert running_router(system) is None
+
+    task = asyncio.create_task(system.run_forever(*get_interface("internal")))
+    try:
+        for _ in range(100):
+            router = running_router(system)
+            if router is not None:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        task.cancel()
+        await asyncio.gather(task, *system._tasks, return_exceptions=True)
+
+    assert isinstance(router, EventRouter)
+    assert router.dependants(ComponentID("OR1")) == {"OR1", "AND1", "expose"}
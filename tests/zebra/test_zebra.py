@@ -0,0 +1,241 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from immutables import Map
+from tickit.core.components.device_component import DeviceComponent
+from tickit.core.management.event_router import EventRouter, InverseWiring
+from tickit.core.typedefs import ComponentID, ComponentPort, PortID, State
+
+from tickit_devices.zebra import Zebra, _default
+from tickit_devices.zebra._common import RegisterFile, system_bus
+from tickit_devices.zebra.and_or_block import AndOrBlock
+from tickit_devices.zebra.zebra import ZebraAdapter
+
+
+def port(component: str, port: str) -> ComponentPort:
+    return ComponentPort(ComponentID(component), PortID(port))
+
+
+def initial_wiring() -> InverseWiring:
+    return InverseWiring(
+        {
+            ComponentID("AND1"): {PortID("INP1"): port("external", "IN1_TTL")},
+            ComponentID("OR1"): {},
+            ComponentID("expose"): {PortID("OUT1_TTL"): port("AND1", "OUT")},
+        }
+    )
+
+
+@pytest.fixture
+def block() -> AndOrBlock:
+    return AndOrBlock(name="AND1")
+
+
+@pytest.fixture
+def components(block: AndOrBlock) -> dict[ComponentID, DeviceComponent]:
+    components = {
+        ComponentID("AND1"): DeviceComponent(name=ComponentID("AND1"), device=block),
+        ComponentID("OR1"): DeviceComponent(
+            name=ComponentID("OR1"), device=AndOrBlock(name="OR1")
+        ),
+    }
+    for component in components.values():
+        component.raise_interrupt = AsyncMock()  # type: ignore
+    return components
+
+
+@pytest.fixture
+def router() -> EventRouter:
+    return EventRouter(initial_wiring())
+
+
+@pytest.fixture
+def adapter(
+    components: dict[ComponentID, DeviceComponent], router: EventRouter
+) -> ZebraAdapter:
+    adapter = ZebraAdapter(params=_default())
+    adapter.system = MagicMock()
+    adapter.system.scheduler.ticker.event_router = router
+    adapter.setup_adapter(components, initial_wiring())
+    return adapter
+
+
+@pytest.mark.asyncio
+async def test_set_reg_recompiles_masks(
+    adapter: ZebraAdapter, block: AndOrBlock, components, send
+):
+    assert await send(adapter, b"W040003\n") == [b"W04OK"]
+    assert await send(adapter, b"W000002\n") == [b"W00OK"]
+
+    assert await send(adapter, b"R04\n") == [b"R040003OK"]
+    assert block._enabled == 0b0011
+    assert block._inverted == 0b0010
+    components["AND1"].raise_interrupt.assert_awaited()
+
+
+@pytest.mark.asyncio
+async def test_set_reg_of_block_not_configured(adapter: ZebraAdapter, send):
+    assert await send(adapter, b"W050001\n") == [b"W05OK"]
+    assert await send(adapter, b"R05\n") == [b"R050001OK"]
+
+
+@pytest.mark.asyncio
+async def test_read_mux_from_configured_wiring(adapter: ZebraAdapter, send):
+    assert await send(adapter, b"R08\n") == [b"R080001OK"]  # AND1_INP1 = IN1_TTL
+    assert await send(adapter, b"R09\n") == [b"R090000OK"]  # AND1_INP2 = DISCONNECT
+    assert await send(adapter, b"R60\n") == [b"R600020OK"]  # OUT1_TTL = AND1
+
+
+@pytest.mark.asyncio
+async def test_set_mux_rewires_router(adapter: ZebraAdapter, router: EventRouter, send):
+    and1 = system_bus.index("AND1")
+    assert await send(adapter, b"W20%04X\n" % and1) == [b"W20OK"]  # OR1_INP1
+    assert await send(adapter, b"W080000\n") == [b"W08OK"]  # AND1_INP1
+
+    assert await send(adapter, b"R20\n") == [b"R20%04XOK" % and1]
+    assert await send(adapter, b"R08\n") == [b"R080000OK"]
+    expected = EventRouter(
+        InverseWiring(
+            {
+                ComponentID("AND1"): {},
+                ComponentID("OR1"): {PortID("INP1"): port("AND1", "OUT")},
+                ComponentID("expose"): {PortID("OUT1_TTL"): port("AND1", "OUT")},
+            }
+        )
+    )
+    assert router.route(ComponentID("AND1"), {PortID("OUT"): True}) == {
+        "OR1": {"INP1": True},
+        "expose": {"OUT1_TTL": True},
+    }
+    assert router.route(ComponentID("external"), {PortID("IN1_TTL"): True}) == {}
+    assert router.component_tree["AND1"] == expected.component_tree["AND1"]
+    assert router.component_tree["external"] == set()
+    assert router.inverse_component_tree["OR1"] == {"AND1"}
+    assert router.inverse_component_tree["AND1"] == set()
+    assert router.dependants(ComponentID("AND1")) == {"AND1", "OR1", "expose"}
+
+
+@pytest.mark.asyncio
+async def test_set_mux_gives_input_value_of_new_source(
+    adapter: ZebraAdapter, components: dict[ComponentID, DeviceComponent], send
+):
+    components["AND1"].last_outputs = State(Map({"OUT": True}))
+    components["OR1"].device_inputs = {"INP1": False}
+
+    await send(adapter, b"W20%04X\n" % system_bus.index("AND1"))
+
+    assert components["OR1"].device_inputs == {"INP1": True}
+    components["OR1"].raise_interrupt.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_set_mux_to_block_not_configured_disconnects(
+    adapter: ZebraAdapter, router: EventRouter, send
+):
+    pulse1 = system_bus.index("PULSE1")
+    assert await send(adapter, b"W08%04X\n" % pulse1) == [b"W08OK"]
+
+    assert router.route(ComponentID("external"), {PortID("IN1_TTL"): True}) == {}
+    assert await send(adapter, b"R08\n") == [b"R08%04XOK" % pulse1]
+
+
+@pytest.mark.asyncio
+async def test_set_mux_forming_loop_disconnects(
+    adapter: ZebraAdapter, router: EventRouter, send
+):
+    await send(adapter, b"W20%04X\n" % system_bus.index("AND1"))  # OR1_INP1
+    or1 = system_bus.index("OR1")
+    assert await send(adapter, b"W09%04X\n" % or1) == [b"W09OK"]  # AND1_INP2
+
+    assert router.route(ComponentID("OR1"), {PortID("OUT"): True}) == {}
+    assert router.inverse_component_tree["AND1"] == {"external"}
+    assert await send(adapter, b"R09\n") == [b"R09%04XOK" % or1]
+
+
+@pytest.mark.asyncio
+async def test_set_regs_interrupts_each_block_once(
+    adapter: ZebraAdapter, block: AndOrBlock, components, send
+):
+    # AND1_ENA, AND1_INV, OR1_ENA
+    assert await send(adapter, b"M040003000002\n") == [b"M02OK"]
+    assert await send(adapter, b"M040007000001\n") == [b"M02OK"]
+    assert await send(adapter, b"M1C0001\n") == [b"M01OK"]
+
+    assert block._enabled == 0b0111
+    assert block._inverted == 0b0001
+    assert components["AND1"].raise_interrupt.await_count == 2
+    components["OR1"].raise_interrupt.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_set_regs_interrupts_blocks_concurrently(
+    adapter: ZebraAdapter, components: dict[ComponentID, DeviceComponent], send
+):
+    all_raised = asyncio.Event()
+    raised: list[ComponentID] = []
+
+    def interrupt(name: ComponentID):
+        async def raise_interrupt():
+            raised.append(name)
+            if len(raised) == len(components):
+                all_raised.set()
+            # Only returns once every block has raised its interrupt
+            await all_raised.wait()
+
+        return raise_interrupt
+
+    for name, component in components.items():
+        component.raise_interrupt = interrupt(name)  # type: ignore
+
+    reply = await asyncio.wait_for(send(adapter, b"M040001200003\n"), timeout=1)
+
+    assert reply == [b"M02OK"]
+    assert sorted(raised) == ["AND1", "OR1"]
+
+
+def test_register_file_by_name_and_address():
+    registers = RegisterFile({**_default(), "DIV1_DIVLO": 1000})
+
+    registers["POLARITY"] = 0x0F00
+    registers.write(0x60, system_bus.index("AND1"))  # OUT1_TTL
+
+    assert registers.read(0x38) == 1000  # DIV1_DIVLO
+    assert registers.read(0x54) == 0x0F00
+    assert set(registers) == set(_default())
+    assert sorted(registers.values()) == sorted(registers[name] for name in _default())
+    with pytest.raises(KeyError, match="not a Param"):
+        registers["OUT1_TTL"]
+
+
+def test_config_rejects_params_which_are_not_params():
+    with pytest.raises(ValueError, match="OUT1_TTL"):
+        Zebra(
+            name=ComponentID("zebra"),
+            inputs={},
+            expose={},
+            components=[],
+            params={"OUT1_TTL": 1},
+        )
+
+
+def test_register_file_saved_and_restored():
+    registers = RegisterFile(_default())
+    registers["AND1_ENA"] = 3
+    saved = registers.save()
+    registers["AND1_ENA"] = 0
+    registers.write(0x08, 5)
+
+    registers.restore(saved)
+
+    assert registers["AND1_ENA"] == 3
+    assert registers.read(0x08) == 0
+
+
+@pytest.mark.asyncio
+async def test_mux_value_stored_in_registers(adapter: ZebraAdapter, send):
+    pulse1 = system_bus.index("PULSE1")
+
+    await send(adapter, b"W08%04X\n" % pulse1)  # AND1_INP1
+
+    assert adapter.params.read(0x08) == pulse1
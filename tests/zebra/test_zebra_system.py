@@ -0,0 +1,32 @@
+import asyncio
+import time
+
+import pytest
+
+NUM_CAP = (0xF6, 0xF7)
+
+
+async def read(reader, writer, register: int) -> int:
+    writer.write(b"R%02X\n" % register)
+    await writer.drain()
+    reply = await asyncio.wait_for(reader.readuntil(b"OK"), timeout=1)
+    assert reply.startswith(b"R%02X" % register)
+    return int(reply[3:7], 16)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "tickit_task", ["examples/configs/zebra/fly_scan.yaml"], indirect=True
+)
+async def test_fly_scan_captures_each_pulse(tickit_task):
+    reader, writer = await asyncio.open_connection("localhost", 7012)
+    # The gate of 10000 counts is crossed by a pulse every 100 counts
+    deadline = time.monotonic() + 5
+    while True:
+        low, high = [await read(reader, writer, register) for register in NUM_CAP]
+        if high << 16 | low == 100 or time.monotonic() > deadline:
+            break
+        await asyncio.sleep(0.1)
+    writer.close()
+
+    assert high << 16 | low == 100